@@ -1,6 +1,3 @@
-from dateutil.parser import parse as dt_parse
-
-
 class BotDetector:
 
     def __init__(self):
@@ -26,6 +23,7 @@ class BotDetector:
             A list of datetime objects that can be used to compare the difference in follow times between a sequence of
             followers.
         """
+        from dateutil.parser import parse as dt_parse
         return [dt_parse(follower.get('followed_at', None)) for follower in foll_list]
 
 
@@ -116,9 +114,17 @@ class BotDetector:
         return [follower.get('from_id', None) for follower in sanitized_uids]
 
 
+def sanitize_foll_list(foll_list: list) -> tuple:
+    """ Stateless form of BotDetector.sanitize_foll_list for executors; returns (sanitized uids, number removed). """
+    bot_det = BotDetector()
+    sanitized_uids = bot_det.sanitize_foll_list(foll_list)
+    return sanitized_uids, bot_det.total_removed
+
+
 def main():
+    from fixtures import load_fixture
     bot_det = BotDetector()
-    sample_foll_list = [{'from_id': '74812972', 'from_name': 'Oiee', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-06-28T04:57:07Z'}, {'from_id': '186648072', 'from_name': 'MajorCamper12', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-06-27T05:35:34Z'}, {'from_id': '541844169', 'from_name': 'danielis52525', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-06-27T03:55:38Z'}, {'from_id': '227452570', 'from_name': 'slam6000', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-06-26T03:43:30Z'}, {'from_id': '546467589', 'from_name': 'farhadgames', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-06-22T00:49:56Z'}, {'from_id': '506674369', 'from_name': 'rxseanon', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-06-21T04:53:24Z'}, {'from_id': '540171341', 'from_name': 'bronson223', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-06-20T06:59:41Z'}, {'from_id': '134639096', 'from_name': 'RollingFlowers', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-06-20T05:58:09Z'}, {'from_id': '536605822', 'from_name': 'spicyftw', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-06-01T06:13:11Z'}, {'from_id': '189336802', 'from_name': 'Mrdragon9968', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-06-01T04:10:33Z'}, {'from_id': '514062872', 'from_name': 'n00b_head', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-05-30T05:03:37Z'}, {'from_id': '99915227', 'from_name': 'Nosle3pn', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-05-29T17:18:02Z'}, {'from_id': '233951670', 'from_name': 'PercyGrunwald', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-05-29T17:15:27Z'}, {'from_id': '452466999', 'from_name': 'xprestige', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-05-23T04:34:26Z'}, {'from_id': '531065971', 'from_name': 'pokemon_loverz', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-05-23T03:54:27Z'}, {'from_id': '501675989', 'from_name': 'scruffy_armadillo_daking', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-05-23T03:40:31Z'}, {'from_id': '450004898', 'from_name': 'brosephballin9', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-05-13T04:07:47Z'}, {'from_id': '529146961', 'from_name': 'tefurcule1989', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-05-11T17:03:11Z'}, {'from_id': '528272096', 'from_name': 'kaymen_cyder', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-05-11T06:17:08Z'}, {'from_id': '528596967', 'from_name': 'ertisinkey1977', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-05-10T13:21:57Z'}, {'from_id': '223057951', 'from_name': 'wild0ttv', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-05-07T21:32:12Z'}, {'from_id': '527110911', 'from_name': 'eganenpros1976', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-05-07T18:23:10Z'}, {'from_id': '122386377', 'from_name': 'aspie8675', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-05-05T21:29:40Z'}, {'from_id': '279742959', 'from_name': 'UhhApple', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-05-02T08:11:31Z'}, {'from_id': '521051913', 'from_name': 'dfxsfather', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-30T06:48:34Z'}, {'from_id': '466107921', 'from_name': 'lietuviss', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-28T09:02:19Z'}, {'from_id': '460500001', 'from_name': 'achimedes', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-27T22:06:10Z'}, {'from_id': '501880128', 'from_name': 'kelooks', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-27T09:01:19Z'}, {'from_id': '177726472', 'from_name': 'Footbucket', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-27T03:25:32Z'}, {'from_id': '520578689', 'from_name': 'lxyboi', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-26T00:14:39Z'}, {'from_id': '485843821', 'from_name': 'king32175', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-22T05:27:59Z'}, {'from_id': '238199105', 'from_name': 'kaeden456', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-22T04:35:00Z'}, {'from_id': '516742317', 'from_name': 'warzonewarrior17', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-21T05:16:58Z'}, {'from_id': '516953407', 'from_name': 'hamburgerking12', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-21T05:16:40Z'}, {'from_id': '516842027', 'from_name': 'dxrk_clappy', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-20T05:23:44Z'}, {'from_id': '416604658', 'from_name': 'vogulemagazine', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-20T02:51:00Z'}, {'from_id': '516377788', 'from_name': 'ringwisbackti1972', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-18T12:03:52Z'}, {'from_id': '516283808', 'from_name': 'shino_zap', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-18T06:45:38Z'}, {'from_id': '515678307', 'from_name': 'renorcali1988', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-17T13:06:45Z'}, {'from_id': '515678198', 'from_name': 'dandpameka1973', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-17T12:09:34Z'}, {'from_id': '503984671', 'from_name': 'yizzysszn', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-17T06:09:33Z'}, {'from_id': '514729005', 'from_name': 'ceypsorarac1984', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-15T19:09:43Z'}, {'from_id': '514295793', 'from_name': 'hargtranlubo1971', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-15T01:06:48Z'}, {'from_id': '226425431', 'from_name': 'Vulknan', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T05:23:48Z'}, {'from_id': '248417306', 'from_name': 'reelraiders0q', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '244480120', 'from_name': 'witwixch', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '248290726', 'from_name': 'kunshikittyq', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '486320509', 'from_name': 'Arrestpartzdrot', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '248403304', 'from_name': 'kragieed', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '248329834', 'from_name': 'ggriagq', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '485509966', 'from_name': 'spyswr', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '485618594', 'from_name': 'rhythmnnm', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '244408792', 'from_name': 'djulestvl', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '479440626', 'from_name': 'permissiblefish17', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '248322133', 'from_name': 'pocketstreamc', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '479450485', 'from_name': 'pondFloralaod', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '479449146', 'from_name': 'gladeAutumnVCR', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '248403496', 'from_name': 'girl2clutchh', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '248399070', 'from_name': 'kortneyplayso', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '244390413', 'from_name': 'ezequielrogel7', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '479443835', 'from_name': 'cherryfxz', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '248363156', 'from_name': 'itsliaaac', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '248291915', 'from_name': 'dossierchannel0', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '485626851', 'from_name': 'harmonyp0W', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '492157447', 'from_name': 'nutProduce', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '492162196', 'from_name': 'GrassvXc', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '248364026', 'from_name': 'magalzaoshowvm', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '492151786', 'from_name': 'knowledgepjl', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '485530780', 'from_name': 'cherryeos', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '492135548', 'from_name': 'fogFallingamg', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '486323547', 'from_name': 'Respectindustrious', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '244479813', 'from_name': 'xduracelv', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '492168807', 'from_name': 'frypailimm', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '248388656', 'from_name': 'dota2ti_5i', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '244496965', 'from_name': 'idropz_bodies6', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '244390517', 'from_name': 'talon2461u', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '244412294', 'from_name': 'shortyyguyt', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '248328431', 'from_name': 'daddy_law_694', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '486328998', 'from_name': 'maskfuturistic', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '486318753', 'from_name': 'snowlisa98', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '248373549', 'from_name': 'kep_vorobei5', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '244415158', 'from_name': 'loryfl', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '244428037', 'from_name': 'lakexl', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '248362291', 'from_name': 'delkonixv', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '244375144', 'from_name': 'mouzakrobat7', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '244412341', 'from_name': 'sorabi_u', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '486327174', 'from_name': 'discoveryaqE', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '248404944', 'from_name': 'fuzzface496', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '486315094', 'from_name': 'breadvjd', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '485566907', 'from_name': 'silvernar', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '479449228', 'from_name': 'Borderbbs', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '492128950', 'from_name': 'shapecuo', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '248397504', 'from_name': 'qksnipermh', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '492139643', 'from_name': 'drivingexn', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '492168064', 'from_name': 'earvcn', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '492171359', 'from_name': 'Dustpolished199', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '486318031', 'from_name': 'Burstpfu', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '492148038', 'from_name': 'Sleepygroup77', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '244412390', 'from_name': 'vorhalaj', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '243804052', 'from_name': 'mikailstreamp', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '244467010', 'from_name': 'giggand4', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '492126126', 'from_name': 'wisheux', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '244405431', 'from_name': 'wtfgamenationo', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '248340992', 'from_name': 'twozerothreetvp', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '485518673', 'from_name': 'statementzzW', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '244389239', 'from_name': 'linkdeadx24', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '248401782', 'from_name': 'rorichannik', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '486323007', 'from_name': 'Lisanwf', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '485532403', 'from_name': 'schoolMWP', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '492107378', 'from_name': 'CoastTravel', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '248376273', 'from_name': 'thepandorahousef', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '492152791', 'from_name': 'partGrandfather208', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '248364043', 'from_name': 'frankkasterq', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '248399004', 'from_name': 'dernicoqs', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '244427961', 'from_name': 'blackfireiced', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '486323197', 'from_name': 'absorbfightjt0', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:27Z'}, {'from_id': '248378934', 'from_name': 'superarcades', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '485549328', 'from_name': 'Waterfallygu', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '244495726', 'from_name': 'bagel411u', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248328378', 'from_name': 'gametime3010', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248364051', 'from_name': 'aliciawinsf', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248359180', 'from_name': 'g4non_gamesynb', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '485526001', 'from_name': 'personCreepy', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '492130937', 'from_name': 'Oceanwxe', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '485546684', 'from_name': 'slipChange', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '244419280', 'from_name': 'andrewbraveh', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '244424551', 'from_name': 'shannaninaf', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '244431869', 'from_name': 'dncbry', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248292990', 'from_name': 'jelyfishtnaj', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '486328405', 'from_name': 'wheel0mk', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248362790', 'from_name': 'orrsat', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '492119347', 'from_name': 'ChalkDOG', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248379726', 'from_name': 'twizzj', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248376966', 'from_name': 'rustycablemanh', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248388551', 'from_name': 'xodalivel', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '492164804', 'from_name': 'scarecrowmajestic', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '244467811', 'from_name': 'ninja_with_no_l4b', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248317149', 'from_name': 'thechief11147', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '244483235', 'from_name': 'rolandoellis812', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248311881', 'from_name': 'saifcameltvjq', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '485510472', 'from_name': 'fatherqSv', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '492122207', 'from_name': 'donaldrabbitssHY', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '492132639', 'from_name': 'Tankconsign', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248359111', 'from_name': 'petritlpl', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '244427864', 'from_name': 'cyborgangelo', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248344716', 'from_name': 'curvyllamah', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248353925', 'from_name': 'thi3n6', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '492142555', 'from_name': 'Morninghdo', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '486318313', 'from_name': 'cherryproud97', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '486322390', 'from_name': 'monthunequaled', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '244484704', 'from_name': 'daddydimmutvs', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '244441903', 'from_name': 'gspotdotag', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '244412995', 'from_name': 'coollermx', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248374317', 'from_name': 'wetforjesuso', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248311777', 'from_name': 'proudamericans5', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248386769', 'from_name': 'versutax5', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248340994', 'from_name': 'noelmiller1', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '485552626', 'from_name': 'gladePatientvsq', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '479451818', 'from_name': 'debt403', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248293118', 'from_name': 'realbambamg', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248322110', 'from_name': 'antdude92y', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248336316', 'from_name': 'hexybi', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '485623475', 'from_name': 'dustAutumn173', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248364710', 'from_name': 'thorw8', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '492141393', 'from_name': 'turngwq', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '485564335', 'from_name': 'ShockJasone0t', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '492135828', 'from_name': 'frogr00', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '492108297', 'from_name': 'bedroomzip', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '244485205', 'from_name': 'pocketstreamh', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '244395838', 'from_name': 'terasuhikarir', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248393835', 'from_name': 'deujnaan', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '244427885', 'from_name': 'smkgaming053', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248357784', 'from_name': 'thatchickparkergo', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248336362', 'from_name': 'msteamkksk', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '492161018', 'from_name': 'Betrayportervq', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '244432096', 'from_name': 'auzyristv2', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '492102128', 'from_name': 'Realizesnowdiw', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248387137', 'from_name': 'lutzemai0', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '492138829', 'from_name': 'DistanceHeady', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '244419834', 'from_name': 'teawrexg', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248397108', 'from_name': 'sly3r_jl', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248335718', 'from_name': 'giusc7', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '492120767', 'from_name': 'Treescm', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248290727', 'from_name': 'coccoq', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '485630624', 'from_name': 'birdjosephpgr', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '486322061', 'from_name': 'sneeze92', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248407434', 'from_name': 'gerbrownya', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248378910', 'from_name': 'gotshadow5', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '244439257', 'from_name': 'midas_666q', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '492169445', 'from_name': 'friendslinda', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248291773', 'from_name': 'lvpes2f', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248342578', 'from_name': 'texcubsfo', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '485613429', 'from_name': 'Playbeefsos', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '492119948', 'from_name': 'jefflgl', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '244465629', 'from_name': 'manyrinc', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '244439380', 'from_name': 'beamtwitchu', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '486325653', 'from_name': 'plotvrk', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248403462', 'from_name': 'b_u_l_o_c_h_k_aa', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '492111083', 'from_name': 'airport827', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248379761', 'from_name': 'laquetuphj', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '492132911', 'from_name': 'WomenVex', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '244444954', 'from_name': 'ubisoftbrasilb', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '244409009', 'from_name': 'pondernstreamj', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '244397567', 'from_name': 'omar2f', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '485630889', 'from_name': 'Lacebog', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248283868', 'from_name': 'vizfv', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248319208', 'from_name': 'senct1', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '244445224', 'from_name': 'stereonlinexq', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '486324311', 'from_name': 'daughterulx', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248379675', 'from_name': 'krakantas6r', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '486315268', 'from_name': 'incomexsk', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '492143548', 'from_name': 'societyun', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '486322770', 'from_name': 'guidelqe', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '492141056', 'from_name': 'baitrjc', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248360693', 'from_name': 'yourprincesskw', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '486329023', 'from_name': 'reasonuJB', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248402128', 'from_name': 'gumdropstsm8', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '486319932', 'from_name': 'coughcurrentGOMER', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248336394', 'from_name': 'hockamskz', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '479445682', 'from_name': 'mariaxjn', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '485556564', 'from_name': 'truckss0g', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '244393167', 'from_name': 'giftmyraaf', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '492145328', 'from_name': 'knowledgeableApplianceswc', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '492130364', 'from_name': 'meadow790', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248355491', 'from_name': 'shp_tvdk', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '244399846', 'from_name': 'seals311g', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '486324576', 'from_name': 'quietRuthless', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '485521672', 'from_name': 'Denysleetrar', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '485630110', 'from_name': 'cushion201', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '485516406', 'from_name': 'Ronaldxfy', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '244487549', 'from_name': 'thefuncannon7', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248294219', 'from_name': 'fooyam', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248402484', 'from_name': 'madqfrogh', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '485613809', 'from_name': 'cattlewOK', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '485610899', 'from_name': 'Watch0lx', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '486326677', 'from_name': 'sense0cc', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '492106738', 'from_name': 'jellyfishwfz', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248378837', 'from_name': 'taylorreneea', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '485520287', 'from_name': 'waterfallDarkooj', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '492160281', 'from_name': 'middletjz', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '244415239', 'from_name': 'customstoriesp', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '492104393', 'from_name': 'busysidewalkvll', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248281727', 'from_name': 'trihexdn', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248365147', 'from_name': 'dota2ti_ru_33', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '244438241', 'from_name': 'brolynhofgcda', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248335646', 'from_name': 'dreads3b', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '486322790', 'from_name': 'ronaldWildflower', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '492155161', 'from_name': 'BirdsNaN', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248336342', 'from_name': 'guillermordzwa', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248410146', 'from_name': 'thebubbaarmy2', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248300233', 'from_name': 'puppersm', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '244497630', 'from_name': 'anthonycaliber7', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '492155055', 'from_name': 'fork589', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248393987', 'from_name': 'loke921', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248357761', 'from_name': '24kbrownmagics', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248361340', 'from_name': 'taymool', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248361300', 'from_name': 'worrun_tv8', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248393897', 'from_name': 'mrmacavityu', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '244392136', 'from_name': 'taerssi', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248349316', 'from_name': 'dota2ti_ru_3od', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '492167799', 'from_name': 'Statement38', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248338213', 'from_name': 'ilovemundays0', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '244388512', 'from_name': 'cyrustwob', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '485578588', 'from_name': 'creature891', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '486328855', 'from_name': 'turndog', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248378133', 'from_name': 'diovanakoniw', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '485579923', 'from_name': 'noisehf', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '244439565', 'from_name': 'kutcherlolmw', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248362319', 'from_name': 'zombsowu', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '244470398', 'from_name': 'hotformw', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248347689', 'from_name': 'gale_adeladey', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248354795', 'from_name': 'd3th_c', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248361424', 'from_name': 'z4mmpam', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '248358913', 'from_name': 'alinefoxp', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:26Z'}, {'from_id': '485627670', 'from_name': 'surprisequickest', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:25Z'}, {'from_id': '248308308', 'from_name': 'otzdarvaml', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:25Z'}, {'from_id': '244482858', 'from_name': 'napostelw2', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:25Z'}, {'from_id': '485630893', 'from_name': 'basecrt', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:25Z'}, {'from_id': '485524263', 'from_name': 'Firejhv', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:25Z'}, {'from_id': '486316712', 'from_name': 'Furniturexvd', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:25Z'}, {'from_id': '492148973', 'from_name': 'achiever824', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:25Z'}, {'from_id': '244405299', 'from_name': 'mayanastreamy', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:25Z'}, {'from_id': '492161324', 'from_name': 'watchOptimize', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:25Z'}, {'from_id': '486323148', 'from_name': 'Humiliatechickenswgw', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:25Z'}, {'from_id': '485522674', 'from_name': 'butterflyomo', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:25Z'}, {'from_id': '248397942', 'from_name': 'myfreshgamesz', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:25Z'}, {'from_id': '248403312', 'from_name': 'h0lydivaqf', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:25Z'}, {'from_id': '244405681', 'from_name': 'gunnermaniacc', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:25Z'}, {'from_id': '248385299', 'from_name': 'billyiiiaxteps', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:25Z'}, {'from_id': '248397320', 'from_name': 'bourakkkkh', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:25Z'}, {'from_id': '479449860', 'from_name': 'yokenn0', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:25Z'}, {'from_id': '244445037', 'from_name': 'casinorockstarc', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:25Z'}, {'from_id': '244465315', 'from_name': 'diehahnl', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:25Z'}, {'from_id': '244412172', 'from_name': 'bricegamingzoneim', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:25Z'}, {'from_id': '485575178', 'from_name': 'bellshjv', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:25Z'}, {'from_id': '492135858', 'from_name': 'Jewel693', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:25Z'}, {'from_id': '492125073', 'from_name': 'Sistersskk', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:25Z'}, {'from_id': '248408202', 'from_name': 'fettmastaxq', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:25Z'}, {'from_id': '248385799', 'from_name': 'daspdcdv', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:25Z'}, {'from_id': '244465426', 'from_name': 'jokeronestvq', 'to_id': '106071345', 'to_name': 'stroopC', 'followed_at': '2020-04-11T03:52:25Z'}]
+    sample_foll_list = load_fixture('sample_foll_list')
     sanitized_foll_uids = bot_det.sanitize_foll_list(sample_foll_list)
     print(f'Length of sanitized list:  {len(sanitized_foll_uids)}')
     print(f'Sanitized uids:\n  {sanitized_foll_uids}')
@@ -0,0 +1,202 @@
+import asyncio
+import os
+import pickle
+import zlib
+from time import time
+from typing import List
+from dataclasses import dataclass, asdict, field
+from refresh import RecommendationState
+from colors import Col
+
+MAGIC = b'TRCK\x01'
+
+
+@dataclass
+class BatchCheckpoint:
+    """
+    Progress of a batch run over many streamers: which streamers are done, how far the results file got, and the
+    pipeline state of the streamer that was in flight.  `current` is a RecommendationState dict whose candidates
+    are only those already checked for being live; `processed_follower_ids` are the sampled followers whose
+    followings are already in its counter.
+    """
+    streamer_names:         List[str]
+    completed:              List[str] = field(default_factory=list)
+    output_offset:          int = 0
+    current:                dict = None
+    processed_follower_ids: List[str] = field(default_factory=list)
+    saved_at:               float = 0.0
+
+
+    def encode(self) -> bytes:
+        return MAGIC + zlib.compress(pickle.dumps(asdict(self), protocol=4), 6)
+
+
+    @classmethod
+    def decode(cls, data: bytes) -> 'BatchCheckpoint':
+        if not data.startswith(MAGIC):
+            raise ValueError('Not a checkpoint file, or one written by an incompatible version.')
+        return cls(**pickle.loads(zlib.decompress(data[len(MAGIC):])))
+
+
+
+class Checkpointer:
+    """
+    Periodically snapshots a batch run to a compact binary file (zlib-compressed pickle of plain lists and dicts),
+    so that a run restarted after a crash skips finished streamers and resumes the in-flight one from its last
+    snapshot instead of re-fetching hours of rate-limited data.  A checkpoint of a different streamer list is
+    ignored.  Snapshots are taken on the loop, so they are consistent; compression and the write run on a thread.
+
+    Args:
+        path (str):
+            The checkpoint file; removed by finish() once the batch is done.
+
+        streamer_names (list):
+            The batch, in order.
+
+        interval (float):
+            Seconds between periodic snapshots while a streamer is in flight.
+    """
+
+    def __init__(self, path: str, streamer_names: List[str], interval: float = 60.0) -> None:
+        self.path = path
+        self.interval = interval
+        self.rec = None
+        self.num_saves = 0
+        self._task = None
+        self._lock = None
+
+        loaded = self.load()
+        self.resumed = loaded is not None and loaded.streamer_names == list(streamer_names)
+        self.checkpoint = loaded if self.resumed else BatchCheckpoint(list(streamer_names))
+
+
+    def load(self) -> BatchCheckpoint:
+        try:
+            with open(self.path, 'rb') as f:
+                return BatchCheckpoint.decode(f.read())
+        except (FileNotFoundError, ValueError, TypeError, zlib.error, pickle.UnpicklingError, EOFError):
+            return None
+
+
+    @property
+    def output_offset(self) -> int:
+        """ Where the results file must be truncated to before appending, or None when starting afresh. """
+        return self.checkpoint.output_offset if self.resumed else None
+
+
+    def resume_output(self, path: str) -> int:
+        """
+        Like output_offset, for the results file at `path`.  When that file is missing or shorter than the offset,
+        the rows of the completed streamers are gone, so the checkpoint is dropped and the batch starts from zero.
+        """
+        offset = self.output_offset
+        if offset is not None and (not os.path.exists(path) or os.path.getsize(path) < offset):
+            self.resumed = False
+            self.checkpoint = BatchCheckpoint(list(self.checkpoint.streamer_names))
+            return None
+        return offset
+
+
+    def remaining(self) -> List[str]:
+        completed = set(self.checkpoint.completed)
+        return [name for name in self.checkpoint.streamer_names if name not in completed]
+
+
+    def begin(self, rec) -> bool:
+        """
+        Tracks `rec` for the following snapshots and restores its checkpointed state, if any.  State is only
+        restored once the follower sample was complete; before that, starting the streamer over is cheap.
+
+        Returns:
+            True when the recommendation should run with resume=True.
+        """
+        self.rec = rec
+        current, self.checkpoint.current = self.checkpoint.current, None
+        if not current or current['streamer_name'] != rec.streamer_name:
+            return False
+        state = RecommendationState.from_dict(current)
+        if not state.sampled_follower_ids or not state.matches(rec):
+            return False
+
+        state.restore(rec)
+        rec.pipeline.folnet_pipe.processed_ids.update(self.checkpoint.processed_follower_ids)
+        rec.pipeline.live_stream_pipe.fetched_batches.extend(state.candidates)
+        return True
+
+
+    async def complete(self, streamer_name: str, output_offset: int, succeeded: bool = True) -> None:
+        """ Records a finished streamer once its rows are flushed to `output_offset`; failures are retried on resume. """
+        if succeeded:
+            self.checkpoint.completed.append(streamer_name)
+        self.checkpoint.output_offset = output_offset
+        self.rec = None
+        await self.save()
+
+
+    def snapshot(self) -> BatchCheckpoint:
+        checkpoint = self.checkpoint
+        checkpoint.current, checkpoint.processed_follower_ids = None, []
+        if self.rec is not None:
+            pipeline = self.rec.pipeline
+            state = RecommendationState.from_recommendation(self.rec)
+            # Queued candidates whose live check never happened must be checked again after a restart
+            state.candidates = list(pipeline.live_stream_pipe.fetched_batches)
+            checkpoint.current = state.to_dict()
+            checkpoint.processed_follower_ids = list(pipeline.folnet_pipe.processed_ids)
+        checkpoint.saved_at = time()
+        return checkpoint
+
+
+    def _write(self, data: bytes) -> None:
+        # Write-then-rename so that a crash mid-write leaves the previous checkpoint intact
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self.num_saves += 1
+
+
+    async def save(self) -> None:
+        # The snapshot is copied on the loop; one save at a time, so an older snapshot never replaces a newer one
+        self._lock = self._lock or asyncio.Lock()
+        async with self._lock:
+            snapshot = BatchCheckpoint(**asdict(self.snapshot()))
+            await asyncio.get_running_loop().run_in_executor(None, lambda: self._write(snapshot.encode()))
+
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            if self.rec is not None:
+                await self.save()
+
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self.run())
+
+
+    def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+
+    def finish(self) -> None:
+        self.stop()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+    @property
+    def display(self, result=''):
+        checkpoint = self.checkpoint
+        result += f'{Col.cyan}<<<<< Checkpoint: {self.path} {Col.end}\n'
+        result += f'{Col.white}  * Resumed: {self.resumed}, Saves: {self.num_saves}, '
+        result += f'Completed: {len(checkpoint.completed)}/{len(checkpoint.streamer_names)}{Col.end}\n'
+        result += f'{Col.cyan} > Remaining (sz={len(self.remaining())}):{Col.end}\n'
+        result += f'     {self.remaining()}\n'
+        return print(result)
@@ -0,0 +1,201 @@
+import asyncio
+from dataclasses import dataclass, field
+from time import monotonic
+from typing import List, Tuple
+from twitch_client import TwitchClient
+from retry import Retrier
+from user_resolver import UserResolver
+from colors import Col
+
+
+def is_throttled(err: BaseException) -> bool:
+    """ twitchio gives up on repeated 429s with HTTPException(message, reason, status). """
+    status = getattr(err, 'status', None) or next((arg for arg in err.args if isinstance(arg, int)), None)
+    return status == 429 or 'Ratelimit Reached' in err.args
+
+
+
+@dataclass
+class PoolMember:
+    """ One credential set: its client (with its own OAuth token and twitchio bucket) and the pool's pacing of it. """
+    client:         TwitchClient
+    rate_limit:     int = 800
+    period:         float = 60.0
+    tokens:         float = None
+    in_flight:      int = 0
+    throttled_until: float = 0.0
+    num_calls:      int = 0
+    num_throttled:  int = 0
+    _last:          float = field(default_factory=monotonic)
+
+
+    def __post_init__(self):
+        self.tokens = float(self.rate_limit) if self.tokens is None else self.tokens
+
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.rate_limit, self.tokens + (now - self._last) * self.rate_limit / self.period)
+        self._last = now
+
+
+    def available(self, now: float) -> bool:
+        bucket = getattr(self.client.http, '_bucket', None)
+        return now >= self.throttled_until and self.tokens >= 1 and not getattr(bucket, 'limited', False)
+
+
+    def wait_time(self, now: float) -> float:
+        return max(self.throttled_until - now, (1 - self.tokens) * self.period / self.rate_limit, 0.01)
+
+
+
+class PooledHTTP:
+    """
+    Stands in for a client's twitchio HTTP layer and spreads requests over the pool's credentials: each request
+    goes to the available credential with the most budget left after its in-flight requests.  A credential that
+    answers 429 is benched for `cooldown` seconds and the request fails over to another one; when every credential
+    is exhausted, requests wait for the earliest to recover.
+    """
+
+    def __init__(self, members: List[PoolMember], cooldown: float = 60.0) -> None:
+        self.members = members
+        self.cooldown = cooldown
+
+
+    @property
+    def count_success_resp(self) -> int:
+        return sum(getattr(member.client.http, 'count_success_resp', 0) for member in self.members)
+
+
+    @property
+    def _bucket(self):
+        # What the rest of the code reads off a bucket, summed over the pool
+        return PoolBucket(self.members)
+
+
+    async def acquire(self) -> PoolMember:
+        while True:
+            now = monotonic()
+            for member in self.members:
+                member.refill(now)
+            available = [member for member in self.members if member.available(now)]
+            if available:
+                member = max(available, key=lambda m: m.tokens - m.in_flight)
+                member.tokens -= 1
+                return member
+            await asyncio.sleep(min(member.wait_time(now) for member in self.members))
+
+
+    async def call(self, fn, *args, **kwargs):
+        """
+        Awaits fn(member, *args, **kwargs) on the least-loaded credential.  A throttled request fails over to the
+        next credential; once every credential was throttled the error is raised, for the retrier to back off.
+        """
+        for attempt in range(len(self.members)):
+            member = await self.acquire()
+            member.in_flight += 1
+            try:
+                result = await fn(member, *args, **kwargs)
+            except Exception as err:
+                if not is_throttled(err):
+                    raise
+                member.num_throttled += 1
+                member.throttled_until = monotonic() + self.cooldown
+                if attempt == len(self.members) - 1:
+                    raise
+            else:
+                member.num_calls += 1
+                return result
+            finally:
+                member.in_flight -= 1
+
+
+    async def request(self, *args, **kwargs):
+        return await self.call(lambda member, *a, **kw: member.client.http.request(*a, **kw), *args, **kwargs)
+
+
+    async def get_streams(self, **kwargs):
+        return await self.call(lambda member, **kw: member.client.http.get_streams(**kw), **kwargs)
+
+
+    async def get_users(self, *logins):
+        return await self.call(lambda member, *a: member.client.get_users(*a), *logins)
+
+
+
+class PoolBucket:
+
+    def __init__(self, members: List[PoolMember]) -> None:
+        self.members = members
+
+
+    @property
+    def tokens(self) -> float:
+        return sum(member.tokens for member in self.members)
+
+
+    @property
+    def limited(self) -> bool:
+        now = monotonic()
+        return not any(member.available(now) for member in self.members)
+
+
+
+class ClientPool(TwitchClient):
+    """
+    A TwitchClient backed by several credential sets, so the process gets the rate limit of every app instead of
+    one.  Each credential has its own client, OAuth token and bucket; pipeline stages use the pool like any other
+    TwitchClient, since every request goes through its PooledHTTP.
+
+    Args:
+        clients (list):
+            One TwitchClient per credential set, e.g. from from_credentials() or from_settings().
+
+        rate_limit (int):
+            Requests per `period` seconds allowed for each credential (800/min for Helix app tokens).
+    """
+
+    def __init__(self, clients: List[TwitchClient], retrier: Retrier = None, follower_index=None,
+                 rate_limit: int = 800, period: float = 60.0, cooldown: float = 60.0,
+                 resolver: UserResolver = None) -> None:
+        # twitchio's Client.__init__ is skipped on purpose: the member clients own the sessions and tokens
+        if not clients:
+            raise ValueError('A client pool needs at least one client.')
+        self.loop = None
+        self.members = [PoolMember(client, rate_limit=rate_limit, period=period) for client in clients]
+        self.http = PooledHTTP(self.members, cooldown=cooldown)
+        self.retrier = retrier or Retrier()
+        self.follower_index = follower_index
+        self.resolver = resolver if resolver is not None else UserResolver()
+
+
+    @classmethod
+    def from_credentials(cls, credentials: List[Tuple[str, str]], **kwargs) -> 'ClientPool':
+        clients = [TwitchClient(client_id=client_id, client_secret=client_secret)
+                   for client_id, client_secret in credentials]
+        return cls(clients, **kwargs)
+
+
+    @classmethod
+    def from_settings(cls, **kwargs) -> 'ClientPool':
+        """ Uses settings.TWITCH_CREDENTIALS, a list of (client id, client secret) pairs, or the single pair. """
+        import settings
+        credentials = getattr(settings, 'TWITCH_CREDENTIALS', None) or \
+            [(settings.TWITCH_CLIENT_ID, settings.TWITCH_CLIENT_SECRET)]
+        return cls.from_credentials(credentials, **kwargs)
+
+
+    async def close(self):
+        await asyncio.gather(*(member.client.close() for member in self.members))
+
+
+    async def get_users(self, *logins):
+        return await self.retrier.call('/users', self.http.get_users, *logins)
+
+
+    @property
+    def display(self, result=''):
+        result += f'{Col.cyan}<<<<< Client Pool (sz={len(self.members)}){Col.end}\n'
+        for idx, member in enumerate(self.members):
+            result += f'{Col.white}  * Credential {idx}: calls {member.num_calls:>6}, throttled {member.num_throttled:>3}, '
+            result += f'budget {member.tokens:7.1f}/{member.rate_limit}{Col.end}\n'
+        return print(result)
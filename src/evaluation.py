@@ -0,0 +1,213 @@
+import asyncio
+import gc
+import json
+import tracemalloc
+from collections import Counter
+from dataclasses import dataclass, asdict
+from itertools import product
+from math import log2
+from statistics import mean
+from time import perf_counter
+from typing import Dict, Iterable, List, Sequence
+from recommendation import Recommendation
+from similarity import JaccardSim, SorensenDiceSim
+from fake_twitch import FakeHTTP, FakeTwitchClient
+from colors import Col
+
+SCORERS = {'jaccard': JaccardSim, 'dice': SorensenDiceSim}
+
+
+def ground_truth(graph, streamer_id: str, lang: str = 'en') -> Dict[str, float]:
+    """
+    Exact Jaccard similarity between the full follower set of the streamer and that of every live channel (in
+    `lang`) that any of its followers follows, highest first.  Jaccard and Sørensen–Dice rank exact sets alike,
+    so this is the reference for both scorers.
+    """
+    followers = [uid for uid, _ in graph.followers_of(streamer_id)]
+    mutual = Counter(uid for follower_id in followers for uid, _ in graph.followings_of(follower_id))
+    mutual.pop(streamer_id, None)
+    live = [stream['user_id'] for stream in graph.live_streams(list(mutual))
+            if not lang or stream.get('language') == lang]
+    scores = {uid: mutual[uid] / (len(followers) + len(graph.followers_of(uid)) - mutual[uid]) for uid in live}
+    return dict(sorted(scores.items(), key=lambda item: item[1], reverse=True))
+
+
+def ndcg(ranked: Sequence[str], truth: Dict[str, float], k: int = 10) -> float:
+    """ NDCG@k of a ranking, with each uid's ground-truth similarity as its graded relevance. """
+    dcg = sum(truth.get(uid, 0.0) / log2(idx + 2) for idx, uid in enumerate(ranked[:k]))
+    idcg = sum(score / log2(idx + 2) for idx, score in enumerate(list(truth.values())[:k]))
+    return dcg / idcg if idcg else 0.0
+
+
+def top_n_overlap(ranked: Sequence[str], truth: Dict[str, float], n: int = 10) -> float:
+    expected = list(truth)[:n]
+    return len(set(ranked[:n]) & set(expected)) / len(expected) if expected else 0.0
+
+
+def pareto_frontier(results: Iterable['EvalResult'], minimize: Sequence[str] = ('api_calls',),
+                    maximize: Sequence[str] = ('ndcg',)) -> List['EvalResult']:
+    """ Results that no other result beats on every objective at once, cheapest first. """
+    def dominates(a, b) -> bool:
+        no_worse = all(getattr(a, m) <= getattr(b, m) for m in minimize) and \
+                   all(getattr(a, m) >= getattr(b, m) for m in maximize)
+        better = any(getattr(a, m) < getattr(b, m) for m in minimize) or \
+                 any(getattr(a, m) > getattr(b, m) for m in maximize)
+        return no_worse and better
+
+    results = list(results)
+    frontier = [r for r in results if not any(dominates(other, r) for other in results)]
+    return sorted(frontier, key=lambda r: tuple(getattr(r, m) for m in minimize))
+
+
+
+@dataclass
+class EvalResult:
+    sample_sz:      int
+    max_followings: int
+    min_mutual:     int
+    scorer:         str
+    api_calls:      float
+    wall_time:      float
+    peak_mem:       float
+    ndcg:           float
+    overlap:        float
+
+
+
+class Evaluation:
+    """
+    Offline cost-versus-quality sweep of the sampling and scoring settings.  For each streamer, the ranking of the
+    full graph (see ground_truth) is the reference; every combination of sample_sz, max_followings and min_mutual
+    is then run through the real pipeline against a FakeHTTP serving the same graph, and each scorer ranks its
+    output.  Cost is measured as API calls, untraced wall time and traced peak memory, quality as NDCG@n_best and
+    top-n_best overlap; both are averaged over the streamers.
+
+    The graph is any FakeHTTP backend, e.g. a SyntheticGraph or a FakeGraph built from recorded replies.  Freeze a
+    SyntheticGraph's clock so that live status does not churn during the sweep.
+
+    Args:
+        streamer_ids (list):
+            Streamers to evaluate; a mix of popularity ranks gives a fairer average.
+
+        latency (float):
+            FakeHTTP latency; the default 0 makes wall time measure the pipeline's own work.
+    """
+
+    def __init__(self, graph, streamer_ids: List[str], sample_szs: Sequence[int] = (100, 300, 1000),
+                 max_followings: Sequence[int] = (50, 150, 300), min_mutuals: Sequence[int] = (2, 3, 5),
+                 scorers: Sequence[str] = tuple(SCORERS), n_best: int = 10, lang: str = 'en',
+                 latency: float = 0.0, n_consumers: int = 20) -> None:
+        unknown = set(scorers) - set(SCORERS)
+        if unknown:
+            raise ValueError(f'Unknown scorers {sorted(unknown)}; expected some of {list(SCORERS)}.')
+        self.graph = graph
+        self.streamer_ids = streamer_ids
+        self.grid = list(product(sample_szs, max_followings, min_mutuals))
+        self.scorers = scorers
+        self.n_best = n_best
+        self.lang = lang
+        self.latency = latency
+        self.n_consumers = n_consumers
+        self.truths: Dict[str, Dict[str, float]] = {}
+        self.results: List[EvalResult] = []
+
+
+    async def _run(self, streamer_id: str, sample_sz: int, max_followings: int, min_mutual: int) -> tuple:
+        http = FakeHTTP(self.graph, latency=self.latency, rate_limit=None)
+        rec = Recommendation(self.graph.login(streamer_id), sample_sz=sample_sz, max_followings=max_followings,
+                             min_mutual=min_mutual, lang=self.lang)
+        await rec.run(FakeTwitchClient(http), self.n_consumers)
+        return rec, http
+
+
+    async def measure(self, streamer_id: str, sample_sz: int, max_followings: int, min_mutual: int) -> dict:
+        """
+        Runs one recommendation; returns its cost and the quality of each scorer's ranking.  tracemalloc slows the
+        pipeline severalfold, so peak memory comes from a second, traced run and wall time from an untraced one.
+        """
+        gc.collect()
+        t = perf_counter()
+        rec, http = await self._run(streamer_id, sample_sz, max_followings, min_mutual)
+        wall_time = perf_counter() - t
+
+        gc.collect()
+        tracemalloc.start()
+        try:
+            await self._run(streamer_id, sample_sz, max_followings, min_mutual)
+            _, peak_mem = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        truth = self.truths[streamer_id]
+        measured = {'api_calls': http.count_success_resp, 'wall_time': wall_time, 'peak_mem': peak_mem}
+        for scorer in self.scorers:
+            scores = SCORERS[scorer](rec.folnet.mutual_followings, rec.live_streams.total_followers,
+                                     rec.pipeline.folnet_pipe.num_collected, None).ranked_sim_scores
+            ranked = [uid for uid, score in scores.items() if score > 0]
+            measured[scorer] = (ndcg(ranked, truth, self.n_best), top_n_overlap(ranked, truth, self.n_best))
+        return measured
+
+
+    async def run(self) -> List[EvalResult]:
+        for streamer_id in self.streamer_ids:
+            self.truths[streamer_id] = ground_truth(self.graph, streamer_id, self.lang)
+
+        for sample_sz, max_followings, min_mutual in self.grid:
+            runs = [await self.measure(streamer_id, sample_sz, max_followings, min_mutual)
+                    for streamer_id in self.streamer_ids]
+            cost = {key: mean(run[key] for run in runs) for key in ('api_calls', 'wall_time', 'peak_mem')}
+            for scorer in self.scorers:
+                self.results.append(EvalResult(sample_sz, max_followings, min_mutual, scorer, **cost,
+                                               ndcg=mean(run[scorer][0] for run in runs),
+                                               overlap=mean(run[scorer][1] for run in runs)))
+        return self.results
+
+
+    @property
+    def frontier(self) -> List[EvalResult]:
+        return pareto_frontier(self.results)
+
+
+    def save(self, path: str) -> None:
+        """ One JSON object per result, with an `on_frontier` flag. """
+        frontier = self.frontier
+        with open(path, 'w') as f:
+            for result in self.results:
+                f.write(json.dumps({**asdict(result), 'on_frontier': result in frontier}) + '\n')
+
+
+    @staticmethod
+    def _format(result: EvalResult) -> str:
+        return (f'sample {result.sample_sz:>5}  max_foll {result.max_followings:>4}  min_mut {result.min_mutual:>2}  '
+                f'{result.scorer:>7}   calls {result.api_calls:8.1f}  time {result.wall_time:6.2f}s  '
+                f'mem {result.peak_mem / 2**20:7.2f} MiB   NDCG {result.ndcg:.3f}  overlap {result.overlap:.2f}')
+
+
+    @property
+    def display(self, result=''):
+        frontier = self.frontier
+        result += f'{Col.bold}{Col.cyan}<<<<< Evaluation: {len(self.grid)} settings x {len(self.scorers)} scorers, '
+        result += f'{len(self.streamer_ids)} streamers{Col.end}\n'
+        for res in sorted(self.results, key=lambda r: (r.api_calls, -r.ndcg)):
+            color = Col.green if res in frontier else Col.white
+            result += f'{color}  {"*" if res in frontier else " "} {self._format(res)}{Col.end}\n'
+        result += f'{Col.green} > Pareto frontier (API calls vs NDCG@{self.n_best}): {len(frontier)} settings{Col.end}\n'
+        return print(result)
+
+
+
+async def main():
+    from synthetic_graph import GraphSpec, SyntheticGraph
+    from time import time
+    now = time()
+    graph = SyntheticGraph.generate(GraphSpec(n_streamers=2_000, n_viewers=50_000), clock=lambda: now)
+    streamer_ids = ['1', '5', '25']
+    evaluation = Evaluation(graph, streamer_ids, sample_szs=(100, 300, 1000), max_followings=(50, 150),
+                            min_mutuals=(2, 3))
+    await evaluation.run()
+    evaluation.display
+    evaluation.save('evaluation.ndjson')
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
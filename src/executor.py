@@ -0,0 +1,81 @@
+from __future__ import annotations
+import asyncio
+from functools import partial
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+
+class StageExecutor:
+    """
+    Runs the CPU-bound parts of pipeline stages (bot detection, followings counting, stream parsing) either inline on
+    the event loop, on a thread pool, or on a process pool.  Submitted callables must be pure: they return their
+    result and the calling stage merges it back into its own state on the loop.  With a process pool, the callable
+    and its arguments must be picklable, i.e. module-level functions or static methods.
+
+    Args:
+        kind (str):
+            One of 'inline' (the default; no pool), 'thread' or 'process'.
+
+        max_workers (int):
+            Pool size; None uses the concurrent.futures default.
+
+        batch_sz (int):
+            How many replies a stage should group into a single submission.  Larger batches amortise the
+            per-submission overhead (pickling, thread hand-off) at the cost of merging later.
+
+    The pool is started on first use and shut down by close(), or on leaving a `with` block; a closed executor
+    starts a new pool when it is used again.
+    """
+    KINDS = ('inline', 'thread', 'process')
+
+    def __init__(self, kind: str = 'inline', max_workers: int = None, batch_sz: int = 1) -> None:
+        if kind not in self.KINDS:
+            raise ValueError(f'Unknown executor kind "{kind}"; expected one of {list(self.KINDS)}.')
+        self.kind = kind
+        self.max_workers = max_workers
+        self.batch_sz = max(1, batch_sz)
+        self._pool: Executor = None
+        self.num_submitted = 0
+
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.kind!r}, max_workers={self.max_workers!r}, batch_sz={self.batch_sz!r})'
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *args):
+        self.close()
+
+
+    @property
+    def pool(self) -> Executor:
+        if self._pool is None and self.kind != 'inline':
+            # Imported on first use: a process pool pulls in multiprocessing, which most runs never need
+            if self.kind == 'process':
+                from concurrent.futures import ProcessPoolExecutor as pool_cls
+            else:
+                from concurrent.futures import ThreadPoolExecutor as pool_cls
+            self._pool = pool_cls(max_workers=self.max_workers)
+        return self._pool
+
+
+    async def run(self, fn, *args, **kwargs):
+        self.num_submitted += 1
+        if self.kind == 'inline':
+            return fn(*args, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(self.pool, partial(fn, *args, **kwargs))
+
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
+
+
+    def close(self) -> None:
+        self.shutdown(wait=True)
@@ -0,0 +1,217 @@
+import asyncio
+import json
+import os
+from typing import Dict, Iterable, List
+from recommendation import Recommendation
+
+# Column name -> Arrow type name; Recommendation.columns() produces exactly these columns
+COLUMNS = {
+    'streamer_id':      'string',
+    'streamer_name':    'string',
+    'rank':             'int32',
+    'candidate_id':     'string',
+    'candidate_name':   'string',
+    'similarity':       'float64',
+    'mutual_count':     'int32',
+    'total_followers':  'int64',
+    'viewer_count':     'int64',
+    'language':         'string',
+    'game_id':          'string',
+    'title':            'string',
+    'started_at':       'string',
+    'stream_duration':  'string',
+}
+
+
+class ResultWriter:
+    """
+    Buffers ranked results column by column and writes them out in bulk once `batch_rows` rows are pending.  Use as
+    a context manager, or call close() to flush the remainder.
+    """
+
+    def __init__(self, path: str, batch_rows: int = 65_536) -> None:
+        self.path = path
+        self.batch_rows = batch_rows
+        self.buffer: Dict[str, list] = {name: [] for name in COLUMNS}
+        self.num_rows = 0
+        self.num_pending = 0
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *args):
+        self.close()
+
+
+    def write(self, columns: Dict[str, list]) -> None:
+        for name, values in self.buffer.items():
+            values.extend(columns[name])
+        n_rows = len(columns['candidate_id'])
+        self.num_rows += n_rows
+        self.num_pending += n_rows
+        if self.num_pending >= self.batch_rows:
+            self.flush()
+
+
+    def flush(self) -> None:
+        if self.num_pending:
+            self._write_batch(self.buffer)
+        self.buffer = {name: [] for name in COLUMNS}
+        self.num_pending = 0
+
+
+    def close(self) -> None:
+        self.flush()
+
+
+    def _write_batch(self, columns: Dict[str, list]) -> None:
+        raise NotImplementedError
+
+
+
+class NDJSONWriter(ResultWriter):
+    """
+    Writes one JSON object per row.  Given an `offset`, an existing file is truncated to it and appended to, which
+    is how a checkpointed batch run drops the rows written after its last checkpoint.  A file that is missing or
+    shorter than `offset` cannot be resumed (see checkpoint.Checkpointer.resume_output).
+    """
+
+    def __init__(self, path: str, batch_rows: int = 65_536, offset: int = None) -> None:
+        if offset is not None and (not os.path.exists(path) or os.path.getsize(path) < offset):
+            raise ValueError(f'Cannot resume "{path}" at offset {offset}: the file is missing or shorter than that.')
+        super().__init__(path, batch_rows)
+        if offset is None:
+            self._file = open(path, 'w')
+        else:
+            # truncate() does not move the position, and offset must report where the next row goes
+            self._file = open(path, 'r+')
+            self._file.truncate(offset)
+            self._file.seek(offset)
+
+
+    @property
+    def offset(self) -> int:
+        return self._file.tell()
+
+
+    def _write_batch(self, columns: Dict[str, list]) -> None:
+        names = list(columns)
+        self._file.writelines(json.dumps(dict(zip(names, row))) + '\n' for row in zip(*columns.values()))
+
+
+    def flush(self) -> None:
+        super().flush()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+
+    def close(self) -> None:
+        super().close()
+        self._file.close()
+
+
+
+class ArrowWriter(ResultWriter):
+    """ Writes Arrow record batches to a Parquet file (.parquet) or an Arrow IPC file (.arrow/.feather); needs pyarrow. """
+
+    def __init__(self, path: str, batch_rows: int = 65_536) -> None:
+        super().__init__(path, batch_rows)
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError('Arrow and Parquet output need pyarrow; install it or write NDJSON instead.')
+        self.pa = pa
+        self.schema = pa.schema([(name, getattr(pa, type_name)()) for name, type_name in COLUMNS.items()])
+        if path.endswith('.parquet'):
+            import pyarrow.parquet as pq
+            self._sink = pq.ParquetWriter(path, self.schema)
+        else:
+            self._sink = pa.ipc.new_file(path, self.schema)
+
+
+    def _write_batch(self, columns: Dict[str, list]) -> None:
+        arrays = [self.pa.array(columns[field.name], type=field.type) for field in self.schema]
+        batch = self.pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+        if hasattr(self._sink, 'write_batch'):
+            self._sink.write_batch(batch)
+        else:
+            self._sink.write_table(self.pa.Table.from_batches([batch]))
+
+
+    def close(self) -> None:
+        super().close()
+        self._sink.close()
+
+
+
+def open_writer(path: str, batch_rows: int = 65_536) -> ResultWriter:
+    """ Picks a writer from the file extension: .parquet, .arrow or .feather use Arrow, anything else NDJSON. """
+    if path.endswith(('.parquet', '.arrow', '.feather')):
+        return ArrowWriter(path, batch_rows)
+    return NDJSONWriter(path, batch_rows)
+
+
+async def export_recommendations(streamer_names: Iterable[str], writer: ResultWriter, n_best: int = 10,
+                                 n_consumers: int = 100, checkpointer=None, user_resolver=None,
+                                 **rec_kwargs) -> List[str]:
+    """
+    Runs a recommendation per streamer on one shared client pool (every credential set in settings) and streams
+    each ranking to `writer`, without printing.
+
+    With a checkpoint.Checkpointer the run is resumable: finished streamers are skipped, the in-flight one continues
+    from its last snapshot, and rows are flushed before each streamer is marked done.  `writer` must then be an
+    NDJSONWriter opened at `checkpointer.resume_output(path)`.
+
+    All streamer names are resolved up front, 100 per request, through `user_resolver` (a fresh in-memory
+    user_resolver.UserResolver by default).
+
+    Returns:
+        Names of the streamers whose recommendation failed.
+    """
+    from client_pool import ClientPool
+
+    failed = []
+    streamer_names = checkpointer.remaining() if checkpointer else list(streamer_names)
+    async with ClientPool.from_settings(resolver=user_resolver) as tc:
+        await tc.resolver.prefetch(tc, *streamer_names)
+        if checkpointer:
+            checkpointer.start()
+        try:
+            for name in streamer_names:
+                rec = Recommendation(name, **rec_kwargs)
+                resume = checkpointer.begin(rec) if checkpointer else False
+                try:
+                    await rec.run(tc, n_consumers, resume=resume)
+                except Exception:
+                    failed.append(name)
+                else:
+                    writer.write(rec.columns(n_best))
+                if checkpointer:
+                    writer.flush()
+                    await checkpointer.complete(name, writer.offset, succeeded=name not in failed)
+        finally:
+            if checkpointer:
+                checkpointer.stop()
+            tc.resolver.save()
+    return failed
+
+
+async def main():
+    from checkpoint import Checkpointer
+    from user_resolver import UserResolver
+    names = ['emilybarkiss', 'funfps']
+    checkpointer = Checkpointer('recommendations.ckpt', names)
+    path = 'recommendations.ndjson'
+    with NDJSONWriter(path, offset=checkpointer.resume_output(path)) as writer:
+        failed = await export_recommendations(names, writer, checkpointer=checkpointer,
+                                              user_resolver=UserResolver(path='users.json'),
+                                              sample_sz=300, max_followings=200)
+    if not failed:
+        checkpointer.finish()
+    print(f'Wrote {writer.num_rows} rows to {writer.path}; failed: {failed}')
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,256 @@
+import asyncio
+import random
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from time import monotonic
+from typing import Dict, List, Tuple
+from twitch_client import TwitchClient
+from retry import Retrier
+from user_resolver import UserResolver
+
+PAGE_SZ = 100
+TWITCH_TIME = '%Y-%m-%dT%H:%M:%SZ'
+
+FakeUser = namedtuple('FakeUser', 'id login display_name profile_image broadcaster_type view_count')
+
+
+class FakeHTTPException(Exception):
+
+    def __init__(self, status: int = 503, message: str = 'Service Unavailable (injected)') -> None:
+        super().__init__(f'{status} {message}')
+        self.status = status
+
+
+
+class FakeGraph:
+    """
+    An in-memory follow graph with live streams, in the shape the fake /users/follows and /streams endpoints serve.
+    Follow lists are kept newest first, as Helix returns them.  Any object with the same lookup methods
+    (followers_of, followings_of, live_streams, login and user) can back a FakeHTTP.
+    """
+
+    def __init__(self) -> None:
+        self.logins: Dict[str, str] = {}
+        self.uids: Dict[str, str] = {}
+        self.followers: Dict[str, List[Tuple[str, str]]] = {}
+        self.followings: Dict[str, List[Tuple[str, str]]] = {}
+        self.streams: Dict[str, dict] = {}
+
+
+    @property
+    def num_edges(self) -> int:
+        return sum(map(len, self.followers.values()))
+
+
+    def add_user(self, uid: str, login: str = None) -> None:
+        self.logins[uid] = login or f'user_{uid}'
+        self.uids[self.logins[uid]] = uid
+
+
+    def add_follow(self, from_id: str, to_id: str, followed_at: str) -> None:
+        self.followers.setdefault(to_id, []).append((from_id, followed_at))
+        self.followings.setdefault(from_id, []).append((to_id, followed_at))
+
+
+    def sort(self) -> None:
+        for edges in (self.followers, self.followings):
+            for follows in edges.values():
+                follows.sort(key=lambda follow: follow[1], reverse=True)
+
+
+    def followers_of(self, uid: str) -> List[Tuple[str, str]]:
+        return self.followers.get(uid, [])
+
+
+    def followings_of(self, uid: str) -> List[Tuple[str, str]]:
+        return self.followings.get(uid, [])
+
+
+    def live_streams(self, channels: List[str]) -> List[dict]:
+        return [self.streams[uid] for uid in channels if uid in self.streams]
+
+
+    def login(self, uid: str) -> str:
+        return self.logins.get(uid, '')
+
+
+    def user(self, login: str) -> FakeUser:
+        uid = self.uids.get(login.lower())
+        if uid is None:
+            return None
+        return FakeUser(uid, self.logins[uid], self.logins[uid], '', '', 0)
+
+
+    @classmethod
+    def random(cls, n_streamers: int = 500, n_viewers: int = 20_000, mean_followings: float = 12,
+               live_share: float = 0.3, seed: int = 0) -> 'FakeGraph':
+        """
+        A small graph with a heavy-tailed audience: streamer popularity follows a Zipf law and the number of
+        followings per viewer is lognormal, so that some viewers exceed the followings cap.  Streamers are uids
+        1..n_streamers with logins streamer_<uid>.
+        """
+        rng = random.Random(seed)
+        graph = cls()
+        streamer_ids = [str(uid) for uid in range(1, n_streamers + 1)]
+        weights = [1 / rank for rank in range(1, n_streamers + 1)]
+        for uid in streamer_ids:
+            graph.add_user(uid, f'streamer_{uid}')
+
+        now = datetime.now(timezone.utc)
+        for viewer in range(n_streamers + 1, n_streamers + n_viewers + 1):
+            n_follows = min(n_streamers, max(1, int(rng.lognormvariate(0, 1) * mean_followings / 1.65)))
+            followed = set(rng.choices(streamer_ids, weights, k=n_follows))
+            for to_id in followed:
+                followed_at = now - timedelta(seconds=rng.randrange(3 * 365 * 86400))
+                graph.add_follow(str(viewer), to_id, followed_at.strftime(TWITCH_TIME))
+        graph.sort()
+
+        for uid in rng.sample(streamer_ids, int(live_share * n_streamers)):
+            started_at = now - timedelta(seconds=rng.randrange(8 * 3600))
+            graph.streams[uid] = {'user_id': uid, 'user_name': graph.logins[uid], 'game_id': str(rng.randrange(20)),
+                                  'type': 'live', 'title': f'stream {uid}', 'viewer_count': rng.randrange(1, 5000),
+                                  'started_at': started_at.strftime(TWITCH_TIME),
+                                  'language': rng.choices(['en', 'es', 'de'], [0.7, 0.2, 0.1])[0]}
+        return graph
+
+
+
+class FakeBucket:
+    """ Helix-style token bucket: `rate_limit` requests per `period` seconds; requests wait while it is empty. """
+
+    def __init__(self, rate_limit: int = 800, period: float = 60.0) -> None:
+        self.rate_limit = rate_limit
+        self.refill_rate = rate_limit / period
+        self.tokens = float(rate_limit)
+        self._last = monotonic()
+
+
+    async def acquire(self) -> None:
+        while True:
+            now = monotonic()
+            self.tokens = min(self.rate_limit, self.tokens + (now - self._last) * self.refill_rate)
+            self._last = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.refill_rate)
+
+
+
+class FakeHTTP:
+    """
+    A local stand-in for the twitchio HTTP layer that TwitchClient talks to: request() serves /users/follows with
+    Helix paging, totals and cursors, and /streams, which get_streams() sends through it; get_users() resolves logins.  Every page
+    costs one token from a shared rate bucket and a lognormal network latency; `error_rate` injects 503s.
+
+    Args:
+        graph (FakeGraph):
+            The data to serve.
+
+        latency (float):
+            Median latency per request in seconds; `jitter` is the sigma of its lognormal spread.
+
+        time_scale (float):
+            Multiplies every latency and the rate limit period, to run long simulations faster than real time.
+    """
+
+    def __init__(self, graph: FakeGraph, latency: float = 0.08, jitter: float = 0.5, rate_limit: int = 800,
+                 period: float = 60.0, error_rate: float = 0.0, time_scale: float = 1.0, seed: int = 0) -> None:
+        self.graph = graph
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.time_scale = time_scale
+        self.rng = random.Random(seed)
+        self._bucket = FakeBucket(rate_limit, period * time_scale) if rate_limit else None
+        self.count_success_resp = 0
+        self.num_errors = 0
+
+
+    async def _round_trip(self) -> None:
+        if self._bucket:
+            await self._bucket.acquire()
+        await asyncio.sleep(self.latency * self.rng.lognormvariate(0, self.jitter) * self.time_scale)
+        if self.error_rate and self.rng.random() < self.error_rate:
+            self.num_errors += 1
+            raise FakeHTTPException()
+        self.count_success_resp += 1
+
+
+    async def request(self, method: str, path: str, *, params=None, limit=None, count=False, full_reply=False,
+                      cursor=None):
+        if path == '/streams':
+            return await self._streams(params or [], limit)
+        if path != '/users/follows':
+            raise FakeHTTPException(404, f'Not Found: {path}')
+        params = dict(params or [])
+        if 'to_id' in params:
+            follows, key, other = self.graph.followers_of(params['to_id']), 'to_id', 'from_id'
+        else:
+            follows, key, other = self.graph.followings_of(params['from_id']), 'from_id', 'to_id'
+
+        if count:
+            await self._round_trip()
+            return len(follows)
+
+        start = int(params.get('after') or cursor or 0)
+        end = len(follows) if limit is None else min(len(follows), start + limit)
+        for _ in range(max(1, -(-(end - start) // PAGE_SZ))):
+            await self._round_trip()
+
+        login = self.graph.login(params[key])
+        data = [{key: params[key], other: uid, f'{key[:-3]}_name': login,
+                 f'{other[:-3]}_name': self.graph.login(uid), 'followed_at': followed_at}
+                for uid, followed_at in follows[start:end]]
+        if full_reply:
+            return {'data': data, 'total': len(follows), 'cursor': str(end) if end < len(follows) else None}
+        return data
+
+
+    async def _streams(self, params: list, limit=None) -> List[dict]:
+        await self._round_trip()
+        channels = [value for key, value in params if key in ('user_id', 'user_login')]
+        params = dict(params)
+        language, game_id = params.get('language'), params.get('game_id')
+        streams = self.graph.live_streams(channels)
+        return [dict(stream) for stream in streams if (not language or stream['language'] == language)
+                and (not game_id or stream['game_id'] == game_id)][:limit]
+
+
+    async def get_streams(self, *, game_id=None, language=None, channels=None, limit=None) -> List[dict]:
+        # Like twitchio, /streams goes through request(), so whatever wraps request() sees it too
+        params = [('user_id', str(channel)) for channel in channels or []]
+        if game_id is not None:
+            params.append(('game_id', str(game_id)))
+        if language is not None:
+            params.append(('language', language))
+        return await self.request('GET', '/streams', params=params, limit=limit)
+
+
+    async def get_users(self, *users: str) -> List[FakeUser]:
+        # Like twitchio, all-digit entries are looked up as uids
+        await self._round_trip()
+        logins = [self.graph.login(str(user)) if str(user).isdigit() else user for user in users]
+        return [user for user in map(self.graph.user, logins) if user is not None]
+
+
+
+class FakeTwitchClient(TwitchClient):
+    """ A TwitchClient whose HTTP layer is a FakeHTTP; no credentials, sockets or twitchio session are involved. """
+
+    def __init__(self, http: FakeHTTP, retrier: Retrier = None, follower_index=None,
+                 resolver: UserResolver = None) -> None:
+        # twitchio's Client.__init__ is skipped on purpose: it would read credentials and open a session
+        self.loop = None
+        self.http = http
+        self.retrier = retrier or Retrier()
+        self.follower_index = follower_index
+        self.resolver = resolver if resolver is not None else UserResolver()
+
+
+    async def close(self):
+        pass
+
+
+    async def get_users(self, *logins):
+        return await self.retrier.call('/users', self.http.get_users, *logins)
@@ -0,0 +1,10 @@
+import json
+import os
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixture_data')
+
+
+def load_fixture(name: str):
+    """ Loads fixture_data/<name>.json; sample data lives there rather than in module literals that every import compiles. """
+    with open(os.path.join(FIXTURE_DIR, f'{name}.json')) as f:
+        return json.load(f)
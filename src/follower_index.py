@@ -0,0 +1,194 @@
+import os
+import pickle
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable
+from follower_network import FollowerNetwork
+from similarity import IndexedJaccardSim
+
+ARRAY_MAX_SZ = 4096
+
+
+class CompressedUidSet:
+    """
+    A roaring-style set of integer uids.  Uids are split by their upper bits into 2**16-wide chunks; sparse chunks
+    are kept as sorted arrays of 16-bit offsets and dense chunks (> ARRAY_MAX_SZ members) as int bitmaps, so that
+    intersections run per chunk with either a merge, a bit test, or a single bitwise AND.
+    """
+
+    def __init__(self, uids: Iterable = ()) -> None:
+        self.containers: Dict[int, object] = {}
+        self._len = 0
+        for uid in uids:
+            self.add(uid)
+
+
+    def __len__(self):
+        return self._len
+
+
+    def __contains__(self, uid):
+        uid = int(uid)
+        container = self.containers.get(uid >> 16)
+        if container is None:
+            return False
+        low = uid & 0xFFFF
+        if isinstance(container, int):
+            return bool(container >> low & 1)
+        idx = bisect_left(container, low)
+        return idx < len(container) and container[idx] == low
+
+
+    def __iter__(self):
+        for high in sorted(self.containers):
+            for low in self._lows(self.containers[high]):
+                yield high << 16 | low
+
+
+    def __and__(self, other: 'CompressedUidSet') -> 'CompressedUidSet':
+        result = CompressedUidSet()
+        for high, container in self.containers.items():
+            if high in other.containers:
+                lows = self._intersect(container, other.containers[high])
+                if lows:
+                    result.containers[high] = array('H', lows)
+                    result._len += len(lows)
+        return result
+
+
+    @staticmethod
+    def _lows(container) -> list:
+        if isinstance(container, int):
+            return [low for low in range(container.bit_length()) if container >> low & 1]
+        return list(container)
+
+
+    @staticmethod
+    def _intersect(a, b) -> list:
+        if isinstance(a, int) and isinstance(b, int):
+            return CompressedUidSet._lows(a & b)
+        if isinstance(a, int):
+            a, b = b, a
+        if isinstance(b, int):
+            return [low for low in a if b >> low & 1]
+        return sorted(set(a).intersection(b))
+
+
+    def add(self, uid) -> bool:
+        uid = int(uid)
+        high, low = uid >> 16, uid & 0xFFFF
+        container = self.containers.setdefault(high, array('H'))
+        if isinstance(container, int):
+            if container >> low & 1:
+                return False
+            self.containers[high] = container | (1 << low)
+        else:
+            idx = bisect_left(container, low)
+            if idx < len(container) and container[idx] == low:
+                return False
+            container.insert(idx, low)
+            if len(container) > ARRAY_MAX_SZ:
+                self.containers[high] = sum(1 << member for member in container)
+        self._len += 1
+        return True
+
+
+    def intersection_len(self, other: 'CompressedUidSet') -> int:
+        total = 0
+        for high, container in self.containers.items():
+            if high in other.containers:
+                other_container = other.containers[high]
+                if isinstance(container, int) and isinstance(other_container, int):
+                    total += bin(container & other_container).count('1')
+                else:
+                    total += len(self._intersect(container, other_container))
+        return total
+
+
+
+class FollowerIndex:
+    """
+    Reverse index of candidate uid -> compressed set of follower uids, built from every followings reply ingested
+    through TwitchClient.fetch_capped_followings.  Because a capped fetch returns *all* followings of a user, the
+    index is exact over the set of users that have been ingested (`known_users`).
+    """
+
+    def __init__(self) -> None:
+        self.index: Dict[str, CompressedUidSet] = {}
+        self.known_users = CompressedUidSet()
+
+
+    def __len__(self):
+        return len(self.index)
+
+
+    def ingest(self, foll_data: list) -> None:
+        for following in foll_data:
+            from_id, to_id = following.get('from_id'), following.get('to_id')
+            self.index.setdefault(to_id, CompressedUidSet()).add(from_id)
+            self.known_users.add(from_id)
+
+
+    def known_followers(self, uid: str) -> int:
+        return len(self.index.get(uid, ()))
+
+
+    def overlap(self, uid_a: str, uid_b: str) -> int:
+        if uid_a not in self.index or uid_b not in self.index:
+            return 0
+        return self.index[uid_a].intersection_len(self.index[uid_b])
+
+
+    def jaccard(self, uid_a: str, uid_b: str) -> float:
+        """ Exact Jaccard similarity between the known audiences of two uids; -1 when either audience is unknown. """
+        n_a, n_b = self.known_followers(uid_a), self.known_followers(uid_b)
+        if not n_a or not n_b:
+            return -1
+        mutual = self.overlap(uid_a, uid_b)
+        return mutual / (n_a + n_b - mutual)
+
+
+    def save(self, path: str) -> None:
+        # Write-then-rename so that a crash mid-write leaves the previous index intact
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump((self.index, self.known_users), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+
+    @classmethod
+    def load(cls, path: str) -> 'FollowerIndex':
+        follower_index = cls()
+        with open(path, 'rb') as f:
+            follower_index.index, follower_index.known_users = pickle.load(f)
+        return follower_index
+
+
+
+class IndexedFollowerNetwork(FollowerNetwork):
+    """ A FollowerNetwork ranked by exact overlap of known audiences from a FollowerIndex. """
+    uses_known_audiences = True
+
+    def __init__(self, streamer_id: str, follower_index: FollowerIndex, min_mutual=3):
+        super().__init__(streamer_id, min_mutual)
+        self.follower_index = follower_index
+
+
+    def similarities(self, live_uid_total_followers: dict, num_collected: int, n_best: int = 10) -> IndexedJaccardSim:
+        return IndexedJaccardSim(self.follower_index, self.streamer_id, live_uid_total_followers, n_best)
+
+
+
+def main():
+    follower_index = FollowerIndex()
+    follower_index.ingest([{'from_id': str(uid), 'to_id': 'x'} for uid in range(0, 10_000, 2)])
+    follower_index.ingest([{'from_id': str(uid), 'to_id': 'y'} for uid in range(0, 10_000, 3)])
+
+    print(f'Known followers of x: {follower_index.known_followers("x")}')
+    print(f'Known followers of y: {follower_index.known_followers("y")}')
+    print(f'Overlap(x, y):        {follower_index.overlap("x", "y")}')
+    print(f'Jaccard(x, y):        {follower_index.jaccard("x", "y"):.4f}')
+
+
+if __name__ == "__main__":
+    main()
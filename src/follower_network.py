@@ -1,22 +1,44 @@
+from __future__ import annotations
 import asyncio
 from collections import Counter
 from time import perf_counter
-from twitch_client import TwitchClient
-from streamer import StreamerPipe, Streamer
+from similarity import JaccardSim
+from executor import StageExecutor
+from heavy_hitters import SpaceSaving
 from colors import Col
-from typing import Set
+from typing import Callable, Set, TYPE_CHECKING
 from dataclasses import dataclass
 
+if TYPE_CHECKING:
+    from twitch_client import TwitchClient
+    from skip_filter import SkipFilter
+    from streamer import StreamerPipe
+
+
+def count_followings(foll_data_batch: list) -> Counter:
+    """ Tallies followed uids over a batch of followings replies; pure so that it can run on an executor. """
+    return Counter(following.get('to_id') for foll_data in foll_data_batch for following in foll_data)
+
+
 
 @dataclass
 class FollowerNetwork:
+    """
+    Counts how many sampled followers follow each uid.  By default every followed uid is counted exactly; with
+    `max_tracked` only that many uids are tracked by a Space-Saving counter (see heavy_hitters.SpaceSaving), so
+    that memory is bounded by the candidates instead of the edges.  Bounded counts are overestimates, within
+    the bounds that mutual_bounds reports.
+    """
     streamer_id: str
     min_mutual: int = 3
+    # Whether similarities() ranks by known audiences alone, so that live streams need no total follower counts
+    uses_known_audiences = False
 
-    def __init__(self, streamer_id: str, min_mutual=3):
+    def __init__(self, streamer_id: str, min_mutual=3, max_tracked: int = None):
         self.streamer_id = streamer_id
         self.min_mutual = min_mutual
-        self._followings_counter = Counter()
+        self.max_tracked = max_tracked
+        self.clear()
 
 
     @property
@@ -30,18 +52,76 @@ class FollowerNetwork:
         return {uid: count for uid, count in self.followings_counter.items() if count >= self.min_mutual}
 
 
+    @property
+    def bounded(self) -> bool:
+        return isinstance(self._followings_counter, SpaceSaving)
+
+
+    @property
+    def mutual_bounds(self) -> dict:
+        """ (lower, upper) bounds on the true count of each mutual following; both are exact when unbounded. """
+        if not self.bounded:
+            return {uid: (count, count) for uid, count in self.mutual_followings.items()}
+        return {uid: self.followings_counter.bounds(uid) for uid in self.mutual_followings}
+
+
+    @property
+    def mutual_complete(self) -> bool:
+        """ True when no uid followed by min_mutual or more sampled followers can be missing from the mutuals. """
+        return not self.bounded or self.followings_counter.min_count < self.min_mutual
+
+
+    def clear(self) -> None:
+        self._followings_counter = SpaceSaving(self.max_tracked) if self.max_tracked else Counter()
+
+
+    def add_followings(self, foll_data: list, counts: Counter = None) -> None:
+        """ Counts the followed uids in foll_data, or merges `counts` when they were already tallied elsewhere. """
+        self.add_pages([foll_data], counts)
+
+
+    def add_pages(self, pages: list, counts: Counter = None) -> None:
+        """ Like add_followings for followings that arrived as several pages; the pages are never concatenated. """
+        self.followings_counter.update(counts if counts is not None else count_followings(pages))
+
+
+    def compact(self) -> None:
+        """
+        Keeps only the counts of mutual followings, which is all that ranking needs once followings are in.  A bounded
+        counter keeps its error bounds for them.
+        """
+        if self.bounded:
+            self._followings_counter.retain(self.mutual_followings)
+        else:
+            self._followings_counter = Counter(self.mutual_followings)
+
+
+    def similarities(self, live_uid_total_followers: dict, num_collected: int, n_best: int = 10) -> JaccardSim:
+        return JaccardSim(self.mutual_followings, live_uid_total_followers, num_collected, n_best)
+
+
 
 class FollowNetPipe:
     BATCH_SZ:       int = 100
     num_collected:  int = 0
     num_skipped:    int = 0
-    batch_history:  Set[str] = set()
+    num_failed:     int = 0
+    batch_history:  Set[str]
+    processed_ids:  Set[str]
     max_followings: int
 
 
-    def __init__(self, folnet: FollowerNetwork, max_followings: int = 150) -> None:
+    def __init__(self, folnet: FollowerNetwork, max_followings: int = 150, executor: StageExecutor = None,
+                 candidate_filter: Callable[[list], list] = None, skip_filter: SkipFilter = None) -> None:
         self.folnet = folnet
         self.max_followings = max_followings
+        self.executor = executor or StageExecutor()
+        self.candidate_filter = candidate_filter
+        self.skip_filter = skip_filter
+        self.batch_history = set()
+        self.processed_ids = set()
+        self._pending = []
+        self._pending_ids = []
 
 
     @property
@@ -49,10 +129,17 @@ class FollowNetPipe:
         result += f'{Col.green}<<<<< Pipe: Follower Network {Col.end}\n'
         result += f'{Col.white}  * Total Skipped: {self.num_skipped:>4}{Col.end}\n'
         result += f'{Col.white}  *    Total Kept: {self.num_collected:>4}{Col.end}\n'
+        result += f'{Col.white}  *  Total Failed: {self.num_failed:>4}{Col.end}\n'
         result += f'{Col.white}  *         Total: {self.num_skipped + self.num_collected:>4}{Col.end}\n'
         result += f'{Col.green} > Followings Counter (sz={len(self.folnet.followings_counter)}){Col.end}\n'
         result += f'     {self.folnet.followings_counter}\n'
         result += f'{Col.green} > Mutual Followings (sz={len(self.folnet.mutual_followings)}){Col.end}\n'
+        if self.folnet.bounded:
+            counter = self.folnet.followings_counter
+            max_error = max(map(counter.error, self.folnet.mutual_followings), default=0)
+            result += f'     Tracked {len(counter)}/{counter.capacity}, evicted {counter.num_evicted}, '
+            result += f'max overcount {max_error}, untracked <= {counter.min_count} '
+            result += f'(complete: {self.folnet.mutual_complete})\n'
         result += f'     {self.folnet.mutual_followings}\n'
         result += f'{Col.green} > Batch History (sz={len(self.batch_history)}){Col.end}\n'
         result += f'     {self.batch_history}\n'
@@ -77,17 +164,34 @@ class FollowNetPipe:
 
         while True:
             follower_id = await q_in.get()
-            followings_found = await tc.fetch_capped_followings(follower_id, self.max_followings)
-            new_candidate_batch = self.update_followings(followings_found)
-            if new_candidate_batch and q_out:
-                q_out.put_nowait(new_candidate_batch)
-
-            q_in.task_done()
+            try:
+                if follower_id in self.processed_ids:
+                    continue
+                if self.skip_filter is not None and self.skip_filter.skips(follower_id, self.max_followings):
+                    self.processed_ids.add(follower_id)
+                    self.num_skipped += 1
+                    continue
+                pages, counts = [], Counter() if self.counts_inline else None
+                async for page in tc.iter_followings_pages(follower_id, self.max_followings):
+                    if counts is None:
+                        pages.append(page)
+                    else:
+                        # Counted inline, a page is dropped as soon as it is counted; only the counts are kept
+                        counts.update(following.get('to_id') for following in page)
+            except Exception:
+                # A follower whose followings could not be fetched is dropped from the sample; it must not stall join()
+                self.num_failed += 1
+            else:
+                new_candidate_batch = await self.submit_followings(pages, follower_id, counts)
+                if new_candidate_batch and q_out:
+                    q_out.put_nowait(new_candidate_batch)
+            finally:
+                q_in.task_done()
 
 
     def update_followings(self, foll_data, remainder=False) -> list:
         if foll_data:
-            self.folnet.followings_counter.update([following.get('to_id') for following in foll_data])
+            self.folnet.add_followings(foll_data)
             self.num_collected += 1
             return self.new_candidate_batches(remainder)
         else:
@@ -95,9 +199,74 @@ class FollowNetPipe:
             return []
 
 
+    @property
+    def counts_inline(self) -> bool:
+        return self.executor.kind == 'inline' and self.executor.batch_sz == 1
+
+
+    async def submit_followings(self, pages: list, follower_id: str = None, counts: Counter = None) -> list:
+        """
+        Like update_followings for one follower's pages of followings.  Unless the executor is inline, followings
+        are counted on the executor in batches of executor.batch_sz followers; the counts are merged into the
+        network on the loop.  Call flush() once the input is exhausted.
+
+        A follower id only lands in processed_ids once its followings are part of the counter, so that a checkpoint
+        never claims work that it does not contain.  Followings of a follower that is already counted or pending are
+        ignored, so that redelivered work is merged once.
+        """
+        if follower_id is not None and (follower_id in self.processed_ids or follower_id in self._pending_ids):
+            return []
+        if not (counts if counts is not None else any(pages)):
+            self.processed_ids.add(follower_id)
+            self.num_skipped += 1
+            if self.skip_filter is not None:
+                self.skip_filter.add_skipped(follower_id, self.max_followings)
+            return []
+
+        self.num_collected += 1
+        if self.counts_inline:
+            self.folnet.add_pages(pages, counts)
+            self.processed_ids.add(follower_id)
+            return self.new_candidate_batches()
+
+        self._pending.extend(pages)
+        self._pending_ids.append(follower_id)
+        if len(self._pending_ids) < self.executor.batch_sz:
+            return []
+        return await self.flush()
+
+
+    async def merge_followed_ids(self, follower_id: str, followed_ids: list = None) -> list:
+        """
+        Merges the followings that another worker fetched for follower_id, like submit_followings; followed_ids is
+        None when that worker's skip filter skipped the follower.
+        """
+        if followed_ids is None:
+            if follower_id not in self.processed_ids:
+                self.processed_ids.add(follower_id)
+                self.num_skipped += 1
+            return []
+        return await self.submit_followings([[{'to_id': uid} for uid in followed_ids]], follower_id)
+
+
+    async def flush(self, remainder=False) -> list:
+        batch, self._pending = self._pending, []
+        batch_ids, self._pending_ids = self._pending_ids, []
+        if batch:
+            counts = await self.executor.run(count_followings, batch)
+            self.folnet.add_pages(batch, counts=counts)
+            self.processed_ids.update(batch_ids)
+        return self.new_candidate_batches(remainder)
+
+
     def new_candidate_batches(self, remainder=False) -> list:
-        new_candidates = self.folnet.mutual_followings.keys() - self.batch_history
-        batches = self.batchify(list(new_candidates), remainder)
+        new_candidates = list(self.folnet.mutual_followings.keys() - self.batch_history)
+        if self.candidate_filter:
+            # Pruned candidates are settled for this run; only the kept ones wait for a full batch
+            kept = self.candidate_filter(new_candidates)
+            self.batch_history.update(set(new_candidates).difference(kept))
+            new_candidates = kept
+        batches = self.batchify(new_candidates, remainder)
         flat_candidates = batches
         if remainder and batches and isinstance(batches[0], list):
             flat_candidates = [uid for sublist in batches for uid in sublist]
@@ -131,12 +300,14 @@ class FollowNetPipe:
             t.cancel()
 
         # Process any remaining batches
-        remaining_batches = self.new_candidate_batches(remainder=True)
+        remaining_batches = await self.flush(remainder=True)
         if q_out:
             [q_out.put_nowait(batch) for batch in remaining_batches]
 
 
 async def main():
+    from twitch_client import TwitchClient
+    from streamer import StreamerPipe, Streamer
     t = perf_counter()
     some_name = 'emilybarkiss'
     sample_sz = 350
@@ -0,0 +1,171 @@
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, Set
+from follower_network import FollowerNetwork
+from similarity import WalkSim
+
+
+class FollowGraph:
+    """
+    Undirected follow graph stored as sparse adjacency sets.  A single instance is meant to be shared between
+    streamers so that every follow edge fetched for one recommendation is reused by the next one.
+    """
+
+    def __init__(self) -> None:
+        self.adj: Dict[str, Set[str]] = defaultdict(set)
+        self.followed: Set[str] = set()
+        self.num_edges = 0
+
+
+    def __len__(self):
+        return len(self.adj)
+
+
+    def add_edge(self, from_id: str, to_id: str) -> bool:
+        if not from_id or not to_id or from_id == to_id or to_id in self.adj[from_id]:
+            return False
+        self.adj[from_id].add(to_id)
+        self.adj[to_id].add(from_id)
+        self.followed.add(to_id)
+        self.num_edges += 1
+        return True
+
+
+    def add_followings(self, foll_data: list) -> int:
+        return sum(self.add_edge(foll.get('from_id'), foll.get('to_id')) for foll in foll_data)
+
+
+
+class PersonalizedPageRank:
+    """
+    Random walk with restart over a FollowGraph, computed by sparse power iteration.  The previous score vector is
+    kept as a warm start, so recomputing after a few new edges only takes a couple of sweeps.
+    """
+
+    def __init__(self, graph: FollowGraph, restart: float = 0.15, tol: float = 1e-5, max_iter: int = 100) -> None:
+        self.graph = graph
+        self.restart = restart
+        self.tol = tol
+        self.max_iter = max_iter
+        self._seeds = frozenset()
+        self._vector: Dict[str, float] = {}
+        self.num_iter = 0
+
+
+    def _step(self, vector: Dict[str, float], seeds: frozenset) -> Dict[str, float]:
+        result = defaultdict(float)
+        restart_mass = self.restart
+        for uid, mass in vector.items():
+            neighbours = self.graph.adj.get(uid)
+            if not neighbours:
+                # Dangling mass jumps back to the seeds
+                restart_mass += (1 - self.restart) * mass
+                continue
+            share = (1 - self.restart) * mass / len(neighbours)
+            for neighbour in neighbours:
+                result[neighbour] += share
+
+        for seed in seeds:
+            result[seed] += restart_mass / len(seeds)
+
+        return result
+
+
+    def scores(self, seed_ids: Iterable[str]) -> Dict[str, float]:
+        seeds = frozenset(seed_ids)
+        if not seeds:
+            return {}
+        vector = self._vector if seeds == self._seeds else {seed: 1 / len(seeds) for seed in seeds}
+
+        self.num_iter = 0
+        for self.num_iter in range(1, self.max_iter + 1):
+            next_vector = self._step(vector, seeds)
+            delta = sum(abs(mass - vector.get(uid, 0.0)) for uid, mass in next_vector.items())
+            vector = next_vector
+            if delta < self.tol:
+                break
+
+        self._seeds, self._vector = seeds, dict(vector)
+        return self._vector
+
+
+
+class RandomWalkNetwork(FollowerNetwork):
+    """
+    A FollowerNetwork whose candidates are ranked by personalized PageRank from the streamer instead of one-hop
+    co-follow counts.  Followings are still counted, so `followings_counter` stays comparable to the base class.
+
+    Args:
+        graph (FollowGraph):
+            The (possibly shared) follow graph that new edges are added to.
+
+        n_candidates (int):
+            Number of top-scoring followed uids that are exposed as candidates for the live stream checks.
+
+        refresh_ratio (float):
+            Walk scores are recomputed once the graph grew by this fraction of edges since the last computation.
+    """
+
+    def __init__(self, streamer_id: str, min_mutual=3, graph: FollowGraph = None, restart: float = 0.15,
+                 n_candidates: int = 100, refresh_ratio: float = 0.05):
+        super().__init__(streamer_id, min_mutual)
+        self.graph = graph if graph is not None else FollowGraph()
+        self.ppr = PersonalizedPageRank(self.graph, restart=restart)
+        self.n_candidates = n_candidates
+        self.refresh_ratio = refresh_ratio
+        self._scored_edges = -1
+        self._walk_scores = {}
+
+
+    def add_pages(self, pages: list, counts: Counter = None) -> None:
+        super().add_pages(pages, counts)
+        for page in pages:
+            self.graph.add_followings(page)
+            # Every sampled follower follows the streamer, even if that edge was not part of the reply
+            for from_id in {foll.get('from_id') for foll in page}:
+                self.graph.add_edge(from_id, self.streamer_id)
+
+
+    def _stale(self) -> bool:
+        new_edges = self.graph.num_edges - self._scored_edges
+        return self._scored_edges < 0 or new_edges > self.refresh_ratio * self._scored_edges
+
+
+    def walk_scores(self, force: bool = False) -> dict:
+        """ Walk scores of followed uids (excluding the streamer), highest first. """
+        if force or self._stale():
+            scores = self.ppr.scores([self.streamer_id])
+            ranked = sorted(((uid, score) for uid, score in scores.items()
+                             if uid in self.graph.followed and uid != self.streamer_id),
+                            key=lambda item: item[1], reverse=True)
+            self._walk_scores = dict(ranked)
+            self._scored_edges = self.graph.num_edges
+
+        return self._walk_scores
+
+
+    @property
+    def mutual_followings(self) -> dict:
+        top_uids = list(self.walk_scores())[:self.n_candidates]
+        return {uid: self.followings_counter.get(uid, 0) for uid in top_uids}
+
+
+    def similarities(self, live_uid_total_followers: dict, num_collected: int, n_best: int = 10):
+        return WalkSim(self.walk_scores(force=True), live_uid_total_followers, num_collected, n_best)
+
+
+
+def main():
+    graph = FollowGraph()
+    folnet = RandomWalkNetwork('streamer', graph=graph, n_candidates=5)
+    folnet.add_followings([{'from_id': 'a', 'to_id': 'x'}, {'from_id': 'a', 'to_id': 'y'},
+                           {'from_id': 'b', 'to_id': 'x'}, {'from_id': 'c', 'to_id': 'z'}])
+    # Edges fetched for another streamer are reused by the walk
+    graph.add_followings([{'from_id': 'd', 'to_id': 'z'}, {'from_id': 'd', 'to_id': 'w'}])
+
+    print(f'Walk scores:  {folnet.walk_scores(force=True)}')
+    print(f'Candidates:   {folnet.mutual_followings}')
+    print(f'Iterations:   {folnet.ppr.num_iter}')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import heapq
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, Tuple, Union
+
+
+class SpaceSaving(Mapping):
+    """
+    Space-Saving heavy-hitter counter (Metwally et al.): tracks at most `capacity` uids, so memory is bounded by
+    the capacity instead of the number of distinct uids counted.  A new uid arriving while the counter is full
+    replaces the uid with the smallest count and inherits that count as its overestimation error.
+
+    Guarantees, with N the total of all increments:
+      * a tracked uid's true count lies in [count - error, count], and error <= N / capacity;
+      * an untracked uid's true count is at most `min_count`, so every uid counted more than min_count times is
+        tracked.
+
+    It reads like the collections.Counter it stands in for: get(), items(), pop(), update() with an iterable or a
+    mapping of increments, and dict(counter).
+    """
+
+    def __init__(self, capacity: int) -> None:
+        if capacity < 1:
+            raise ValueError('A Space-Saving counter needs a capacity of at least 1.')
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.total = 0
+        self.num_evicted = 0
+        # The largest count evicted so far; an uid that was evicted may have been counted up to this many times
+        self.floor = 0
+        self._heap = []
+
+
+    def __getitem__(self, uid: str) -> int:
+        return self.counts[uid]
+
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.counts)
+
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+
+    def __repr__(self):
+        top = dict(self.most_common(10))
+        return f'{self.__class__.__name__}(capacity={self.capacity}, total={self.total}, top={top})'
+
+
+    @property
+    def min_count(self) -> int:
+        """ Upper bound on the true count of any untracked uid; 0 until the counter first fills up. """
+        if len(self.counts) < self.capacity:
+            return self.floor
+        return max(self.floor, self._min()[0])
+
+
+    def error(self, uid: str) -> int:
+        return self.errors.get(uid, 0)
+
+
+    def bounds(self, uid: str) -> Tuple[int, int]:
+        """ (lower, upper) bounds on the true count of uid. """
+        if uid in self.counts:
+            return self.counts[uid] - self.errors[uid], self.counts[uid]
+        return 0, self.min_count
+
+
+    def _min(self) -> Tuple[int, str]:
+        # Heap entries go stale when a count grows or a uid leaves; they are dropped lazily
+        heap, counts = self._heap, self.counts
+        while heap[0][0] != counts.get(heap[0][1]):
+            heapq.heappop(heap)
+        return heap[0]
+
+
+    def _push(self, uid: str, count: int) -> None:
+        heapq.heappush(self._heap, (count, uid))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(count, uid) for uid, count in self.counts.items()]
+            heapq.heapify(self._heap)
+
+
+    def add(self, uid: str, increment: int = 1) -> None:
+        self.total += increment
+        counts = self.counts
+        if uid in counts:
+            counts[uid] += increment
+        elif len(counts) < self.capacity:
+            # Only a pop() frees a slot once the counter was full; the uid may have been evicted before
+            counts[uid], self.errors[uid] = self.floor + increment, self.floor
+        else:
+            min_count, min_uid = self._min()
+            heapq.heappop(self._heap)
+            del counts[min_uid], self.errors[min_uid]
+            counts[uid], self.errors[uid] = min_count + increment, min_count
+            self.floor = max(self.floor, min_count)
+            self.num_evicted += 1
+        self._push(uid, counts[uid])
+
+
+    def update(self, items: Union[Iterable[str], Mapping] = None) -> None:
+        if items is None:
+            return
+        if isinstance(items, Mapping):
+            for uid, increment in items.items():
+                self.add(uid, increment)
+        else:
+            for uid in items:
+                self.add(uid)
+
+
+    def pop(self, uid: str, default=None):
+        if uid not in self.counts:
+            return default
+        self.errors.pop(uid)
+        return self.counts.pop(uid)
+
+
+    def load(self, counts: Mapping, errors: Mapping, floor: int = 0, total: int = None) -> None:
+        """ Replaces the content with saved counts and errors, e.g. from a checkpoint, keeping the bounds valid. """
+        if len(counts) > self.capacity:
+            raise ValueError(f'Cannot load {len(counts)} counts into a capacity of {self.capacity}.')
+        self.counts = dict(counts)
+        self.errors = {uid: errors.get(uid, 0) for uid in self.counts}
+        self.floor = floor
+        self.total = sum(self.counts.values()) if total is None else total
+        self._heap = [(count, uid) for uid, count in self.counts.items()]
+        heapq.heapify(self._heap)
+
+
+    def retain(self, uids: Iterable[str]) -> None:
+        """ Stops tracking every uid not in uids; the floor rises to the largest count dropped, so bounds stay valid. """
+        keep = set(uids)
+        self.floor = max([self.floor] + [count for uid, count in self.counts.items() if uid not in keep])
+        self.counts = {uid: count for uid, count in self.counts.items() if uid in keep}
+        self.errors = {uid: self.errors[uid] for uid in self.counts}
+        self._heap = [(count, uid) for uid, count in self.counts.items()]
+        heapq.heapify(self._heap)
+
+
+    def most_common(self, n: int = None) -> list:
+        ranked = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)
+        return ranked if n is None else ranked[:n]
@@ -0,0 +1,70 @@
+import os
+import subprocess
+import sys
+from statistics import median
+from time import perf_counter
+from colors import Col
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+MODULES = ['recommendation', 'recommendation_pipeline', 'live_stream_info', 'follower_network', 'streamer',
+           'bot_detection', 'similarity', 'twitch_client']
+
+
+def _run(code: str, *flags: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *flags, '-c', code], cwd=SRC_DIR, capture_output=True, text=True)
+
+
+def cold_start(module: str, runs: int = 7) -> float:
+    """ Median wall time (sec) of a fresh interpreter importing `module`, minus that of an empty interpreter. """
+    def timed(code):
+        samples = []
+        for _ in range(runs):
+            t = perf_counter()
+            _run(code)
+            samples.append(perf_counter() - t)
+        return median(samples)
+
+    return max(0.0, timed(f'import {module}') - timed('pass'))
+
+
+def _parse_importtime(stderr: str) -> dict:
+    cumulative = {}
+    for line in stderr.splitlines():
+        if line.startswith('import time:') and '|' in line and 'cumulative' not in line:
+            _, cum_us, name = (part.strip() for part in line[len('import time:'):].split('|'))
+            cumulative[name] = int(cum_us)
+    return cumulative
+
+
+def import_profile(module: str, top: int = 5) -> dict:
+    """
+    Cumulative import time (us) of `module` and its `top` most expensive imports, from `python -X importtime`.
+    Returns an 'error' entry instead when the module cannot be imported in this environment.
+    """
+    proc = _run(f'import {module}', '-X', 'importtime')
+    if proc.returncode:
+        return {'error': proc.stderr.strip().splitlines()[-1]}
+
+    # Interpreter start-up imports (site, encodings, ...) are paid by every process and are not ours to reduce
+    startup = _parse_importtime(_run('pass', '-X', 'importtime').stderr)
+    cumulative = _parse_importtime(proc.stderr)
+    slowest = sorted(((name, us) for name, us in cumulative.items() if name != module and name not in startup),
+                     key=lambda item: item[1], reverse=True)
+    return {'total_us': cumulative.get(module, 0), 'slowest': slowest[:top]}
+
+
+def main(modules=None, runs: int = 7):
+    print(f'{Col.bold}{Col.cyan}<<<<< Import Benchmark (python {sys.version.split()[0]}, runs={runs}){Col.end}')
+    for module in modules or MODULES:
+        profile = import_profile(module)
+        if 'error' in profile:
+            print(f'{Col.red}{module:>24}  not importable here: {profile["error"]}{Col.end}')
+            continue
+        wall_ms = cold_start(module, runs) * 1000
+        print(f'{Col.white}{module:>24}  cold start {wall_ms:7.2f} ms   importtime {profile["total_us"] / 1000:7.2f} ms{Col.end}')
+        for name, us in profile['slowest']:
+            print(f'{"":>28}{name:<28} {us / 1000:7.2f} ms')
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or None)
@@ -1,26 +1,30 @@
+from __future__ import annotations
 import asyncio
-from time import perf_counter
-from typing import List
-from dateutil.parser import parse as dt_parse
-from datetime import datetime as datetime
-from pytz import utc
-from twitch_client import TwitchClient
-from streamer import StreamerPipe, Streamer
-from follower_network import FollowNetPipe, FollowerNetwork
+from time import perf_counter, time
+from typing import List, TYPE_CHECKING
+from datetime import datetime as datetime, timezone
+from executor import StageExecutor
 from colors import Col
-from dataclasses import dataclass, field
+from dataclasses import dataclass
+
+if TYPE_CHECKING:
+    from twitch_client import TwitchClient
+    from stream_profiles import StreamProfiles
+    from streamer import StreamerPipe
+    from follower_network import FollowNetPipe
 
 
 @dataclass
 class LiveStreams:
     data:       dict
     lang:       str
-    init_time:  datetime = field(default=datetime.now(utc))
+    init_time:  datetime
 
 
     def __init__(self, data: dict = None, lang='en'):
         self.data = data or {}
         self.lang = lang
+        self.init_time = datetime.now(timezone.utc)
 
 
     @staticmethod
@@ -37,27 +41,35 @@ class LiveStreams:
 
     @staticmethod
     def parse_duration(twitch_time: str, base_time: datetime) -> dict:
+        from dateutil.parser import parse as dt_parse
         diff = (base_time - dt_parse(twitch_time)).total_seconds()
         result = {'stream_duration': f'{int(diff // 3600)}hr {int((diff % 3600) // 60)} min'}
         return result
 
 
     def list_filter_language(self, livestream_list: list, lang: str = None) -> list:
+        if not (lang or self.lang):
+            return livestream_list
         return [ls for ls in livestream_list if ls.get('language') == (lang or self.lang)]
 
 
-    def add_uid_tot_followers(self, uid: str, total_followers):
+    def add_uid_tot_followers(self, uid: str, total_followers, fetched_at: float = None):
         if self.data.get(uid, None):
-            self.data[uid].update({'total_followers': total_followers})
+            self.data[uid].update({'total_followers': total_followers, 'total_followers_at': fetched_at or time()})
+
+
+    @staticmethod
+    def prepare_list(livestream_list: list, base_time: datetime) -> dict:
+        """ Parses stream durations and keys the streams by uid; pure so that it can run on an executor. """
+        livestream_list = LiveStreams.list_apply_stream_duration(livestream_list, base_time)
+        return LiveStreams.dictify_list(livestream_list)
 
 
     def update_from_list(self, livestream_list: list, initial_time=None):
         base_time = initial_time or self.init_time
         if livestream_list:
             # livestream_list = self.list_filter_language(livestream_list)
-            livestream_list = LiveStreams.list_apply_stream_duration(livestream_list, base_time)
-            ls_dict = LiveStreams.dictify_list(livestream_list)
-            self.data.update(ls_dict)
+            self.data.update(LiveStreams.prepare_list(livestream_list, base_time))
 
 
     def get(self, data_key) -> dict:
@@ -69,15 +81,33 @@ class LiveStreams:
         return {uid: attrs.get('total_followers') for uid, attrs in self.data.items()}
 
 
+    @property
+    def total_followers_at(self) -> dict:
+        """ When each total was fetched (epoch sec); None for totals saved before fetch times were recorded. """
+        return {uid: attrs.get('total_followers_at') for uid, attrs in self.data.items()}
+
+
 
 class LiveStreamPipe:
     live_streams:       LiveStreams
-    fetched_batches:    List[str] = []
+    fetched_batches:    List[str]
+    failed_batches:     List[str]
     num_ls_reqs:        int = 0
 
 
-    def __init__(self, live_streams: LiveStreams = None, lang_filter: str = 'en') -> None:
+    def __init__(self, live_streams: LiveStreams = None, lang_filter: str = 'en', follower_index=None,
+                 executor: StageExecutor = None, game_id: str = None, profiles: StreamProfiles = None,
+                 totals_max_age: float = 86_400.0) -> None:
         self.live_streams = live_streams or LiveStreams(lang=lang_filter)
+        self.follower_index = follower_index
+        self.game_id = game_id
+        self.profiles = profiles
+        self.executor = executor or StageExecutor()
+        self.fetched_batches = []
+        self.failed_batches = []
+        # uid -> (total followers, fetched at); reused by revalidations until totals_max_age (sec) old
+        self.totals_max_age = totals_max_age
+        self.known_totals = {}
 
 
     def __repr__(self):
@@ -91,6 +121,8 @@ class LiveStreamPipe:
         result += f'{Col.white}  * Calls to Twitch: {self.num_ls_reqs}{Col.end}\n'
         result += f'{Col.orange} > Total Fetched Batches (sz={len(self.fetched_batches)}):{Col.end}\n'
         result += f'     {self.fetched_batches}\n'
+        result += f'{Col.orange} > Failed Batches (sz={len(self.failed_batches)}):{Col.end}\n'
+        result += f'     {self.failed_batches}\n'
         result += f'{Col.orange} > Live Streams (sz={len(self.live_streams.data)}):{Col.end}\n'
         result += f'     {self.live_streams}\n'
         tot_followers = [{f'uid: {uid}': f'tot: {details.get("total_followers")}'} for uid, details in self.live_streams.data.items()]
@@ -114,33 +146,90 @@ class LiveStreamPipe:
     #     [t.cancel() for t in t_total]
 
 
+    def prune(self, candidates: list) -> list:
+        """ Drops candidates whose cached profile rules out the requested language or game. """
+        if self.profiles is None:
+            return candidates
+        return self.profiles.prune(candidates, self.live_streams.lang, self.game_id)
+
+
     async def fetch_live_streams(self, tc: TwitchClient, candidates) -> list:
         self.num_ls_reqs += 1
-        return await tc.get_streams(channels=candidates)
+        if self.profiles is not None:
+            # Profiles only learn that a channel streams in another language or game from unfiltered replies
+            return await tc.get_streams(channels=candidates)
+        # Filtering server-side keeps replies down to the streams that can actually be recommended
+        return await tc.get_streams(channels=candidates, language=self.live_streams.lang or None,
+                                    game_id=self.game_id)
+
+
+    def filter_streams(self, livestream_list: list) -> list:
+        """ Keeps the streams in the requested language and game, for replies that were not filtered server-side. """
+        livestream_list = self.live_streams.list_filter_language(livestream_list)
+        if self.game_id:
+            livestream_list = [ls for ls in livestream_list if ls.get('game_id') == self.game_id]
+        return livestream_list
+
+
+    def remember_totals(self, now: float = None) -> None:
+        """ Keeps the totals of the current live streams for the next revalidation, and forgets the stale ones. """
+        now = now or time()
+        live_streams = self.live_streams
+        fetched_at = live_streams.total_followers_at
+        self.known_totals.update({uid: (total, fetched_at[uid]) for uid, total in live_streams.total_followers.items()
+                                  if total is not None and fetched_at[uid] is not None})
+        self.known_totals = {uid: known for uid, known in self.known_totals.items()
+                             if now - known[1] < self.totals_max_age}
+
+
+    async def fetch_total_followers(self, tc: TwitchClient, live_streamer_uid: str) -> int:
+        if live_streamer_uid in self.known_totals:
+            return self.known_totals[live_streamer_uid][0]
+        # Known audiences from the reverse index stand in for the total, saving a /users/follows?to_id= call; only
+        # set for scorers that rank by known audiences, since they undercount the true total
+        if self.follower_index is not None:
+            return self.follower_index.known_followers(live_streamer_uid)
+        return await tc.get_total_followers(int(live_streamer_uid))
 
 
     async def produce_live_streams(self, tc: TwitchClient, q_in: asyncio.Queue, q_out: asyncio.Queue = None):
         while True:
             candidate_batch = await q_in.get()
-            self.fetched_batches.extend(candidate_batch)
-            found_live_streams_list = await self.fetch_live_streams(tc, candidate_batch)
-            if found_live_streams_list := self.live_streams.list_filter_language(found_live_streams_list):
-                self.live_streams.update_from_list(found_live_streams_list)
-                if q_out:
-                    [q_out.put_nowait(stream.get('user_id')) for stream in found_live_streams_list]
-
-            q_in.task_done()
+            try:
+                found_live_streams_list = await self.fetch_live_streams(tc, candidate_batch)
+            except Exception:
+                self.failed_batches.extend(candidate_batch)
+            else:
+                self.fetched_batches.extend(candidate_batch)
+                if self.profiles is not None:
+                    self.profiles.observe(found_live_streams_list)
+                if found_live_streams_list := self.filter_streams(found_live_streams_list):
+                    ls_dict = await self.executor.run(LiveStreams.prepare_list, found_live_streams_list,
+                                                      self.live_streams.init_time)
+                    self.live_streams.data.update(ls_dict)
+                    if q_out:
+                        [q_out.put_nowait(stream.get('user_id')) for stream in found_live_streams_list]
+            finally:
+                q_in.task_done()
 
 
     async def consume_live_streams(self, tc: TwitchClient, q_in: asyncio.Queue, q_out: asyncio.Queue = None):
         while True:
             live_streamer_uid = await q_in.get()
-            total_followers = await tc.get_total_followers(int(live_streamer_uid))
-            self.live_streams.get(live_streamer_uid).update({'total_followers': total_followers})
-
-            if q_out:
+            try:
+                total_followers = await self.fetch_total_followers(tc, live_streamer_uid)
+            except Exception:
+                # Leave total_followers unset; the uid is then left out of the similarity scores
                 pass
-            q_in.task_done()
+            else:
+                # A reused total keeps its original fetch time, so it still ages out
+                fetched_at = self.known_totals.get(live_streamer_uid, (None, None))[1]
+                self.live_streams.add_uid_tot_followers(live_streamer_uid, total_followers, fetched_at)
+
+                if q_out:
+                    pass
+            finally:
+                q_in.task_done()
 
 
 async def run(tc: TwitchClient, str_pipe: StreamerPipe, folnet_pipe: FollowNetPipe, ls_pipe: LiveStreamPipe, n_consumers=50):
@@ -160,7 +249,7 @@ async def run(tc: TwitchClient, str_pipe: StreamerPipe, folnet_pipe: FollowNetPi
 
     # Folnet: follower's followings
     await q_foll_ids.join()
-    [q_followings.put_nowait(batch) for batch in folnet_pipe.new_candidate_batches(remainder=True)]
+    [q_followings.put_nowait(batch) for batch in await folnet_pipe.flush(remainder=True)]
     [t.cancel() for t in t_followings]
 
     # LiveStreams
@@ -174,6 +263,9 @@ async def run(tc: TwitchClient, str_pipe: StreamerPipe, folnet_pipe: FollowNetPi
 
 async def main():
     from datetime import datetime
+    from twitch_client import TwitchClient
+    from streamer import StreamerPipe, Streamer
+    from follower_network import FollowNetPipe, FollowerNetwork
     t = perf_counter()
     some_name = 'emilybarkiss'
     sample_sz = 300
@@ -0,0 +1,175 @@
+import asyncio
+import gc
+import random
+import tracemalloc
+from dataclasses import dataclass, field
+from statistics import quantiles
+from time import perf_counter
+from typing import Dict, List, Tuple
+from recommendation import Recommendation
+from fake_twitch import FakeGraph, FakeHTTP, FakeTwitchClient
+from colors import Col
+
+
+@dataclass
+class RoundReport:
+    n_requests:     int
+    n_failed:       int
+    elapsed:        float
+    latencies:      List[float]
+    api_calls:      int
+    mem_current:    int
+    mem_peak:       int
+    mismatched:     List[str] = field(default_factory=list)
+
+
+    @property
+    def throughput(self) -> float:
+        return (self.n_requests - self.n_failed) / self.elapsed if self.elapsed else 0.0
+
+
+    def percentile(self, pct: int) -> float:
+        if len(self.latencies) < 2:
+            return self.latencies[0] if self.latencies else 0.0
+        return quantiles(self.latencies, n=100, method='inclusive')[pct - 1]
+
+
+
+class LoadTest:
+    """
+    Drives many concurrent recommendations through one process and one shared client, against a FakeHTTP backend,
+    the way a server handling user requests would.  Streamers are requested with Zipf-distributed popularity, so
+    the same streamer is often in flight several times at once.
+
+    Every streamer is first run alone to get its reference result; each concurrent request must reproduce it
+    exactly, otherwise state leaked between requests and the streamer is reported as mismatched.  Each round
+    reports throughput, latency percentiles and API calls from an untraced pass, then peak memory and the memory
+    still held after a full collection from a second, traced pass over the same requests: tracemalloc slows the
+    pipeline severalfold, so it must not run while latency is measured.  Memory a round's requests leave behind
+    shows up as a leak.
+
+    Args:
+        concurrency (int):
+            Requests in flight at any time.
+
+        rounds (int):
+            Waves of `n_requests` requests each.
+
+        rec_kwargs (dict):
+            Recommendation parameters, e.g. sample_sz and max_followings.
+    """
+
+    def __init__(self, http: FakeHTTP, streamer_names: List[str], n_requests: int = 50, concurrency: int = 10,
+                 rounds: int = 3, n_consumers: int = 20, seed: int = 0, rec_kwargs: dict = None) -> None:
+        self.http = http
+        self.streamer_names = streamer_names
+        self.n_requests = n_requests
+        self.concurrency = concurrency
+        self.rounds = rounds
+        self.n_consumers = n_consumers
+        self.rng = random.Random(seed)
+        self.rec_kwargs = rec_kwargs or {}
+        self.references: Dict[str, dict] = {}
+        self.reports: List[RoundReport] = []
+
+
+    async def recommend(self, tc: FakeTwitchClient, streamer_name: str) -> Tuple[float, dict]:
+        rec = Recommendation(streamer_name, **self.rec_kwargs)
+        t = perf_counter()
+        await rec.run(tc, self.n_consumers)
+        return perf_counter() - t, rec.ranked_sims(n_best=None)
+
+
+    async def reference(self, tc: FakeTwitchClient) -> None:
+        for name in self.streamer_names:
+            _, self.references[name] = await self.recommend(tc, name)
+
+
+    async def _gather(self, tc: FakeTwitchClient, requested: List[str]) -> list:
+        limit = asyncio.Semaphore(self.concurrency)
+
+        async def limited(name):
+            async with limit:
+                return await self.recommend(tc, name)
+
+        return await asyncio.gather(*map(limited, requested), return_exceptions=True)
+
+
+    async def run_round(self, tc: FakeTwitchClient) -> RoundReport:
+        weights = [1 / rank for rank in range(1, len(self.streamer_names) + 1)]
+        requested = self.rng.choices(self.streamer_names, weights, k=self.n_requests)
+        calls_before = self.http.count_success_resp
+
+        gc.collect()
+        t = perf_counter()
+        results = await self._gather(tc, requested)
+        elapsed = perf_counter() - t
+        api_calls = self.http.count_success_resp - calls_before
+
+        latencies, mismatched = [], []
+        for name, result in zip(requested, results):
+            if isinstance(result, BaseException):
+                continue
+            latency, sims = result
+            latencies.append(latency)
+            if sims != self.references.get(name):
+                mismatched.append(name)
+
+        gc.collect()
+        tracemalloc.start()
+        try:
+            await self._gather(tc, requested)
+            gc.collect()
+            mem_current, mem_peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return RoundReport(n_requests=len(requested), n_failed=len(requested) - len(latencies), elapsed=elapsed,
+                           latencies=latencies, api_calls=api_calls, mem_current=mem_current, mem_peak=mem_peak,
+                           mismatched=mismatched)
+
+
+    async def run(self) -> List[RoundReport]:
+        tc = FakeTwitchClient(self.http)
+        await self.reference(tc)
+        for _ in range(self.rounds):
+            self.reports.append(await self.run_round(tc))
+        return self.reports
+
+
+    @property
+    def isolated(self) -> bool:
+        return not any(report.mismatched for report in self.reports)
+
+
+    @property
+    def display(self, result=''):
+        result += f'{Col.bold}{Col.cyan}<<<<< Load Test: {self.n_requests} requests x {self.rounds} rounds, '
+        result += f'concurrency {self.concurrency}{Col.end}\n'
+        for idx, report in enumerate(self.reports, 1):
+            result += f'{Col.white}  * Round {idx}: {report.throughput:6.2f} req/s   '
+            result += f'p50 {report.percentile(50):6.2f}s  p95 {report.percentile(95):6.2f}s  '
+            result += f'p99 {report.percentile(99):6.2f}s   calls {report.api_calls:>6}   '
+            result += f'held {report.mem_current / 2**20:7.2f} MiB (peak {report.mem_peak / 2**20:7.2f} MiB)   '
+            result += f'failed {report.n_failed}{Col.end}\n'
+        if self.reports:
+            held = sum(report.mem_current for report in self.reports)
+            result += f'{Col.white}  * Memory held after all rounds: {held / 2**20:.2f} MiB{Col.end}\n'
+        mismatched = sorted({name for report in self.reports for name in report.mismatched})
+        color = Col.green if not mismatched else Col.red
+        result += f'{color} > Results isolated: {not mismatched} (mismatched: {mismatched}){Col.end}\n'
+        return print(result)
+
+
+
+async def main():
+    graph = FakeGraph.random(n_streamers=500, n_viewers=20_000)
+    http = FakeHTTP(graph, latency=0.08, time_scale=0.05)
+    streamer_names = [f'streamer_{uid}' for uid in range(1, 21)]
+    load_test = LoadTest(http, streamer_names, n_requests=40, concurrency=10, rounds=3,
+                         rec_kwargs={'sample_sz': 300, 'max_followings': 150})
+    await load_test.run()
+    load_test.display
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,246 @@
+from __future__ import annotations
+import asyncio
+import copy
+import json
+import os
+from math import exp, log
+from time import monotonic, time
+from typing import Dict, List, TYPE_CHECKING
+from recommendation import Recommendation
+from colors import Col
+
+if TYPE_CHECKING:
+    from twitch_client import TwitchClient
+
+
+class RequestStats:
+    """
+    Exponentially decayed request counts per streamer name, so that "hot" reflects recent demand rather than all-time
+    totals.  A request counts as 1 now and as 0.5 after `half_life` seconds.
+    """
+
+    def __init__(self, half_life: float = 6 * 3600, path: str = None, min_score: float = 0.01) -> None:
+        self.decay = log(2) / half_life
+        self.path = path
+        self.min_score = min_score
+        self.scores: Dict[str, float] = {}
+        self.updated: Dict[str, float] = {}
+        if path:
+            self.load()
+
+
+    def _decayed(self, name: str, now: float) -> float:
+        return self.scores.get(name, 0.0) * exp(-self.decay * (now - self.updated.get(name, now)))
+
+
+    def record(self, streamer_name: str, now: float = None) -> None:
+        now = time() if now is None else now
+        name = streamer_name.lower()
+        self.scores[name] = self._decayed(name, now) + 1
+        self.updated[name] = now
+
+
+    def hottest(self, n: int = 10, now: float = None) -> List[str]:
+        now = time() if now is None else now
+        ranked = sorted(self.scores, key=lambda name: self._decayed(name, now), reverse=True)
+        return ranked[:n]
+
+
+    def prune(self, now: float = None) -> None:
+        """ Forgets streamers whose decayed score fell below min_score, i.e. that were not requested in a long time. """
+        now = time() if now is None else now
+        for name in [name for name in self.scores if self._decayed(name, now) < self.min_score]:
+            del self.scores[name], self.updated[name]
+
+
+    def load(self) -> None:
+        try:
+            with open(self.path) as f:
+                self.scores, self.updated = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError, ValueError):
+            pass
+
+
+    def save(self) -> None:
+        self.prune()
+        if self.path:
+            # Write-then-rename so that a crash mid-write leaves the previous stats intact
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump([self.scores, self.updated], f)
+            os.replace(tmp_path, self.path)
+
+
+
+class BudgetSlice:
+    """
+    Limits background traffic to a share of the API rate budget.  Calls are paced by a local token bucket refilled at
+    `share` of the app's rate, and additionally held back whenever the shared Twitch bucket drops below the part
+    reserved for interactive requests.
+
+    Args:
+        share (float):
+            Fraction of the rate limit that background work may use.
+
+        rate_limit (int):
+            The app's request budget per `period` seconds (800/min for Helix).
+    """
+
+    def __init__(self, share: float = 0.2, rate_limit: int = 800, period: float = 60.0, poll: float = 0.5) -> None:
+        self.share = share
+        self.rate_limit = rate_limit
+        self.capacity = max(1.0, share * rate_limit)
+        self.refill_rate = self.capacity / period
+        self.poll = poll
+        self.tokens = self.capacity
+        self._last = monotonic()
+        self.num_calls = 0
+        self.num_waits = 0
+
+
+    def _refill(self) -> None:
+        now = monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._last) * self.refill_rate)
+        self._last = now
+
+
+    def _reserved(self, tc) -> bool:
+        bucket = getattr(tc.http, '_bucket', None)
+        tokens = getattr(bucket, 'tokens', None)
+        return tokens is not None and tokens < (1 - self.share) * self.rate_limit
+
+
+    async def acquire(self, tc) -> None:
+        while True:
+            self._refill()
+            if self.tokens >= 1 and not self._reserved(tc):
+                self.tokens -= 1
+                self.num_calls += 1
+                return
+            self.num_waits += 1
+            await asyncio.sleep(self.poll)
+
+
+    def gate(self, tc: TwitchClient) -> TwitchClient:
+        """
+        A copy of the client whose HTTP requests wait for this budget slice.  The copy shares the client's session,
+        bucket and retrier; the client itself is left ungated for interactive requests.
+        """
+        gated = copy.copy(tc)
+        gated.http = GatedHTTP(tc.http, self, tc)
+        return gated
+
+
+
+class GatedHTTP:
+    """ Stands in for a client's HTTP layer; request() and get_streams() first wait for a BudgetSlice. """
+
+    def __init__(self, http, budget: BudgetSlice, tc: TwitchClient) -> None:
+        self._http = http
+        self._budget = budget
+        self._tc = tc
+
+
+    def __getattr__(self, name):
+        return getattr(self._http, name)
+
+
+    async def request(self, *args, **kwargs):
+        await self._budget.acquire(self._tc)
+        return await self._http.request(*args, **kwargs)
+
+
+    async def get_streams(self, **kwargs):
+        await self._budget.acquire(self._tc)
+        return await self._http.get_streams(**kwargs)
+
+
+
+class PrewarmScheduler:
+    """
+    Periodically refreshes the saved recommendation state of the most requested streamers, so that their first
+    interactive request of the day is served from a warm refresh.  Warming runs the regular Recommendation pipeline
+    (StreamerPipe, FollowNetPipe and LiveStreamPipe) on a dedicated client whose requests are gated by a BudgetSlice.
+
+    Args:
+        stats (RequestStats):
+            Request frequencies; the `top_n` hottest streamers are warmed each round.
+
+        state_store (StateStore):
+            Where warmed states are saved; interactive requests must use the same store.
+
+        rec_kwargs (dict):
+            Recommendation parameters (sample_sz, max_followings, min_mutual) that interactive requests use, so that
+            warmed states match them.
+    """
+
+    def __init__(self, stats: RequestStats, state_store, budget: BudgetSlice = None, top_n: int = 10,
+                 interval: float = 15 * 60, min_age: float = 10 * 60, n_consumers: int = 10,
+                 rec_kwargs: dict = None) -> None:
+        self.stats = stats
+        self.state_store = state_store
+        self.budget = budget or BudgetSlice()
+        self.top_n = top_n
+        self.interval = interval
+        self.min_age = min_age
+        self.n_consumers = n_consumers
+        self.rec_kwargs = rec_kwargs or {}
+        self.num_warmed = 0
+        self.failed: Dict[str, str] = {}
+
+
+    def due(self, streamer_name: str, now: float = None) -> bool:
+        state = self.state_store.load(streamer_name)
+        return state is None or (now or time()) - state.updated_at >= self.min_age
+
+
+    async def warm(self, tc: TwitchClient, streamer_name: str) -> bool:
+        rec = Recommendation(streamer_name, state_store=self.state_store, **self.rec_kwargs)
+        return await rec.run(tc, self.n_consumers, refresh=True)
+
+
+    async def run_once(self, tc: TwitchClient) -> List[str]:
+        warmed = []
+        for name in self.stats.hottest(self.top_n):
+            if not self.due(name):
+                continue
+            try:
+                await self.warm(tc, name)
+            except Exception as err:
+                self.failed[name] = repr(err)
+            else:
+                self.failed.pop(name, None)
+                warmed.append(name)
+                self.num_warmed += 1
+        return warmed
+
+
+    async def run(self, tc: TwitchClient = None) -> None:
+        """
+        Warms forever; cancel the task to stop.  A dedicated client is created, and closed on stop, unless one is
+        given; a given client is only used through a gated copy and is left open.
+        """
+        from twitch_client import TwitchClient
+        own_client = tc is None
+        tc = tc or TwitchClient()
+        try:
+            gated = self.budget.gate(tc)
+            while True:
+                await self.run_once(gated)
+                self.stats.save()
+                await asyncio.sleep(self.interval)
+        finally:
+            if own_client:
+                await tc.close()
+
+
+    @property
+    def display(self, result=''):
+        result += f'{Col.cyan}<<<<< Prewarm Scheduler {Col.end}\n'
+        result += f'{Col.white}  * Warmed: {self.num_warmed}, Budget calls: {self.budget.num_calls}, '
+        result += f'Budget waits: {self.budget.num_waits}{Col.end}\n'
+        result += f'{Col.cyan} > Hottest (sz={self.top_n}):{Col.end}\n'
+        result += f'     {self.stats.hottest(self.top_n)}\n'
+        result += f'{Col.red} > Failed (sz={len(self.failed)}):{Col.end}\n'
+        result += f'     {self.failed}\n'
+        return print(result)
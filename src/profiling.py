@@ -0,0 +1,254 @@
+import asyncio
+from collections import defaultdict
+from collections.abc import Coroutine
+from contextvars import ContextVar
+from time import perf_counter, thread_time
+from typing import Dict, List
+from dataclasses import dataclass
+from colors import Col
+
+_stage: ContextVar[str] = ContextVar('profiler_stage', default='unstaged')
+
+
+@dataclass
+class CoroStats:
+    stage:      str
+    name:       str
+    num_tasks:  int = 0
+    num_steps:  int = 0
+    wall:       float = 0.0
+    on_loop:    float = 0.0
+    cpu:        float = 0.0
+    max_step:   float = 0.0
+
+
+    @property
+    def off_loop(self) -> float:
+        """ Time spent suspended, i.e. awaiting I/O, queues or the token bucket. """
+        return max(0.0, self.wall - self.on_loop)
+
+
+
+@dataclass
+class SlowCallback:
+    stage:      str
+    name:       str
+    duration:   float
+
+
+
+class _ProfiledCoro(Coroutine):
+    """ Drives a coroutine step by step, timing every resumption; each step is one event-loop callback. """
+
+    def __init__(self, coro, profiler: 'PipelineProfiler', stage: str) -> None:
+        self._coro = coro
+        self._profiler = profiler
+        self._stage = stage
+        self._stats = profiler.coro_stats(stage, getattr(coro, '__qualname__', repr(coro)))
+        self._stats.num_tasks += 1
+        self._started = None
+
+
+    def _step(self, method, *args):
+        if self._started is None:
+            self._started = perf_counter()
+            _stage.set(self._stage)
+        t_wall, t_cpu = perf_counter(), thread_time()
+        try:
+            return method(*args)
+        except BaseException:
+            self._stats.wall += perf_counter() - self._started
+            raise
+        finally:
+            elapsed = perf_counter() - t_wall
+            self._stats.num_steps += 1
+            self._stats.on_loop += elapsed
+            self._stats.cpu += thread_time() - t_cpu
+            self._stats.max_step = max(self._stats.max_step, elapsed)
+            if elapsed >= self._profiler.slow_callback:
+                self._profiler.slow_callbacks.append(SlowCallback(self._stage, self._stats.name, elapsed))
+
+
+    def send(self, value):
+        return self._step(self._coro.send, value)
+
+
+    def throw(self, val):
+        return self._step(self._coro.throw, val)
+
+
+    def close(self):
+        return self._coro.close()
+
+
+    def __await__(self):
+        return self
+
+
+    def __iter__(self):
+        return self
+
+
+    def __next__(self):
+        return self.send(None)
+
+
+
+class PipelineProfiler:
+    """
+    Opt-in profiler for the asyncio pipeline.  Coroutines wrapped with `wrap()` get per-coroutine wall, on-loop and
+    CPU time plus slow-callback warnings tagged with their pipeline stage; `instrument()` splits Twitch request time
+    into token-bucket waits and network time; `monitor_lag()` samples event-loop lag.
+
+    Args:
+        slow_callback (float):
+            A single resumption of a coroutine longer than this (sec) is reported as a slow callback.
+
+        lag_interval (float):
+            How often (sec) the lag monitor wakes up to measure how late the loop scheduled it.
+    """
+
+    def __init__(self, slow_callback: float = 0.05, lag_interval: float = 0.05) -> None:
+        self.slow_callback = slow_callback
+        self.lag_interval = lag_interval
+        self.stats: Dict[tuple, CoroStats] = {}
+        self.slow_callbacks: List[SlowCallback] = []
+        self.lag_samples: List[float] = []
+        self.bucket_wait: Dict[str, float] = defaultdict(float)
+        self.request_time: Dict[str, float] = defaultdict(float)
+        self._lag_task = None
+        self._patched = []
+
+
+    def coro_stats(self, stage: str, name: str) -> CoroStats:
+        return self.stats.setdefault((stage, name), CoroStats(stage, name))
+
+
+    def wrap(self, coro, stage: str) -> _ProfiledCoro:
+        return _ProfiledCoro(coro, self, stage)
+
+
+    def create_task(self, coro, stage: str) -> asyncio.Task:
+        return asyncio.create_task(self.wrap(coro, stage))
+
+
+    def instrument(self, tc) -> None:
+        """
+        Times the client's HTTP requests, and the token-bucket waits inside them, per pipeline stage, until stop().
+        Only request() is timed: twitchio's get_streams() goes through it, so timing both counted /streams twice.
+        Methods that are already timed, by this or another profiler, are left as they are.
+        """
+        http = tc.http
+        self._patch(http, 'request', self.request_time)
+        bucket = getattr(http, '_bucket', None)
+        if bucket is not None:
+            self._patch(bucket, 'wait_reset', self.bucket_wait)
+
+
+    def _patch(self, obj, name: str, totals: Dict[str, float]) -> None:
+        fn = getattr(obj, name, None)
+        if fn is None or getattr(fn, 'profiled', False):
+            return
+        self._patched.append((obj, name, vars(obj).get(name)))
+        setattr(obj, name, self._timed(fn, totals))
+
+
+    def uninstrument(self) -> None:
+        """ Puts back the methods instrument() replaced. """
+        for obj, name, original in reversed(self._patched):
+            if original is None:
+                delattr(obj, name)
+            else:
+                setattr(obj, name, original)
+        self._patched.clear()
+
+
+    @staticmethod
+    def _timed(fn, totals: Dict[str, float]):
+        async def timed(*args, **kwargs):
+            t = perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                totals[_stage.get()] += perf_counter() - t
+        timed.profiled = True
+        return timed
+
+
+    async def _sample_lag(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.lag_interval
+            await asyncio.sleep(self.lag_interval)
+            self.lag_samples.append(max(0.0, loop.time() - expected))
+
+
+    def monitor_lag(self) -> None:
+        self._lag_task = asyncio.create_task(self._sample_lag())
+
+
+    def stop(self) -> None:
+        if self._lag_task:
+            self._lag_task.cancel()
+            self._lag_task = None
+        self.uninstrument()
+
+
+    @property
+    def lag_summary(self) -> dict:
+        if not self.lag_samples:
+            return {'samples': 0, 'mean': 0.0, 'p99': 0.0, 'max': 0.0}
+        ordered = sorted(self.lag_samples)
+        return {'samples': len(ordered),
+                'mean': sum(ordered) / len(ordered),
+                'p99': ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))],
+                'max': ordered[-1]}
+
+
+    def folded(self, root: str = 'pipeline') -> List[str]:
+        """
+        Profile in collapsed-stack format ("frame;frame;frame value" per line, value in microseconds), which
+        flamegraph.pl, speedscope and inferno read directly.  On-loop CPU is attributed to each coroutine; time off the
+        loop is split into token-bucket waits, network time and other waits (queues, sleeps) per stage.
+        """
+        lines = []
+        off_loop = defaultdict(float)
+        for stats in self.stats.values():
+            lines.append(f'{root};{stats.stage};{stats.name};cpu {int(stats.cpu * 1e6)}')
+            lines.append(f'{root};{stats.stage};{stats.name};on_loop_other {int(max(0.0, stats.on_loop - stats.cpu) * 1e6)}')
+            off_loop[stats.stage] += stats.off_loop
+
+        for stage, total in off_loop.items():
+            bucket = self.bucket_wait.get(stage, 0.0)
+            network = max(0.0, self.request_time.get(stage, 0.0) - bucket)
+            lines.append(f'{root};{stage};wait;token_bucket {int(bucket * 1e6)}')
+            lines.append(f'{root};{stage};wait;network {int(network * 1e6)}')
+            lines.append(f'{root};{stage};wait;other {int(max(0.0, total - bucket - network) * 1e6)}')
+
+        return [line for line in lines if not line.endswith(' 0')]
+
+
+    def write_folded(self, path: str, root: str = 'pipeline') -> None:
+        with open(path, 'w') as f:
+            f.write('\n'.join(self.folded(root)) + '\n')
+
+
+    @property
+    def display(self, result=''):
+        lag = self.lag_summary
+        result += f'{Col.magenta}<<<<< Profiler {Col.end}\n'
+        result += (f'{Col.white}  * Loop lag (sec): mean {lag["mean"]:.4f}, p99 {lag["p99"]:.4f}, '
+                   f'max {lag["max"]:.4f} over {lag["samples"]} samples{Col.end}\n')
+        result += f'{Col.magenta} > Coroutines (wall / on-loop / cpu, sec):{Col.end}\n'
+        for stats in sorted(self.stats.values(), key=lambda s: s.cpu, reverse=True):
+            result += (f'     [{stats.stage}] {stats.name} x{stats.num_tasks}: '
+                       f'{stats.wall:.3f} / {stats.on_loop:.3f} / {stats.cpu:.3f}  '
+                       f'(max step {stats.max_step * 1000:.1f} ms)\n')
+        result += f'{Col.magenta} > Requests (token bucket / total, sec):{Col.end}\n'
+        for stage, total in self.request_time.items():
+            result += f'     [{stage}] {self.bucket_wait.get(stage, 0.0):.3f} / {total:.3f}\n'
+        result += f'{Col.red} > Slow callbacks (>= {self.slow_callback * 1000:.0f} ms, sz={len(self.slow_callbacks)}):{Col.end}\n'
+        for slow in self.slow_callbacks:
+            result += f'     [{slow.stage}] {slow.name}: {slow.duration * 1000:.1f} ms\n'
+
+        return print(result)
@@ -1,42 +1,100 @@
+from __future__ import annotations
 import asyncio
 from datetime import datetime as datetime
 from time import perf_counter
-from twitch_client import TwitchClient
+from typing import TYPE_CHECKING
 from streamer import Streamer
 from follower_network import FollowerNetwork
 from live_stream_info import LiveStreams
 from recommendation_pipeline import RecommendationPipeline
-from similarity import JaccardSim
+from refresh import RecommendationState
+from executor import StageExecutor
 from collections import OrderedDict
 from colors import Col
 
+if TYPE_CHECKING:
+    from twitch_client import TwitchClient
+    from profiling import PipelineProfiler
+    from refresh import StateStore
+    from stream_profiles import StreamProfiles
+    from skip_filter import SkipFilter
+    from user_resolver import UserResolver
+    from similarity import SimilarityScore
+
 
 class Recommendation:
     sample_sz:      int = 350
     max_followings: int = 150
     min_mutual:     int = 3
     pipeline:       RecommendationPipeline
-    similarities:   JaccardSim
-
-    def __init__(self, streamer_name: str, sample_sz=300, max_followings=200, min_mutual=3) -> None:
+    similarities:   SimilarityScore
+
+    def __init__(self, streamer_name: str, sample_sz=300, max_followings=200, min_mutual=3,
+                 folnet: FollowerNetwork = None, follower_index=None, profiler: PipelineProfiler = None,
+                 executor: StageExecutor = None, state_store: StateStore = None, request_stats=None,
+                 lang: str = 'en', game_id: str = None, stream_profiles: StreamProfiles = None,
+                 skip_filter: SkipFilter = None, queue_broker=None, user_resolver: UserResolver = None,
+                 max_tracked: int = None, sketches=None, executor_kind: str = None) -> None:
+        self.streamer_name = streamer_name
+        self.state_store = state_store
+        self.request_stats = request_stats
         self.sample_sz = sample_sz
         self.max_followings = max_followings
         self.min_mutual = min_mutual
+        self.follower_index = follower_index
+        # A given executor is the caller's to close; one built from executor_kind is closed after every run
+        self._owns_executor = executor is None and executor_kind is not None
+        self.executor = executor = StageExecutor(executor_kind) if self._owns_executor else executor
 
         self.streamer = Streamer(name=streamer_name)
-        self.folnet = FollowerNetwork(streamer_id=self.streamer.uid, min_mutual=self.min_mutual)
-        self.live_streams = LiveStreams()
+        self.folnet = folnet or FollowerNetwork(streamer_id=self.streamer.uid, min_mutual=self.min_mutual,
+                                                max_tracked=max_tracked)
+        self.live_streams = LiveStreams(lang=lang)
+        self.stream_profiles = stream_profiles
+        self.skip_filter = skip_filter
+        self.user_resolver = user_resolver
 
         self.pipeline = RecommendationPipeline(self.streamer, self.folnet, self.live_streams,
-                                               max_followings=self.max_followings, sample_sz=self.sample_sz)
-
+                                               max_followings=self.max_followings, sample_sz=self.sample_sz,
+                                               follower_index=self.follower_index, profiler=profiler,
+                                               executor=executor, game_id=game_id,
+                                               stream_profiles=stream_profiles, skip_filter=skip_filter,
+                                               queue_broker=queue_broker, sketches=sketches)
+
+
+
+    def ranked_sims(self, n_best: int = 10) -> dict:
+        tot_followers, num_collected = self.live_streams.total_followers, self.pipeline.folnet_pipe.num_collected
+        return self.folnet.similarities(tot_followers, num_collected, n_best).ranked_sim_scores
+
+
+    def columns(self, n_best: int = 10) -> dict:
+        """ Ranked results as equal-length column lists, in the order of export.COLUMNS. """
+        ranked_sims, followings_counter = self.ranked_sims(n_best), self.folnet.followings_counter
+        streams = [self.live_streams.get(uid) or {} for uid in ranked_sims]
+        n_rows = len(ranked_sims)
+        return {
+            'streamer_id':      [self.streamer.uid] * n_rows,
+            'streamer_name':    [self.streamer.name] * n_rows,
+            'rank':             list(range(1, n_rows + 1)),
+            'candidate_id':     list(ranked_sims),
+            'candidate_name':   [stream.get('user_name') for stream in streams],
+            'similarity':       list(ranked_sims.values()),
+            'mutual_count':     [followings_counter.get(uid, 0) for uid in ranked_sims],
+            'total_followers':  [stream.get('total_followers') for stream in streams],
+            'viewer_count':     [stream.get('viewer_count') for stream in streams],
+            'language':         [stream.get('language') for stream in streams],
+            'game_id':          [stream.get('game_id') for stream in streams],
+            'title':            [stream.get('title') for stream in streams],
+            'started_at':       [stream.get('started_at') for stream in streams],
+            'stream_duration':  [stream.get('stream_duration') for stream in streams],
+        }
 
 
     def get_sims(self):
         results = OrderedDict()
-        mutual_followings, tot_followers = self.folnet.mutual_followings, self.live_streams.total_followers
-        num_collected = self.pipeline.folnet_pipe.num_collected
-        ranked_sims = JaccardSim(mutual_followings, tot_followers, num_collected).ranked_sim_scores
+        followings_counter = self.folnet.followings_counter
+        ranked_sims = self.ranked_sims()
 
         for uid in ranked_sims:
             got = self.live_streams.get(uid)
@@ -47,7 +105,7 @@ class Recommendation:
                         f'{got["language"]:>2}  ' \
                         f'{got["total_followers"]:>4}  ' \
                         f'{ranked_sims.get(uid) * 100:.3f}  ' \
-                        f'{mutual_followings.get(uid):>3}'
+                        f'{followings_counter.get(uid, 0):>3}'
 
             print(formatted)
             results.update({uid: self.live_streams.get(uid)})
@@ -57,17 +115,18 @@ class Recommendation:
 
     async def __call__(self, n_consumers=100):
         t = perf_counter()
+        self.record_request()
 
-
-        async with TwitchClient() as tc:
-            await self.streamer.create(tc)
-            # self.pipeline = RecommendationPipeline(self.streamer, self.folnet, self.live_streams)
-            await self.pipeline(tc, n_consumers)
+        from twitch_client import TwitchClient
+        async with TwitchClient(follower_index=self.follower_index, resolver=self.user_resolver) as tc:
+            await self.run(tc, n_consumers)
 
             self.streamer.display
             self.pipeline.streamer_pipe.display
             self.pipeline.folnet_pipe.display
             self.pipeline.live_stream_pipe.display
+            if self.pipeline.profiler:
+                self.pipeline.profiler.display
 
             self.get_sims()
 
@@ -80,6 +139,78 @@ class Recommendation:
 
 
 
+    def record_request(self) -> None:
+        # Feeds the prewarm scheduler's notion of which streamers are hot
+        if self.request_stats is not None:
+            self.request_stats.record(self.streamer_name)
+
+
+    def save_state(self) -> None:
+        if self.state_store is not None:
+            self.state_store.save(RecommendationState.from_recommendation(self))
+
+
+    async def run(self, tc: TwitchClient, n_consumers=100, refresh=False, resume=False) -> bool:
+        """
+        Runs the pipeline on a given client without printing; the saved state is updated when a state store is set.
+        With refresh=True the run is incremental on top of the saved state, if one matches this request.  With
+        resume=True the run continues from state restored from a checkpoint (see checkpoint.Checkpointer).
+
+        Returns:
+            True when the run was incremental, False when it was a full run.
+        """
+        state = self.state_store.load(self.streamer_name) if self.state_store and refresh else None
+        incremental = state is not None and state.matches(self)
+        try:
+            if incremental:
+                state.restore(self)
+                self.streamer.valid = True
+                await self.pipeline.refresh(tc, n_consumers, since=state.newest_followed_at)
+            elif resume:
+                self.streamer.valid = True
+                await self.pipeline(tc, n_consumers, resume=True)
+            else:
+                await self.streamer.create(tc)
+                self.folnet.streamer_id = self.streamer.uid
+                await self.pipeline(tc, n_consumers)
+        finally:
+            # The pool's workers are not needed between runs; a later run starts a new pool.  Not waiting for them
+            # keeps the loop free; anything still running in the pool finishes in the background
+            if self._owns_executor:
+                self.executor.shutdown(wait=False)
+
+        self.save_state()
+        if self.stream_profiles is not None:
+            self.stream_profiles.save()
+        if self.skip_filter is not None:
+            # Saving also ages the filter out by whole generations
+            self.skip_filter.save()
+        if self.user_resolver is not None:
+            self.user_resolver.save()
+        return incremental
+
+
+    async def refresh(self, n_consumers=100):
+        """
+        Re-runs the recommendation from the state saved by a previous run: only new followers are fetched and known
+        candidates are re-checked for being live.  Falls back to a full run when there is no matching saved state.
+        """
+        t = perf_counter()
+        self.record_request()
+        from twitch_client import TwitchClient
+        async with TwitchClient(follower_index=self.follower_index, resolver=self.user_resolver) as tc:
+            await self.run(tc, n_consumers, refresh=True)
+
+            self.pipeline.streamer_pipe.display
+            self.pipeline.folnet_pipe.display
+            self.pipeline.live_stream_pipe.display
+
+            self.get_sims()
+
+            print(f'{Col.orange}[📞] Total Calls to Twitch: {tc.http.count_success_resp} {Col.end}')
+            print(f'{Col.cyan}[⏲] Refresh Time: {round(perf_counter() - t, 3)} sec {Col.end}')
+
+
     def displ_fmt(self, name, viewers, duration, lang, total_folls, sim_score, mutual_count):
         pass
 
@@ -1,52 +1,202 @@
+from __future__ import annotations
 import asyncio
-from twitch_client import TwitchClient
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING
 from streamer import StreamerPipe, Streamer
 from follower_network import FollowNetPipe, FollowerNetwork
 from live_stream_info import LiveStreamPipe, LiveStreams
+from work_queue import AsyncioBroker, FOLL_IDS, LIVE_UIDS
+
+if TYPE_CHECKING:
+    from twitch_client import TwitchClient
+    from profiling import PipelineProfiler
+    from executor import StageExecutor
+    from stream_profiles import StreamProfiles
+    from skip_filter import SkipFilter
 
 
 class RecommendationPipeline:
 
     # TODO: want this to take instantiated objects as params instead of arguments to instantiate the objects
     def __init__(self, streamer: Streamer, folnet: FollowerNetwork, live_streams: LiveStreams,
-                 max_followings: int = 150, sample_sz: int = 300) -> None:
-        self.streamer_pipe = StreamerPipe(streamer, sample_sz=sample_sz)
-        self.folnet_pipe = FollowNetPipe(folnet, max_followings=max_followings)
-        self.live_stream_pipe = LiveStreamPipe(live_streams)
+                 max_followings: int = 150, sample_sz: int = 300, follower_index=None,
+                 profiler: PipelineProfiler = None, executor: StageExecutor = None, game_id: str = None,
+                 stream_profiles: StreamProfiles = None, skip_filter: SkipFilter = None, queue_broker=None,
+                 sketches=None, sketch_min_sim: float = 0.0) -> None:
+        self.streamer_pipe = StreamerPipe(streamer, sample_sz=sample_sz, sketches=sketches, executor=executor,
+                                          skip_filter=skip_filter)
+        # Known audiences only stand in for total followers when the scorer ranks by known audiences as well
+        self.live_stream_pipe = LiveStreamPipe(live_streams, executor=executor, game_id=game_id,
+                                               profiles=stream_profiles, follower_index=follower_index
+                                               if folnet.uses_known_audiences else None)
+        self.folnet_pipe = FollowNetPipe(folnet, max_followings=max_followings, executor=executor,
+                                         candidate_filter=self.filter_candidates, skip_filter=skip_filter)
+        self.sketches = sketches
+        self.sketch_min_sim = sketch_min_sim
+        self.profiler = profiler
+        self.queue_broker = queue_broker or AsyncioBroker()
+        self._merged_seq = {FOLL_IDS: 0, LIVE_UIDS: 0}
+
+
+    def filter_candidates(self, candidates: list) -> list:
+        """
+        Drops candidates before their /streams call: those whose cached profile rules out the requested language or
+        game, then, with audience sketches and a positive sketch_min_sim, those whose estimated audience overlap is
+        below it.  Off by default: two follower samples of a few hundred uids rarely share a MinHash bin even for
+        closely related streamers, so only thresholds scaled to the sample size are safe to turn on.
+        """
+        candidates = self.live_stream_pipe.prune(candidates)
+        if self.sketches is not None:
+            candidates = self.sketches.prefilter(self.streamer_pipe.streamer.uid, candidates, self.sketch_min_sim)
+        return candidates
+
+
+    def _create_task(self, coro, stage: str) -> asyncio.Task:
+        if self.profiler:
+            return self.profiler.create_task(coro, stage)
+        return asyncio.create_task(coro)
+
+
+    async def __call__(self, tc: TwitchClient, n_consumers: int, resume: bool = False):
+        """
+        Runs all stages.  With resume=True the run continues from restored checkpoint state: the sampled followers
+        are not fetched again, only those without processed followings are queued, and live streams that still lack
+        a follower total are re-queued.
+
+        With a distributed queue_broker, followings and follower totals are also fetched by PipelineWorkers in other
+        processes; their results are merged here as they are published.  Totals stay local when a follower index
+        answers them.
+        """
+        broker = self.queue_broker
+        await broker.start_run({'max_followings': self.folnet_pipe.max_followings})
+        q_foll_ids = broker.queue(FOLL_IDS)
+        q_followings = asyncio.Queue()
+        q_live_uids = broker.queue(LIVE_UIDS) if self.live_stream_pipe.follower_index is None else asyncio.Queue()
+
+        if self.profiler:
+            self.profiler.instrument(tc)
+            self.profiler.monitor_lag()
+        tasks = []
+        try:
+            # Workers start first, so that followings are fetched while later follower pages still load
+            t_followings = [self._create_task(
+                self.folnet_pipe.produce_followed_ids(tc, q_in=q_foll_ids, q_out=q_followings), stage='followings')
+                for _ in range(n_consumers)]
+            t_livestreams = self._create_task(
+                self.live_stream_pipe.produce_live_streams(tc, q_in=q_followings, q_out=q_live_uids),
+                stage='live_streams')
+            t_total = [self._create_task(
+                self.live_stream_pipe.consume_live_streams(tc, q_in=q_live_uids), stage='total_followers')
+                for _ in range(n_consumers // 2)]
+            t_merge = asyncio.create_task(self.merge_results(q_followings)) if broker.distributed else None
+            tasks = [*t_followings, t_livestreams, *t_total, *([t_merge] if t_merge else [])]
+
+            # Streamer: follower ids
+            if resume:
+                pending_ids = [uid for uid in self.streamer_pipe.sanitized_follower_ids
+                               if uid not in self.folnet_pipe.processed_ids]
+                self.streamer_pipe.put_queue(pending_ids, q_foll_ids)
+                [q_live_uids.put_nowait(uid) for uid, total in
+                 self.live_stream_pipe.live_streams.total_followers.items() if total is None]
+            elif self.profiler:
+                await self.profiler.wrap(self.streamer_pipe(tc, q_out=q_foll_ids), stage='streamer')
+            else:
+                await self.streamer_pipe(tc, q_out=q_foll_ids)
+
+            # Folnet: follower's followings
+            await q_foll_ids.join()
+            if t_merge:
+                await self.merge_published(q_followings)
+            [q_followings.put_nowait(batch) for batch in await self.folnet_pipe.flush(remainder=True)]
+            [t.cancel() for t in t_followings]
+
+            # LiveStreams
+            await q_followings.join()
+            t_livestreams.cancel()
+
+            await q_live_uids.join()
+            [t.cancel() for t in t_total]
+            if t_merge:
+                t_merge.cancel()
+                await self.merge_published(q_followings)
+        finally:
+            # A stage that raised must not leave workers, the lag monitor or the client's instrumentation behind
+            [t.cancel() for t in tasks]
+            if self.profiler:
+                self.profiler.stop()
+
+
+    async def merge_published(self, q_followings: asyncio.Queue) -> None:
+        """ Merges what PipelineWorkers published since the last call; every result is merged at most once. """
+        broker, folnet_pipe = self.queue_broker, self.folnet_pipe
+        for seq, follower_id, result in await broker.results(FOLL_IDS, self._merged_seq[FOLL_IDS]):
+            self._merged_seq[FOLL_IDS] = seq
+            if result.get('failed'):
+                if follower_id not in folnet_pipe.processed_ids:
+                    folnet_pipe.num_failed += 1
+                continue
+            new_candidate_batch = await folnet_pipe.merge_followed_ids(follower_id, result['followed_ids'])
+            if new_candidate_batch:
+                q_followings.put_nowait(new_candidate_batch)
+        for seq, live_uid, total in await broker.results(LIVE_UIDS, self._merged_seq[LIVE_UIDS]):
+            self._merged_seq[LIVE_UIDS] = seq
+            self.live_stream_pipe.live_streams.add_uid_tot_followers(live_uid, total)
+
+
+    async def merge_results(self, q_followings: asyncio.Queue) -> None:
+        while True:
+            await self.merge_published(q_followings)
+            await asyncio.sleep(self.queue_broker.poll_interval)
+
+
+    async def refresh(self, tc: TwitchClient, n_consumers: int, since: str):
+        """
+        Incremental re-run on top of restored state: only followers who followed after `since` have their followings
+        fetched, every known candidate is re-checked for being live, and total followers are only fetched for
+        streams that were not live in the previous run.
+        """
+        q_foll_ids = asyncio.Queue()
+
+        t_followings = [asyncio.create_task(
+            self.folnet_pipe.produce_followed_ids(tc, q_in=q_foll_ids)) for _ in range(n_consumers)]
+        await self.streamer_pipe.fetch_new_follower_ids(tc, since, q_out=q_foll_ids)
+        await q_foll_ids.join()
+        await self.folnet_pipe.flush()
+        [t.cancel() for t in t_followings]
 
+        await self.revalidate_live(tc, n_consumers)
 
-    async def __call__(self, tc: TwitchClient, n_consumers: int):
-        q_foll_ids = asyncio.Queue()
+
+    async def revalidate_live(self, tc: TwitchClient, n_consumers: int):
+        """
+        Re-checks every known candidate for being live and replaces the live stream data.  Live status goes stale
+        between runs, follower totals only slowly: totals are fetched for streams without one fetched less than
+        the live stream pipe's totals_max_age ago.
+        """
         q_followings = asyncio.Queue()
         q_live_uids = asyncio.Queue()
 
-        await self.streamer_pipe(tc, q_out=q_foll_ids)
+        live_streams = self.live_stream_pipe.live_streams
+        self.live_stream_pipe.remember_totals()
+        live_streams.data.clear()
+        live_streams.init_time = datetime.now(timezone.utc)
+        candidates = self.filter_candidates(list(self.folnet_pipe.folnet.mutual_followings))
+        self.folnet_pipe.batch_history.update(candidates)
+        [q_followings.put_nowait(batch) for batch in self.folnet_pipe.batchify(candidates, fetch_all=True)]
 
-        # t_prod = asyncio.create_task(self.streamer_pipe(tc, q_out=q_foll_ids))
-        t_followings = [asyncio.create_task(
-            self.folnet_pipe.produce_followed_ids(tc, q_in=q_foll_ids, q_out=q_followings)) for _ in range(n_consumers)]
         t_livestreams = asyncio.create_task(
             self.live_stream_pipe.produce_live_streams(tc, q_in=q_followings, q_out=q_live_uids))
         t_total = [asyncio.create_task(
             self.live_stream_pipe.consume_live_streams(tc, q_in=q_live_uids)) for _ in range(n_consumers // 2)]
 
-        # Streamer: follower ids
-        # await asyncio.gather(t_prod)
-
-        # Folnet: follower's followings
-        await q_foll_ids.join()
-        [q_followings.put_nowait(batch) for batch in self.folnet_pipe.new_candidate_batches(remainder=True)]
-        [t.cancel() for t in t_followings]
-
-        # LiveStreams
         await q_followings.join()
         t_livestreams.cancel()
-
         await q_live_uids.join()
         [t.cancel() for t in t_total]
 
 
 async def main():
+    from twitch_client import TwitchClient
     from colors import Col
     from datetime import datetime
     from time import perf_counter
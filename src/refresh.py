@@ -0,0 +1,128 @@
+import json
+import os
+from time import time
+from typing import Dict, List
+from dataclasses import dataclass, asdict, field
+
+
+@dataclass
+class RecommendationState:
+    """
+    Everything a later refresh of the same recommendation needs to avoid starting from zero: the sampled followers
+    and the newest follow time seen (the refresh cursor), the followings counter, the candidate set and the last
+    live stream data.  A bounded (Space-Saving) counter also keeps its errors, floor and total, so that its bounds
+    still hold once restored.
+    """
+    streamer_name:          str
+    streamer_id:            str
+    sample_sz:              int
+    max_followings:         int
+    min_mutual:             int
+    lang:                   str
+    game_id:                str = None
+    max_tracked:            int = None
+    total_folls:            int = -1
+    newest_followed_at:     str = ''
+    sampled_follower_ids:   List[str] = field(default_factory=list)
+    followings_counter:     Dict[str, int] = field(default_factory=dict)
+    followings_errors:      Dict[str, int] = field(default_factory=dict)
+    followings_floor:       int = 0
+    followings_total:       int = 0
+    num_collected:          int = 0
+    num_skipped:            int = 0
+    candidates:             List[str] = field(default_factory=list)
+    live_data:              Dict[str, dict] = field(default_factory=dict)
+    updated_at:             float = 0.0
+
+
+    @classmethod
+    def from_recommendation(cls, rec) -> 'RecommendationState':
+        pipeline, counter = rec.pipeline, rec.folnet.followings_counter
+        bounded = rec.folnet.bounded
+        return cls(streamer_name=rec.streamer_name,
+                   streamer_id=rec.streamer.uid,
+                   sample_sz=rec.sample_sz,
+                   max_followings=rec.max_followings,
+                   min_mutual=rec.min_mutual,
+                   lang=rec.live_streams.lang,
+                   game_id=pipeline.live_stream_pipe.game_id,
+                   max_tracked=rec.folnet.max_tracked,
+                   total_folls=rec.streamer.total_folls,
+                   newest_followed_at=pipeline.streamer_pipe.newest_followed_at or '',
+                   sampled_follower_ids=list(pipeline.streamer_pipe.sanitized_follower_ids),
+                   followings_counter=dict(counter),
+                   followings_errors=dict(counter.errors) if bounded else {},
+                   followings_floor=counter.floor if bounded else 0,
+                   followings_total=counter.total if bounded else sum(counter.values()),
+                   num_collected=pipeline.folnet_pipe.num_collected,
+                   num_skipped=pipeline.folnet_pipe.num_skipped,
+                   candidates=list(pipeline.folnet_pipe.batch_history),
+                   live_data=dict(rec.live_streams.data),
+                   updated_at=time())
+
+
+    def matches(self, rec) -> bool:
+        """ A state can only be refreshed by a recommendation that was requested with the same parameters. """
+        return (self.sample_sz, self.max_followings, self.min_mutual, self.lang, self.game_id, self.max_tracked) == \
+               (rec.sample_sz, rec.max_followings, rec.min_mutual, rec.live_streams.lang,
+                rec.pipeline.live_stream_pipe.game_id, rec.folnet.max_tracked)
+
+
+    def restore(self, rec) -> None:
+        """ Replaces the recommendation's state with this one, so that restoring twice does not count twice. """
+        pipeline = rec.pipeline
+        rec.streamer.uid = self.streamer_id
+        rec.streamer.total_folls = self.total_folls
+        rec.folnet.streamer_id = self.streamer_id
+        rec.folnet.clear()
+        if rec.folnet.bounded:
+            rec.folnet.followings_counter.load(self.followings_counter, self.followings_errors,
+                                               self.followings_floor, self.followings_total)
+        else:
+            rec.folnet.followings_counter.update(self.followings_counter)
+        pipeline.streamer_pipe.sanitized_follower_ids = list(self.sampled_follower_ids)
+        pipeline.streamer_pipe.newest_followed_at = self.newest_followed_at or None
+        pipeline.folnet_pipe.num_collected = self.num_collected
+        pipeline.folnet_pipe.num_skipped = self.num_skipped
+        pipeline.folnet_pipe.batch_history.clear()
+        pipeline.folnet_pipe.batch_history.update(self.candidates)
+        rec.live_streams.data.clear()
+        rec.live_streams.data.update(self.live_data)
+
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'RecommendationState':
+        return cls(**data)
+
+
+
+class StateStore:
+    """ Keeps one JSON RecommendationState per streamer name in a directory. """
+
+    def __init__(self, directory: str = '.rec_state') -> None:
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+
+    def path(self, streamer_name: str) -> str:
+        return os.path.join(self.directory, f'{streamer_name.lower()}.json')
+
+
+    def load(self, streamer_name: str) -> RecommendationState:
+        try:
+            with open(self.path(streamer_name)) as f:
+                return RecommendationState.from_dict(json.load(f))
+        except (FileNotFoundError, json.JSONDecodeError, TypeError):
+            return None
+
+
+    def save(self, state: RecommendationState) -> None:
+        # Write-then-rename so that a crash mid-write never leaves a truncated state behind
+        tmp_path = self.path(state.streamer_name) + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(state.to_dict(), f)
+        os.replace(tmp_path, self.path(state.streamer_name))
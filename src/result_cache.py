@@ -0,0 +1,140 @@
+from __future__ import annotations
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+from time import time
+from typing import Dict, Tuple, TYPE_CHECKING
+from recommendation import Recommendation
+from colors import Col
+
+if TYPE_CHECKING:
+    from twitch_client import TwitchClient
+
+
+@dataclass
+class CacheEntry:
+    rec:                Recommendation
+    columns:            dict
+    computed_at:        float
+    live_checked_at:    float
+
+
+
+class ResultCache:
+    """
+    Final recommendation results, keyed by streamer uid and the request parameters, served stale-while-revalidate.
+    A result younger than `max_age` is served as is.  An older one is still served right away while a full re-run
+    replaces it in the background, up to `max_stale`; past that, the request waits for the re-run.  Live status
+    goes stale much sooner than the follower network, so once `live_max_age` has passed, the cached candidates are
+    only re-checked for being live (see RecommendationPipeline.revalidate_live), which costs a call per 100
+    candidates instead of a full run.
+
+    Each key has at most one refresh in flight, and concurrent requests for it share that refresh.  Background
+    refreshes use the client of the request that started them, so the client must outlive them.
+
+    Args:
+        max_entries (int):
+            Results kept; the least recently requested are dropped first.
+
+        rec_kwargs (dict):
+            Further Recommendation arguments for every run, e.g. a shared skip_filter or stream_profiles.
+    """
+
+    def __init__(self, max_age: float = 600, max_stale: float = 3600, live_max_age: float = 60,
+                 max_entries: int = 500, n_consumers: int = 100, rec_kwargs: dict = None) -> None:
+        self.max_age = max_age
+        self.max_stale = max_stale
+        self.live_max_age = live_max_age
+        self.max_entries = max_entries
+        self.n_consumers = n_consumers
+        self.rec_kwargs = rec_kwargs or {}
+        self.entries: Dict[tuple, CacheEntry] = OrderedDict()
+        self._in_flight: Dict[tuple, asyncio.Task] = {}
+        self.num_hits = 0
+        self.num_misses = 0
+        self.num_runs = 0
+        self.num_revalidations = 0
+        self.num_failed = 0
+
+
+    @staticmethod
+    def key(streamer_uid: str, sample_sz: int, max_followings: int, min_mutual: int, lang: str) -> Tuple:
+        return streamer_uid, sample_sz, max_followings, min_mutual, lang
+
+
+    def _start(self, key: tuple, fn, *args) -> asyncio.Task:
+        task = self._in_flight.get(key)
+        if task is None:
+            task = self._in_flight[key] = asyncio.ensure_future(fn(*args))
+            task.add_done_callback(lambda done: self._finished(key, done))
+        return task
+
+
+    def _finished(self, key: tuple, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Background failures are counted here; the stale result keeps being served
+        if not task.cancelled() and task.exception() is not None:
+            self.num_failed += 1
+
+
+    async def _run(self, tc: TwitchClient, key: tuple, streamer_name: str) -> None:
+        _, sample_sz, max_followings, min_mutual, lang = key
+        rec = Recommendation(streamer_name, sample_sz=sample_sz, max_followings=max_followings,
+                             min_mutual=min_mutual, lang=lang, **self.rec_kwargs)
+        await rec.run(tc, self.n_consumers)
+        # The pipeline drops what it fails to fetch; a run that got nothing must not replace a good result
+        if not rec.pipeline.folnet_pipe.num_collected:
+            raise RuntimeError(f'No followings could be collected for "{streamer_name}".')
+        rec.folnet.compact()
+        now = time()
+        self.entries[key] = CacheEntry(rec, rec.columns(n_best=None), now, now)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        self.num_runs += 1
+
+
+    async def _revalidate(self, tc: TwitchClient, key: tuple) -> None:
+        entry = self.entries.get(key)
+        if entry is None:
+            return
+        live_stream_pipe = entry.rec.pipeline.live_stream_pipe
+        num_failed = len(live_stream_pipe.failed_batches)
+        await entry.rec.pipeline.revalidate_live(tc, self.n_consumers)
+        if len(live_stream_pipe.failed_batches) > num_failed:
+            raise RuntimeError(f'Live status of {len(live_stream_pipe.failed_batches) - num_failed} candidates '
+                               f'could not be revalidated.')
+        # Swapped in whole, so that readers never see a half-updated result
+        entry.columns = entry.rec.columns(n_best=None)
+        entry.live_checked_at = time()
+        self.num_revalidations += 1
+
+
+    async def get(self, tc: TwitchClient, streamer_name: str, n_best: int = 10, sample_sz: int = 300,
+                  max_followings: int = 200, min_mutual: int = 3, lang: str = 'en') -> dict:
+        """ The n_best ranked results as Recommendation.columns() gives them, from the cache where possible. """
+        key = self.key(await tc.get_uid(streamer_name), sample_sz, max_followings, min_mutual, lang)
+        entry = self.entries.get(key)
+        if entry is None or time() - entry.computed_at > self.max_stale:
+            self.num_misses += 1
+            # A refresh already in flight may be a revalidation that leaves the entry too old; then run anew
+            while entry is None or time() - entry.computed_at > self.max_stale:
+                await asyncio.shield(self._start(key, self._run, tc, key, streamer_name))
+                entry = self.entries.get(key)
+        else:
+            self.num_hits += 1
+            if time() - entry.computed_at > self.max_age:
+                self._start(key, self._run, tc, key, streamer_name)
+            elif time() - entry.live_checked_at > self.live_max_age:
+                self._start(key, self._revalidate, tc, key)
+            self.entries.move_to_end(key)
+        return {column: values[:n_best] for column, values in entry.columns.items()}
+
+
+    @property
+    def display(self, result=''):
+        result += f'{Col.magenta}<<<<< Result Cache (sz={len(self.entries)}){Col.end}\n'
+        result += f'{Col.white}  * Hits: {self.num_hits}, Misses: {self.num_misses}, Runs: {self.num_runs}, '
+        result += f'Live revalidations: {self.num_revalidations}, Failed: {self.num_failed}{Col.end}\n'
+        return print(result)
@@ -0,0 +1,200 @@
+import asyncio
+import random
+from time import monotonic
+from typing import Dict, FrozenSet, Optional, Tuple, Type
+from dataclasses import dataclass, field
+from aiohttp import ClientError
+
+TRANSIENT_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def status_of(err: BaseException) -> Optional[int]:
+    """ The HTTP status of an error, if it carries one; twitchio raises HTTPException(message, reason, status). """
+    status = getattr(err, 'status', None)
+    if status is None:
+        status = next((arg for arg in err.args if isinstance(arg, int)), None)
+    return status
+
+
+class CircuitOpenError(Exception):
+    """ Raised when a call is refused because the circuit for its endpoint is open. """
+
+    def __init__(self, endpoint: str, retry_in: float):
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+        super().__init__(f'Circuit for "{endpoint}" is open; retry in {retry_in:.2f} sec.')
+
+
+
+class RetryBudgetExhausted(Exception):
+    """ Raised when a failed call could have been retried but the shared retry budget is spent. """
+
+
+
+@dataclass
+class RetryPolicy:
+    max_attempts:   int = 4
+    base_delay:     float = 0.25
+    max_delay:      float = 8.0
+    retry_on:       Tuple[Type[BaseException], ...] = (asyncio.TimeoutError, ClientError, OSError)
+    retry_statuses: FrozenSet[int] = TRANSIENT_STATUSES
+
+
+    def backoff(self, attempt: int) -> float:
+        """ Full-jitter exponential backoff: uniform in [0, min(max_delay, base_delay * 2**attempt)]. """
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+    def is_retryable(self, err: BaseException) -> bool:
+        """ Timeouts, connection errors, 429s and 5xx replies are retried; other HTTP errors such as 4xx are not. """
+        if isinstance(err, CircuitOpenError):
+            return False
+        status = status_of(err)
+        if status is not None:
+            return status in self.retry_statuses
+        return isinstance(err, self.retry_on)
+
+
+
+@dataclass
+class RetryBudget:
+    """
+    Caps retries to a fraction of successful traffic so that a struggling endpoint is not hammered by every worker
+    at once.  Each success deposits `ratio` tokens (up to `max_tokens`) and each retry withdraws one token.
+    """
+    ratio:          float = 0.2
+    max_tokens:     float = 50.0
+    tokens:         float = 10.0
+
+
+    def deposit(self) -> None:
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+
+    def withdraw(self) -> bool:
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+
+@dataclass
+class CircuitBreaker:
+    endpoint:           str
+    failure_threshold:  int = 5
+    reset_timeout:      float = 30.0
+    failures:           int = 0
+    opened_at:          float = None
+    half_open_trial:    bool = False
+
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        if monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+
+    def before_call(self) -> None:
+        state = self.state
+        if state == 'open':
+            raise CircuitOpenError(self.endpoint, self.reset_timeout - (monotonic() - self.opened_at))
+        if state == 'half-open':
+            # Only a single trial call is let through while half-open
+            if self.half_open_trial:
+                raise CircuitOpenError(self.endpoint, 0.0)
+            self.half_open_trial = True
+
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.half_open_trial = False
+
+
+    def release_trial(self) -> None:
+        self.half_open_trial = False
+
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.half_open_trial or self.failures >= self.failure_threshold:
+            self.opened_at = monotonic()
+        self.half_open_trial = False
+
+
+
+@dataclass
+class Retrier:
+    policy:             RetryPolicy = field(default_factory=RetryPolicy)
+    budget:             RetryBudget = field(default_factory=RetryBudget)
+    failure_threshold:  int = 5
+    reset_timeout:      float = 30.0
+    breakers:           Dict[str, CircuitBreaker] = field(default_factory=dict)
+    num_retries:        int = 0
+    num_failures:       int = 0
+
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        if endpoint not in self.breakers:
+            self.breakers[endpoint] = CircuitBreaker(endpoint, self.failure_threshold, self.reset_timeout)
+        return self.breakers[endpoint]
+
+
+    async def call(self, endpoint: str, fn, *args, **kwargs):
+        """
+        Awaits fn(*args, **kwargs), retrying retryable failures with jittered exponential backoff while the
+        endpoint's circuit is closed and the retry budget allows it.
+
+        Args:
+            endpoint (str):
+                Key of the circuit breaker that guards this call, e.g. '/users/follows'.
+
+            fn (coroutine function):
+                The call to make; it is re-invoked on every attempt.
+
+        Returns:
+            Whatever fn returns on the first successful attempt.
+        """
+        breaker = self.breaker(endpoint)
+        attempt = 0
+        while True:
+            try:
+                breaker.before_call()
+            except CircuitOpenError:
+                self.num_failures += 1
+                raise
+            try:
+                result = await fn(*args, **kwargs)
+            except asyncio.CancelledError:
+                # A cancelled call says nothing about the endpoint, but must not leave a half-open trial taken
+                breaker.release_trial()
+                raise
+            except Exception as err:
+                if self.policy.is_retryable(err):
+                    breaker.record_failure()
+                else:
+                    # A 4xx is an answer about the request, not a sign that the endpoint is failing
+                    breaker.release_trial()
+                attempt += 1
+                if not self.policy.is_retryable(err) or attempt >= self.policy.max_attempts:
+                    self.num_failures += 1
+                    raise
+                if not self.budget.withdraw():
+                    self.num_failures += 1
+                    raise RetryBudgetExhausted(f'No retry budget left for "{endpoint}".') from err
+                self.num_retries += 1
+                await asyncio.sleep(self.policy.backoff(attempt))
+            else:
+                breaker.record_success()
+                self.budget.deposit()
+                return result
+
+
+    def __str__(self):
+        open_circuits = [ep for ep, br in self.breakers.items() if br.state != 'closed']
+        return (f'Retries: {self.num_retries}, Failures: {self.num_failures}, '
+                f'Budget: {self.budget.tokens:.1f}, Open circuits: {open_circuits}')
@@ -0,0 +1,244 @@
+import math
+from hashlib import blake2b
+from operator import eq
+from random import Random
+from typing import Dict, Iterable, List, Set
+from dataclasses import dataclass, field
+
+MAX_HASH = (1 << 32) - 1
+
+
+def hash64(uid: str) -> int:
+    return int.from_bytes(blake2b(str(uid).encode(), digest_size=8).digest(), 'big')
+
+
+
+class MinHash:
+    """
+    One-permutation MinHash: each uid is hashed once and binned, keeping the minimum per bin, with empty bins
+    filled by rotation densification.  Costs O(n) per sample instead of O(n * num_perm), and merging two raw
+    signatures (elementwise min) gives the sketch of the union.
+    """
+
+    def __init__(self, num_perm: int = 128, seed: int = 1) -> None:
+        self.num_perm = num_perm
+        self.seed = seed
+        self.bin_width = (MAX_HASH + 1) // num_perm
+        self.raw = [MAX_HASH] * num_perm
+
+
+    def update(self, uids: Iterable[str]) -> None:
+        raw, width = self.raw, self.bin_width
+        for h in map(hash64, uids):
+            value = (h ^ self.seed) & MAX_HASH
+            idx, offset = divmod(value, width)
+            if offset < raw[idx]:
+                raw[idx] = offset
+
+
+    def merge(self, other: 'MinHash') -> None:
+        self.raw = [min(a, b) for a, b in zip(self.raw, other.raw)]
+
+
+    @property
+    def signature(self) -> List[int]:
+        """ The raw bins with every empty bin borrowing from the next non-empty bin to its right. """
+        raw, n = self.raw, self.num_perm
+        if all(value == MAX_HASH for value in raw):
+            return list(raw)
+        signature = []
+        for idx in range(n):
+            step = 0
+            while raw[(idx + step) % n] == MAX_HASH:
+                step += 1
+            signature.append(raw[(idx + step) % n] + step * self.bin_width)
+        return signature
+
+
+    def jaccard(self, other: 'MinHash') -> float:
+        return sum(map(eq, self.signature, other.signature)) / self.num_perm
+
+
+
+class HyperLogLog:
+    """ HyperLogLog cardinality estimate with 2**p registers (standard error ~ 1.04 / sqrt(2**p)). """
+
+    def __init__(self, p: int = 12) -> None:
+        self.p = p
+        self.m = 1 << p
+        self.registers = bytearray(self.m)
+
+
+    def __len__(self):
+        return round(self.cardinality)
+
+
+    def update(self, uids: Iterable[str]) -> None:
+        for h in map(hash64, uids):
+            idx = h >> (64 - self.p)
+            rest = h & ((1 << (64 - self.p)) - 1)
+            rank = (64 - self.p) - rest.bit_length() + 1
+            if rank > self.registers[idx]:
+                self.registers[idx] = rank
+
+
+    def merge(self, other: 'HyperLogLog') -> None:
+        self.registers = bytearray(max(a, b) for a, b in zip(self.registers, other.registers))
+
+
+    @property
+    def cardinality(self) -> float:
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        estimate = alpha * self.m ** 2 / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * self.m and zeros:
+            # Small range correction (linear counting)
+            estimate = self.m * math.log(self.m / zeros)
+        return estimate
+
+
+
+@dataclass
+class AudienceSketch:
+    minhash:    MinHash
+    hll:        HyperLogLog
+    signature:  List[int] = None
+
+
+
+@dataclass
+class LSHIndex:
+    """ Banded LSH over MinHash signatures; streamers sharing any band bucket become query candidates. """
+    num_bands:  int = 32
+    rows:       int = 4
+    buckets:    List[Dict[tuple, Set[str]]] = field(default_factory=list)
+    keys:       Dict[str, List[tuple]] = field(default_factory=dict)
+
+
+    def __post_init__(self):
+        self.buckets = self.buckets or [{} for _ in range(self.num_bands)]
+
+
+    def _bands(self, signature: List[int]) -> List[tuple]:
+        return [tuple(signature[b * self.rows:(b + 1) * self.rows]) for b in range(self.num_bands)]
+
+
+    def insert(self, key: str, signature: List[int]) -> None:
+        self.remove(key)
+        self.keys[key] = self._bands(signature)
+        for bucket, band in zip(self.buckets, self.keys[key]):
+            bucket.setdefault(band, set()).add(key)
+
+
+    def remove(self, key: str) -> None:
+        for bucket, band in zip(self.buckets, self.keys.pop(key, [])):
+            bucket.get(band, set()).discard(key)
+
+
+    def query(self, signature: List[int]) -> Set[str]:
+        found = set()
+        for bucket, band in zip(self.buckets, self._bands(signature)):
+            found.update(bucket.get(band, ()))
+        return found
+
+
+
+class AudienceSketches:
+    """
+    MinHash + HyperLogLog sketches of each streamer's sampled followers, built from StreamerPipe samples, with an LSH
+    index for approximate Jaccard-nearest streamers.  Meant as a cheap pre-filter before exact co-follow scoring.
+
+    Args:
+        num_perm (int):
+            MinHash signature length; must equal num_bands * rows.
+
+        num_bands (int):
+            LSH bands.  More bands (fewer rows each) find less similar streamers at the cost of more candidates.
+    """
+
+    def __init__(self, num_perm: int = 128, num_bands: int = 32, hll_p: int = 12, seed: int = 1) -> None:
+        if num_perm % num_bands:
+            raise ValueError(f'num_perm ({num_perm}) must be a multiple of num_bands ({num_bands}).')
+        self.num_perm = num_perm
+        self.seed = seed
+        self.hll_p = hll_p
+        self.sketches: Dict[str, AudienceSketch] = {}
+        self.lsh = LSHIndex(num_bands=num_bands, rows=num_perm // num_bands)
+
+
+    def __len__(self):
+        return len(self.sketches)
+
+
+    def __contains__(self, streamer_id):
+        return streamer_id in self.sketches
+
+
+    def add(self, streamer_id: str, follower_ids: Iterable[str]) -> AudienceSketch:
+        """ Folds a follower sample into the streamer's sketch; repeated samples accumulate. """
+        follower_ids = list(follower_ids)
+        sketch = self.sketches.get(streamer_id)
+        if sketch is None:
+            sketch = AudienceSketch(MinHash(self.num_perm, self.seed), HyperLogLog(self.hll_p))
+            self.sketches[streamer_id] = sketch
+        sketch.minhash.update(follower_ids)
+        sketch.hll.update(follower_ids)
+        sketch.signature = sketch.minhash.signature
+        self.lsh.insert(streamer_id, sketch.signature)
+        return sketch
+
+
+    def similarity(self, uid_a: str, uid_b: str) -> float:
+        if uid_a not in self.sketches or uid_b not in self.sketches:
+            return -1
+        return sum(map(eq, self.sketches[uid_a].signature, self.sketches[uid_b].signature)) / self.num_perm
+
+
+    def cardinality(self, streamer_id: str) -> float:
+        return self.sketches[streamer_id].hll.cardinality if streamer_id in self.sketches else 0
+
+
+    def nearest(self, streamer_id: str, n_best: int = 10) -> dict:
+        """ Approximate Jaccard-nearest sketched streamers as {uid: estimated jaccard}, highest first. """
+        if streamer_id not in self.sketches:
+            return {}
+        signature = self.sketches[streamer_id].signature
+        found = self.lsh.query(signature) - {streamer_id}
+        ranked = sorted(((uid, self.similarity(streamer_id, uid)) for uid in found),
+                        key=lambda item: item[1], reverse=True)
+        return dict(ranked[:n_best])
+
+
+    def prefilter(self, streamer_id: str, candidates: Iterable[str], min_sim: float = 0.0) -> list:
+        """
+        Drops sketched candidates estimated below min_sim; candidates without a sketch are kept, and so is every
+        candidate while the streamer itself has no sketch or min_sim is not positive.  Estimates move in steps of
+        1 / num_perm, so a threshold below that drops exactly the candidates sharing no bin at all.
+        """
+        if streamer_id not in self.sketches or min_sim <= 0:
+            return list(candidates)
+        return [uid for uid in candidates
+                if uid not in self.sketches or self.similarity(streamer_id, uid) >= min_sim]
+
+
+
+def main():
+    from time import perf_counter
+    rng = Random(7)
+    population = [str(uid) for uid in range(50_000)]
+    sketches = AudienceSketches()
+    base = rng.sample(population, 2000)
+    for idx in range(1000):
+        # Every 50th streamer shares a growing part of the same audience
+        overlap = base[:idx * 2] if idx % 50 == 49 else []
+        sketches.add(f'streamer_{idx}', overlap + rng.sample(population, 2000 - len(overlap)))
+
+    t = perf_counter()
+    nearest = sketches.nearest('streamer_199', n_best=5)
+    print(f'Nearest to streamer_199: {nearest}')
+    print(f'Query time: {(perf_counter() - t) * 1000:.3f} ms')
+    print(f'HLL cardinality of streamer_199: {sketches.cardinality("streamer_199"):.0f} (actual 2000)')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+import os
+import pickle
+import zlib
+from hashlib import blake2b
+from math import ceil, log
+from time import time
+from typing import Dict, Iterable, List
+from colors import Col
+
+MAGIC = b'TRSF\x01'
+
+
+class BloomFilter:
+    """ A plain Bloom filter over strings; k bit positions per key come from one 128-bit hash by double hashing. """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01) -> None:
+        self.num_bits = max(64, ceil(-capacity * log(error_rate) / log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+
+    def _positions(self, key: str):
+        digest = blake2b(key.encode(), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + idx * h2) % self.num_bits for idx in range(self.num_hashes))
+
+
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+
+class SkipFilter:
+    """
+    Uids that are not worth a followings request: follower bots, and followers whose followings were empty or over
+    the cap.  Entries of the current generation are kept exactly; older generations are folded into Bloom filters
+    (about 10 bits per uid at 1% false positives), and whole generations are dropped once older than `ttl`, so an
+    entry expires between ttl * (1 - 1/generations) and ttl after it was added.  A false positive only skips one
+    follower of the sample.
+
+    Over-cap entries depend on the cap: they are recorded by runs with max_followings >= `cap`, and only used by
+    runs with max_followings <= `cap`.  Bot entries are used by every run.
+
+    Args:
+        capacity (int):
+            Expected uids per `ttl`; sizes the Bloom filters for `error_rate`.
+
+        max_recent (int):
+            Exact entries kept before the current generation is folded into a Bloom filter early.
+
+        path (str):
+            Optional file the filter is loaded from and saved to.
+    """
+
+    def __init__(self, cap: int = 150, ttl: float = 7 * 86400, generations: int = 4, capacity: int = 1_000_000,
+                 error_rate: float = 0.01, max_recent: int = 100_000, path: str = None) -> None:
+        self.cap = cap
+        self.ttl = ttl
+        self.generations = generations
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.max_recent = max_recent
+        self.path = path
+        self.recent: Dict[str, float] = {}
+        self.blooms: List[tuple] = []
+        self.started_at = time()
+        self.num_hits = 0
+        if path:
+            self.load()
+
+
+    def __len__(self):
+        return len(self.recent) + sum(bloom.count for _, bloom in self.blooms)
+
+
+    def _fold(self) -> None:
+        bloom = BloomFilter(max(len(self.recent), self.capacity // self.generations), self.error_rate)
+        for key in self.recent:
+            bloom.add(key)
+        if self.recent:
+            self.blooms.append((min(self.recent.values()), bloom))
+        self.recent = {}
+
+
+    def expire(self, now: float = None) -> None:
+        """ Starts a new generation when the current one is old enough and drops generations older than ttl. """
+        now = time() if now is None else now
+        if now - self.started_at >= self.ttl / self.generations:
+            self._fold()
+            self.started_at = now
+        self.blooms = [(added_at, bloom) for added_at, bloom in self.blooms if now - added_at < self.ttl]
+
+
+    def add(self, key: str, now: float = None) -> None:
+        self.recent[key] = time() if now is None else now
+        if len(self.recent) >= self.max_recent:
+            self._fold()
+
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.recent or any(key in bloom for _, bloom in self.blooms)
+
+
+    def add_bots(self, uids: Iterable[str]) -> None:
+        for uid in uids:
+            self.add(f'bot:{uid}')
+
+
+    def is_bot(self, uid: str) -> bool:
+        return f'bot:{uid}' in self
+
+
+    def add_skipped(self, uid: str, max_followings: int) -> None:
+        """ Records a follower whose followings were empty or over max_followings. """
+        if max_followings >= self.cap:
+            self.add(f'cap:{uid}')
+
+
+    def is_skipped(self, uid: str, max_followings: int) -> bool:
+        return max_followings <= self.cap and f'cap:{uid}' in self
+
+
+    def skips(self, uid: str, max_followings: int) -> bool:
+        """ True when a followings request for `uid` is known to be wasted; counts the hit. """
+        skip = self.is_bot(uid) or self.is_skipped(uid, max_followings)
+        self.num_hits += skip
+        return skip
+
+
+    def load(self) -> None:
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+            if not data.startswith(MAGIC):
+                return
+            state = pickle.loads(zlib.decompress(data[len(MAGIC):]))
+        except (FileNotFoundError, zlib.error, pickle.UnpicklingError, EOFError, ValueError):
+            return
+        self.recent, self.started_at = state['recent'], state['started_at']
+        self.blooms = []
+        for added_at, num_bits, num_hashes, count, bits in state['blooms']:
+            bloom = BloomFilter.__new__(BloomFilter)
+            bloom.num_bits, bloom.num_hashes, bloom.count, bloom.bits = num_bits, num_hashes, count, bytearray(bits)
+            self.blooms.append((added_at, bloom))
+        self.expire()
+
+
+    def save(self) -> None:
+        self.expire()
+        if not self.path:
+            return
+        state = {'recent': self.recent, 'started_at': self.started_at,
+                 'blooms': [(added_at, bloom.num_bits, bloom.num_hashes, bloom.count, bytes(bloom.bits))
+                            for added_at, bloom in self.blooms]}
+        # Write-then-rename so that a crash mid-write leaves the previous filter intact
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(MAGIC + zlib.compress(pickle.dumps(state, protocol=4)))
+        os.replace(tmp_path, self.path)
+
+
+    @property
+    def display(self, result=''):
+        result += f'{Col.yellow}<<<<< Skip Filter {Col.end}\n'
+        result += f'{Col.white}  * Entries: {len(self)} (exact: {len(self.recent)}, Bloom generations: '
+        result += f'{len(self.blooms)}), Requests saved: {self.num_hits}{Col.end}\n'
+        return print(result)
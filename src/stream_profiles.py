@@ -0,0 +1,106 @@
+import json
+import os
+from time import time
+from typing import Dict, Iterable, List
+from colors import Col
+
+
+class StreamProfiles:
+    """
+    What each channel was last seen streaming: its broadcast language and how often each category (game_id) came
+    up, learned from /streams replies.  Requests restricted to a language or game use it to drop candidates that
+    cannot match before any live-status call; channels without a profile are always kept.
+
+    Language is a channel setting and rarely changes, so one sighting is enough to prune on it.  Categories vary
+    from stream to stream, so a channel is only pruned for a game after `min_sightings` streams in other games.
+    A stream seen in several replies counts once: sightings are keyed on the stream id, or its start time.
+
+    Args:
+        max_age (float):
+            Seconds after which a profile is stale and no longer used for pruning.
+
+        path (str):
+            Optional JSON file the profiles are loaded from and saved to, to share them across runs.
+    """
+
+    def __init__(self, max_age: float = 30 * 86400, min_sightings: int = 3, path: str = None) -> None:
+        self.max_age = max_age
+        self.min_sightings = min_sightings
+        self.path = path
+        self.language: Dict[str, str] = {}
+        self.games: Dict[str, Dict[str, int]] = {}
+        self.seen_at: Dict[str, float] = {}
+        self.last_stream: Dict[str, str] = {}
+        self.num_pruned = 0
+        if path:
+            self.load()
+
+
+    def __len__(self):
+        return len(self.seen_at)
+
+
+    def observe(self, streams: Iterable[dict], now: float = None) -> None:
+        now = time() if now is None else now
+        for stream in streams:
+            uid = stream.get('user_id')
+            if not uid:
+                continue
+            if stream.get('language'):
+                self.language[uid] = stream['language']
+            stream_key = stream.get('id') or stream.get('started_at')
+            if stream.get('game_id') and (stream_key is None or self.last_stream.get(uid) != stream_key):
+                games = self.games.setdefault(uid, {})
+                games[stream['game_id']] = games.get(stream['game_id'], 0) + 1
+            if stream_key is not None:
+                self.last_stream[uid] = stream_key
+            self.seen_at[uid] = now
+
+
+    def may_match(self, uid: str, language: str = None, game_id: str = None, now: float = None) -> bool:
+        now = time() if now is None else now
+        if now - self.seen_at.get(uid, float('-inf')) > self.max_age:
+            return True
+        if language and self.language.get(uid, language) != language:
+            return False
+        if game_id:
+            games = self.games.get(uid, {})
+            if game_id not in games and sum(games.values()) >= self.min_sightings:
+                return False
+        return True
+
+
+    def prune(self, candidates: List[str], language: str = None, game_id: str = None) -> List[str]:
+        if not (language or game_id):
+            return candidates
+        now = time()
+        kept = [uid for uid in candidates if self.may_match(uid, language, game_id, now)]
+        self.num_pruned += len(candidates) - len(kept)
+        return kept
+
+
+    def load(self) -> None:
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            # Files saved before streams were keyed hold no last_stream
+            self.language, self.games, self.seen_at = data[:3]
+            self.last_stream = data[3] if len(data) > 3 else {}
+        except (FileNotFoundError, json.JSONDecodeError, ValueError):
+            pass
+
+
+    def save(self) -> None:
+        if self.path:
+            # Write-then-rename so that a crash mid-write never leaves truncated profiles behind
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump([self.language, self.games, self.seen_at, self.last_stream], f)
+            os.replace(tmp_path, self.path)
+
+
+    @property
+    def display(self, result=''):
+        result += f'{Col.orange}<<<<< Stream Profiles {Col.end}\n'
+        result += f'{Col.white}  * Profiles: {len(self)}, Pruned candidates: {self.num_pruned}{Col.end}\n'
+        return print(result)
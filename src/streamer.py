@@ -1,11 +1,16 @@
+from __future__ import annotations
 import asyncio
-from twitch_client import TwitchClient
-from bot_detection import BotDetector
+from bot_detection import BotDetector, sanitize_foll_list
+from executor import StageExecutor
 from colors import Col
 from dataclasses import dataclass
-from typing import List
+from typing import List, TYPE_CHECKING
 import re
 
+if TYPE_CHECKING:
+    from twitch_client import TwitchClient
+    from skip_filter import SkipFilter
+
 
 @dataclass
 class Streamer:
@@ -63,21 +68,29 @@ class Streamer:
 
 
 class StreamerPipe:
-    sanitized_follower_ids: List[str] = []
+    sanitized_follower_ids: List[str]
 
-    def __init__(self, streamer: Streamer, sample_sz=300):
+    def __init__(self, streamer: Streamer, sample_sz=300, sketches=None, executor: StageExecutor = None,
+                 skip_filter: SkipFilter = None):
         if streamer is None:
             raise AttributeError('Streamer object provided to StreamerPipe was "None".')
         self.streamer = streamer
         self.sample_sz = sample_sz
         self.sanitized_follower_ids = list()
+        self.newest_followed_at = None
         self.bd = BotDetector()
+        self.sketches = sketches
+        self.executor = executor or StageExecutor()
+        self.skip_filter = skip_filter
+        self.num_known_bots = 0
 
 
     @property
     def display(self, result=''):
         result += f'{Col.bold}{Col.yellow}<<<<< Pipe: Streamer,  N={self.sample_sz}{Col.end}\n'
         result += f'{Col.white}  * {str(self.bd)}{Col.end}\n'
+        if self.skip_filter is not None:
+            result += f'{Col.white}  * Dropped {self.num_known_bots} bots known from earlier runs.{Col.end}\n'
         result += f'{Col.yellow} > Follower ID List (sz={len(self.sanitized_follower_ids)}):{Col.end}\n'
         result += f'  {self.sanitized_follower_ids}\n'
 
@@ -117,29 +130,73 @@ class StreamerPipe:
         return await self.fetch_follower_ids(tc, q_out)
 
 
+    async def sanitize(self, foll_list: list) -> list:
+        sanitized_uids, num_removed = await self.executor.run(sanitize_foll_list, foll_list)
+        self.bd.total_removed += num_removed
+        if self.skip_filter is not None:
+            # Bots flagged here are remembered; bots flagged in earlier runs never reach the sample
+            self.skip_filter.add_bots({foll.get('from_id') for foll in foll_list or []}.difference(sanitized_uids))
+            kept_uids = [uid for uid in sanitized_uids if not self.skip_filter.is_bot(uid)]
+            self.num_known_bots += len(sanitized_uids) - len(kept_uids)
+            sanitized_uids = kept_uids
+        return sanitized_uids
+
+
     async def fetch_follower_ids(self, tc: TwitchClient, q_out: asyncio.Queue = None):
-        follower_reply = await tc.get_n_followers(self.streamer.uid, n_folls=self.sample_sz, full_reply=True)
-        next_cursor = follower_reply.get('cursor')
-        self.streamer.total_folls = follower_reply.get('total', 0)
-
-        # Sanitize first fetch, then sanitize remaining fetches
-        all_sanitized_uids = self.bd.sanitize_foll_list(follower_reply.get('data'))
-        self.put_queue(all_sanitized_uids, q_out)
-
-        while next_cursor and len(all_sanitized_uids) < self.sample_sz:
-            params = [('after', next_cursor)]
-            next_foll_reply = await tc.get_n_followers(self.streamer.uid, params=params, full_reply=True)
-            next_cursor = next_foll_reply.get('cursor')
-            next_sanitized_uids = self.bd.sanitize_foll_list(next_foll_reply.get('data'))
-            all_sanitized_uids.extend(next_sanitized_uids)
-            self.put_queue(next_sanitized_uids, q_out)
+        # Each page is sanitized and queued as it arrives, so followings are fetched while later pages still load
+        all_sanitized_uids = []
+        async for follower_reply in tc.iter_followers_pages(self.streamer.uid):
+            self.streamer.total_folls = follower_reply.get('total', 0)
+            self.track_newest(follower_reply.get('data'))
+            sanitized_uids = await self.sanitize(follower_reply.get('data'))
+            sanitized_uids = sanitized_uids[:self.sample_sz - len(all_sanitized_uids)]
+            all_sanitized_uids.extend(sanitized_uids)
+            self.put_queue(sanitized_uids, q_out)
+            if len(all_sanitized_uids) >= self.sample_sz:
+                break
 
         self.sanitized_follower_ids = all_sanitized_uids
+        if self.sketches is not None:
+            self.sketches.add(self.streamer.uid, self.sanitized_follower_ids)
         return self.sanitized_follower_ids
 
 
+    def track_newest(self, foll_list: list) -> None:
+        # Twitch timestamps share one ISO-8601 format, so they order correctly as strings
+        followed_at = [foll.get('followed_at') for foll in foll_list or [] if foll.get('followed_at')]
+        if followed_at:
+            self.newest_followed_at = max(followed_at + [self.newest_followed_at or ''])
+
+
+    async def fetch_new_follower_ids(self, tc: TwitchClient, since: str, q_out: asyncio.Queue = None) -> list:
+        """
+        Collects sanitized ids of followers who followed after `since` (a Twitch 'followed_at' timestamp).  Twitch
+        returns followers newest first, so paging stops at the first page that reaches `since`.
+
+        Returns:
+            The new sanitized follower uids.  They are also put in front of sanitized_follower_ids, which keeps only
+            the newest sample_sz uids so that it does not grow with every refresh.
+        """
+        new_followers = []
+        async for follower_reply in tc.iter_followers_pages(self.streamer.uid):
+            self.streamer.total_folls = follower_reply.get('total', self.streamer.total_folls)
+            page = follower_reply.get('data') or []
+            page_new = [foll for foll in page if foll.get('followed_at', '') > since]
+            new_followers.extend(page_new)
+            if len(page_new) < len(page) or len(new_followers) >= self.sample_sz:
+                break
+
+        self.track_newest(new_followers)
+        known_uids = set(self.sanitized_follower_ids)
+        new_uids = [uid for uid in await self.sanitize(new_followers) if uid not in known_uids]
+        self.put_queue(new_uids, q_out)
+        self.sanitized_follower_ids = (new_uids + self.sanitized_follower_ids)[:self.sample_sz]
+        return new_uids
+
+
 async def main():
     from time import perf_counter
+    from twitch_client import TwitchClient
     t = perf_counter()
 
     some_name = 'emilybarkiss'
@@ -0,0 +1,350 @@
+import asyncio
+import json
+import random
+from array import array
+from collections.abc import Sequence
+from dataclasses import dataclass, asdict
+from itertools import accumulate
+from math import exp
+from time import gmtime, perf_counter, strftime, time
+from typing import Callable, List, Tuple
+from fake_twitch import FakeUser, TWITCH_TIME
+from colors import Col
+
+MAGIC = b'TRSG\x01'
+LANGUAGES = {'en': 0.65, 'es': 0.12, 'de': 0.08, 'fr': 0.06, 'pt': 0.05, 'ja': 0.04}
+
+
+def _unit(*keys: int) -> float:
+    """ A deterministic pseudo-random number in [0, 1) for the given keys (splitmix64 finalizer). """
+    x = 0
+    for key in keys:
+        x = (x ^ key) * 0x9E3779B97F4A7C15 & 0xFFFFFFFFFFFFFFFF
+        x = (x ^ (x >> 30)) * 0xBF58476D1CE4E5B9 & 0xFFFFFFFFFFFFFFFF
+        x = (x ^ (x >> 27)) * 0x94D049BB133111EB & 0xFFFFFFFFFFFFFFFF
+        x ^= x >> 31
+    return x / 2**64
+
+
+
+@dataclass
+class GraphSpec:
+    """
+    Shape of a synthetic Twitch follow graph.  Uids 1..n_streamers are streamers (login streamer_<uid>), the next
+    n_viewers uids are viewers (user_<uid>) and the bots come last; streamers follow other streamers too.
+
+    Args:
+        zipf_exponent (float):
+            Streamer popularity ~ 1 / rank^zipf_exponent, which makes follower counts power-law distributed.
+
+        mean_followings (float):
+            Mean followings per account; the count is lognormal with `followings_sigma`, so a heavy tail of accounts
+            follows more than the pipeline's max_followings.  No account follows more than `follow_cap` channels.
+
+        n_bot_bursts (int):
+            Follow-bot waves.  Each hits one streamer with `bot_burst_sz` new accounts following within a second or
+            two of each other, the pattern BotDetector flags; bots also follow a few channels at random.
+
+        live_share (float):
+            Chance that a streamer is live in any `churn_period`-second slot; live status, start time and category
+            change from slot to slot.
+    """
+    n_streamers:        int = 10_000
+    n_viewers:          int = 500_000
+    zipf_exponent:      float = 1.05
+    mean_followings:    float = 8.0
+    followings_sigma:   float = 1.2
+    follow_cap:         int = 2000
+    n_bot_bursts:       int = 200
+    bot_burst_sz:       Tuple[int, int] = (20, 400)
+    bots_per_second:    int = 3
+    span_days:          int = 3 * 365
+    live_share:         float = 0.15
+    churn_period:       int = 1800
+    n_games:            int = 500
+    seed:               int = 0
+
+
+
+class FollowSlice(Sequence):
+    """ A read-only view of one uid's follows as (uid, followed_at) string pairs, newest first, built on access. """
+
+    def __init__(self, ids: array, times: array, start: int, end: int) -> None:
+        self.ids, self.times, self.start, self.end = ids, times, start, end
+
+
+    def __len__(self):
+        return self.end - self.start
+
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            lo, hi, step = idx.indices(len(self))
+            return [(str(self.ids[i]), strftime(TWITCH_TIME, gmtime(self.times[i])))
+                    for i in range(self.start + lo, self.start + hi, step)]
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError(idx)
+        i = self.start + idx
+        return str(self.ids[i]), strftime(TWITCH_TIME, gmtime(self.times[i]))
+
+
+
+class SyntheticGraph:
+    """
+    A generated follow graph in compressed sparse row form: for every account, the channels it follows, and for
+    every streamer, its followers, each as parallel uint32 arrays of uids and follow times (epoch seconds) sorted
+    newest first.  That is 16 bytes per edge for both directions, so tens of millions of edges fit in memory.
+
+    It implements the lookups FakeHTTP serves from (followers_of, followings_of, live_streams, login and user), so
+    FakeHTTP(SyntheticGraph.generate(spec)) is a Twitch stand-in at production scale.  Live status is a function of
+    `clock()`, which defaults to the wall clock; pass a settable clock to simulate churn.
+    """
+
+    def __init__(self, spec: GraphSpec, clock: Callable[[], float] = time) -> None:
+        self.spec = spec
+        self.clock = clock
+        self.n_accounts = 0
+        self.following_offsets = array('Q', [0])
+        self.following_ids = array('I')
+        self.following_times = array('I')
+        self.follower_offsets = array('Q', [0])
+        self.follower_ids = array('I')
+        self.follower_times = array('I')
+        self.weights = [1 / rank ** spec.zipf_exponent for rank in range(1, spec.n_streamers + 1)]
+
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.following_ids)
+
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self.following_offsets, self.following_ids, self.following_times,
+                  self.follower_offsets, self.follower_ids, self.follower_times)
+        return sum(arr.itemsize * len(arr) for arr in arrays)
+
+
+    @classmethod
+    def generate(cls, spec: GraphSpec = None, clock: Callable[[], float] = time) -> 'SyntheticGraph':
+        graph = cls(spec or GraphSpec(), clock)
+        graph._generate_followings()
+        graph._build_followers()
+        return graph
+
+
+    def _generate_followings(self) -> None:
+        spec, rng = self.spec, random.Random(self.spec.seed)
+        streamers = range(1, spec.n_streamers + 1)
+        cum_weights = list(accumulate(self.weights))
+        t_end = int(time())
+        t_start = t_end - spec.span_days * 86400
+        median = spec.mean_followings / exp(spec.followings_sigma ** 2 / 2)
+
+        def append(followed: list) -> None:
+            followed.sort(key=lambda follow: follow[1], reverse=True)
+            self.following_ids.extend(uid for uid, _ in followed)
+            self.following_times.extend(t for _, t in followed)
+            self.following_offsets.append(len(self.following_ids))
+
+        for uid in range(1, spec.n_streamers + spec.n_viewers + 1):
+            n_follows = min(spec.follow_cap, spec.n_streamers, int(rng.lognormvariate(0, spec.followings_sigma) * median))
+            targets = set(rng.choices(streamers, cum_weights=cum_weights, k=n_follows)) - {uid}
+            append([(target, rng.randrange(t_start, t_end)) for target in targets])
+
+        # Bot waves: consecutive accounts follow one (usually popular) streamer a fraction of a second apart
+        uid = spec.n_streamers + spec.n_viewers
+        for _ in range(spec.n_bot_bursts):
+            target = rng.choices(streamers, cum_weights=cum_weights)[0]
+            burst_start = rng.randrange(t_start, t_end)
+            for idx in range(rng.randint(*spec.bot_burst_sz)):
+                uid += 1
+                followed = {target: burst_start + idx // spec.bots_per_second}
+                for extra in rng.sample(streamers, rng.randrange(4)):
+                    followed.setdefault(extra, rng.randrange(burst_start, t_end))
+                append(list(followed.items()))
+        self.n_accounts = uid
+
+
+    def _build_followers(self) -> None:
+        """ Transposes the followings rows into per-streamer follower rows with a counting sort. """
+        n_streamers = self.spec.n_streamers
+        counts = [0] * (n_streamers + 2)
+        for to_id in self.following_ids:
+            counts[to_id + 1] += 1
+        offsets = list(accumulate(counts))
+        self.follower_offsets = array('Q', offsets[1:])
+
+        self.follower_ids = array('I', bytes(4 * len(self.following_ids)))
+        self.follower_times = array('I', bytes(4 * len(self.following_ids)))
+        fill = offsets[:]
+        following_offsets, following_ids, following_times = \
+            self.following_offsets, self.following_ids, self.following_times
+        for from_id in range(1, self.n_accounts + 1):
+            for idx in range(following_offsets[from_id - 1], following_offsets[from_id]):
+                pos = fill[following_ids[idx]]
+                self.follower_ids[pos] = from_id
+                self.follower_times[pos] = following_times[idx]
+                fill[following_ids[idx]] = pos + 1
+
+        for uid in range(1, n_streamers + 1):
+            start, end = self.follower_offsets[uid - 1], self.follower_offsets[uid]
+            if end - start > 1:
+                row = sorted(zip(self.follower_times[start:end], self.follower_ids[start:end]), reverse=True)
+                self.follower_times[start:end] = array('I', (t for t, _ in row))
+                self.follower_ids[start:end] = array('I', (uid for _, uid in row))
+
+
+    def followers_of(self, uid: str) -> FollowSlice:
+        uid = int(uid)
+        if not 1 <= uid <= self.spec.n_streamers:
+            return FollowSlice(self.follower_ids, self.follower_times, 0, 0)
+        return FollowSlice(self.follower_ids, self.follower_times,
+                           self.follower_offsets[uid - 1], self.follower_offsets[uid])
+
+
+    def followings_of(self, uid: str) -> FollowSlice:
+        uid = int(uid)
+        if not 1 <= uid <= self.n_accounts:
+            return FollowSlice(self.following_ids, self.following_times, 0, 0)
+        return FollowSlice(self.following_ids, self.following_times,
+                           self.following_offsets[uid - 1], self.following_offsets[uid])
+
+
+    def login(self, uid) -> str:
+        return f'streamer_{uid}' if int(uid) <= self.spec.n_streamers else f'user_{uid}'
+
+
+    def user(self, login: str) -> FakeUser:
+        prefix, _, uid = login.lower().partition('_')
+        if not uid.isdigit() or self.login(int(uid)) != login.lower() or not 1 <= int(uid) <= self.n_accounts:
+            return None
+        return FakeUser(uid, login.lower(), login.lower(), '', '', 0)
+
+
+    def is_live(self, uid: int, slot: int) -> bool:
+        return _unit(uid, slot, 1) < self.spec.live_share
+
+
+    def live_streams(self, channels: List[str]) -> List[dict]:
+        spec = self.spec
+        slot = int(self.clock()) // spec.churn_period
+        languages, lang_weights = list(LANGUAGES), list(accumulate(LANGUAGES.values()))
+        streams = []
+        for channel in channels:
+            uid = int(channel)
+            if not 1 <= uid <= spec.n_streamers or not self.is_live(uid, slot):
+                continue
+            first = slot
+            while first > slot - 16 and self.is_live(uid, first - 1):
+                first -= 1
+            # Streamers mostly keep to their main category, sometimes switch
+            main_game = int(_unit(uid, 2) * spec.n_games)
+            game = main_game if _unit(uid, slot, 3) < 0.7 else int(_unit(uid, slot, 4) * spec.n_games)
+            lang_draw = _unit(uid, 5) * lang_weights[-1]
+            language = next(lang for lang, cum in zip(languages, lang_weights) if lang_draw < cum)
+            streams.append({'user_id': channel, 'user_name': self.login(uid), 'game_id': str(game), 'type': 'live',
+                            'title': f'stream {channel}', 'language': language,
+                            'viewer_count': max(1, int(self.weights[uid - 1] * 20_000 * (0.5 + _unit(uid, slot, 6)))),
+                            'started_at': strftime(TWITCH_TIME, gmtime(first * spec.churn_period))})
+        return streams
+
+
+    def save(self, path: str) -> None:
+        """ Writes the spec and the raw arrays to one binary file. """
+        header = json.dumps({'spec': asdict(self.spec), 'n_accounts': self.n_accounts,
+                             'lengths': [len(arr) for arr in self._arrays()]}).encode()
+        with open(path, 'wb') as f:
+            f.write(MAGIC + len(header).to_bytes(4, 'little') + header)
+            for arr in self._arrays():
+                arr.tofile(f)
+
+
+    @classmethod
+    def load(cls, path: str, clock: Callable[[], float] = time) -> 'SyntheticGraph':
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f'{path} is not a synthetic graph file.')
+            header = json.loads(f.read(int.from_bytes(f.read(4), 'little')))
+            spec = header['spec']
+            spec['bot_burst_sz'] = tuple(spec['bot_burst_sz'])
+            graph = cls(GraphSpec(**spec), clock)
+            graph.n_accounts = header['n_accounts']
+            for arr, length in zip(graph._arrays(), header['lengths']):
+                del arr[:]
+                arr.fromfile(f, length)
+        return graph
+
+
+    def _arrays(self) -> tuple:
+        return (self.following_offsets, self.following_ids, self.following_times,
+                self.follower_offsets, self.follower_ids, self.follower_times)
+
+
+    @property
+    def display(self, result=''):
+        counts = sorted((self.follower_offsets[uid] - self.follower_offsets[uid - 1]
+                         for uid in range(1, self.spec.n_streamers + 1)), reverse=True)
+        result += f'{Col.cyan}<<<<< Synthetic Graph {Col.end}\n'
+        result += f'{Col.white}  * Accounts: {self.n_accounts}, Streamers: {self.spec.n_streamers}, '
+        result += f'Edges: {self.num_edges}, Size: {self.nbytes / 2**20:.1f} MiB{Col.end}\n'
+        result += f'{Col.white}  * Followers, top 5: {counts[:5]}, median: {counts[len(counts) // 2]}{Col.end}\n'
+        return print(result)
+
+
+
+def benchmark(graph: SyntheticGraph, streamer_uid: int = 1, sample_sz: int = 1000, max_followings: int = 150):
+    """
+    Times the offline building blocks on a synthetic graph: bot detection over a follower sample, counting the
+    sample's followings in a FollowerNetwork, and Jaccard scores over every followed streamer.
+    """
+    from bot_detection import sanitize_foll_list
+    from follower_network import FollowerNetwork
+    from similarity import JaccardSim
+
+    timings = {}
+    streamer_id = str(streamer_uid)
+    foll_list = [{'from_id': uid, 'to_id': streamer_id, 'followed_at': followed_at}
+                 for uid, followed_at in graph.followers_of(streamer_id)[:sample_sz]]
+    t = perf_counter()
+    follower_ids, num_removed = sanitize_foll_list(foll_list)
+    timings['bot_detection'] = perf_counter() - t
+
+    folnet = FollowerNetwork(streamer_id=streamer_id)
+    t = perf_counter()
+    for follower_id in follower_ids:
+        followings = graph.followings_of(follower_id)
+        if len(followings) <= max_followings:
+            folnet.add_followings([{'from_id': follower_id, 'to_id': uid} for uid, _ in followings[:]])
+    timings['follower_network'] = perf_counter() - t
+
+    t = perf_counter()
+    totals = {uid: len(graph.followers_of(uid)) for uid in folnet.mutual_followings}
+    ranked = JaccardSim(folnet.mutual_followings, totals, len(follower_ids)).ranked_sim_scores
+    timings['jaccard'] = perf_counter() - t
+    return timings, num_removed, ranked
+
+
+async def main():
+    from fake_twitch import FakeHTTP, FakeTwitchClient
+    spec = GraphSpec(n_streamers=10_000, n_viewers=500_000)
+    t = perf_counter()
+    graph = SyntheticGraph.generate(spec)
+    print(f'{Col.cyan}[⏲] Generated in {round(perf_counter() - t, 3)} sec {Col.end}')
+    graph.display
+
+    timings, num_removed, ranked = benchmark(graph)
+    print(f'{Col.white}Removed {num_removed} bots; timings (sec): {timings}{Col.end}')
+    print(f'{Col.white}Top similar: {ranked}{Col.end}')
+
+    # The same graph behind the fake Twitch API
+    tc = FakeTwitchClient(FakeHTTP(graph, rate_limit=None, latency=0.0))
+    followings = await tc.fetch_capped_followings(str(spec.n_streamers + 1), 150)
+    live = await tc.get_streams(channels=[str(uid) for uid in range(1, 201)])
+    print(f'{Col.white}Followings of one viewer: {len(followings)}, live among top 200: {len(live)}{Col.end}')
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,160 @@
+from __future__ import annotations
+import asyncio
+import json
+import os
+from collections import namedtuple
+from time import time
+from typing import Dict, List, Optional, TYPE_CHECKING
+from colors import Col
+
+if TYPE_CHECKING:
+    from twitch_client import TwitchClient
+
+UserProfile = namedtuple('UserProfile', 'id login display_name profile_image broadcaster_type view_count')
+
+
+class UserResolver:
+    """
+    Resolves logins and uids to user profiles through a cache, and batches the misses: lookups that arrive within
+    `window` seconds of each other share one get_users call of up to 100 users.  Logins are matched without regard
+    to case.  Profiles are reused for `ttl` seconds; unknown users are not cached.
+
+    Args:
+        window (float):
+            Seconds a lookup waits for others to join its request; a full batch is sent at once.
+
+        path (str):
+            Optional JSON file the cache is loaded from and saved to, to share it across runs.
+    """
+    MAX_BATCH = 100
+
+    def __init__(self, window: float = 0.01, ttl: float = 86400, path: str = None) -> None:
+        self.window = window
+        self.ttl = ttl
+        self.path = path
+        self.profiles: Dict[str, tuple] = {}
+        self.logins_by_id: Dict[str, str] = {}
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._timer = None
+        self._tc = None
+        self.num_hits = 0
+        self.num_requests = 0
+        if path:
+            self.load()
+
+
+    def __len__(self):
+        return len(self.profiles)
+
+
+    def cached(self, key: str, now: float = None) -> Optional[UserProfile]:
+        """ The fresh cached profile for a login or uid, if any. """
+        login = self.logins_by_id.get(key) if key.isdigit() else key.lower()
+        fetched_at, profile = self.profiles.get(login, (None, None))
+        if profile is None or (time() if now is None else now) - fetched_at > self.ttl:
+            return None
+        return profile
+
+
+    def add(self, user, now: float = None) -> UserProfile:
+        profile = UserProfile(str(user.id), user.login, user.display_name, user.profile_image,
+                              user.broadcaster_type, user.view_count)
+        self.profiles[profile.login.lower()] = (time() if now is None else now, profile)
+        self.logins_by_id[profile.id] = profile.login.lower()
+        return profile
+
+
+    async def resolve(self, tc: TwitchClient, key: str) -> Optional[UserProfile]:
+        """ The profile of a login or uid, or None when Twitch does not know it. """
+        profile = self.cached(key)
+        if profile is not None:
+            self.num_hits += 1
+            return profile
+        key = key if key.isdigit() else key.lower()
+        if key in self._in_flight:
+            return await asyncio.shield(self._in_flight[key])
+        future = self._pending.get(key)
+        if future is None:
+            future = self._pending[key] = asyncio.get_running_loop().create_future()
+            self._tc = self._tc or tc
+            if len(self._pending) >= self.MAX_BATCH:
+                self._dispatch()
+            elif self._timer is None:
+                self._timer = asyncio.get_running_loop().call_later(self.window, self._dispatch)
+        # A cancelled caller must not cancel the lookup for the others waiting on it
+        return await asyncio.shield(future)
+
+
+    async def resolve_many(self, tc: TwitchClient, *keys: str) -> List[Optional[UserProfile]]:
+        return list(await asyncio.gather(*(self.resolve(tc, key) for key in keys)))
+
+
+    async def prefetch(self, tc: TwitchClient, *keys: str) -> int:
+        """ Resolves keys ahead of their use, 100 per request; failed lookups are left to be retried on use. """
+        profiles = await asyncio.gather(*(self.resolve(tc, key) for key in keys), return_exceptions=True)
+        return sum(isinstance(profile, UserProfile) for profile in profiles)
+
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        tc, self._tc = self._tc, None
+        if batch:
+            self._in_flight.update(batch)
+            asyncio.ensure_future(self._fetch(tc, batch))
+
+
+    async def _fetch(self, tc: TwitchClient, batch: Dict[str, asyncio.Future]) -> None:
+        self.num_requests += 1
+        try:
+            users = await tc.get_users(*batch)
+        except Exception as err:
+            [self._in_flight.pop(key, None) for key in batch]
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(err)
+                    # Retrieved here so that a lookup nobody awaits any more does not log a warning
+                    future.exception()
+            return
+        [self._in_flight.pop(key, None) for key in batch]
+        now = time()
+        found = {}
+        for user in users:
+            profile = self.add(user, now)
+            found[profile.id] = found[profile.login.lower()] = profile
+        for key, future in batch.items():
+            if not future.done():
+                future.set_result(found.get(key))
+
+
+    def load(self) -> None:
+        try:
+            with open(self.path) as f:
+                entries = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError, ValueError):
+            return
+        for login, (fetched_at, fields) in entries.items():
+            self.profiles[login] = (fetched_at, UserProfile(*fields))
+            self.logins_by_id[fields[0]] = login
+
+
+    def save(self) -> None:
+        if self.path:
+            now = time()
+            # Write-then-rename so that a crash mid-write leaves the previous cache intact
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump({login: (fetched_at, profile) for login, (fetched_at, profile) in self.profiles.items()
+                           if now - fetched_at <= self.ttl}, f)
+            os.replace(tmp_path, self.path)
+
+
+    @property
+    def display(self, result=''):
+        result += f'{Col.orange}<<<<< User Resolver {Col.end}\n'
+        result += f'{Col.white}  * Profiles: {len(self)}, Cache hits: {self.num_hits}, '
+        result += f'Requests: {self.num_requests}{Col.end}\n'
+        return print(result)
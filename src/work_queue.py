@@ -0,0 +1,404 @@
+from __future__ import annotations
+import asyncio
+import json
+import os
+from collections import deque
+from functools import partial
+from time import time
+from typing import List, Optional, Tuple, TYPE_CHECKING
+from colors import Col
+
+if TYPE_CHECKING:
+    from twitch_client import TwitchClient
+    from skip_filter import SkipFilter
+
+FOLL_IDS = 'foll_ids'
+LIVE_UIDS = 'live_uids'
+
+
+class AsyncioBroker:
+    """ The default queue backend: plain in-process asyncio queues, so every stage runs in this process. """
+    distributed = False
+
+    def queue(self, name: str) -> asyncio.Queue:
+        return asyncio.Queue()
+
+
+    async def start_run(self, params: dict = None) -> None:
+        return None
+
+
+
+class SQLiteQueue:
+    """
+    The part of the asyncio.Queue interface the pipeline stages use, backed by a table in an SQLiteBroker file so
+    that consumers in several processes share the queue.  get() leases an item and task_done() acknowledges the
+    item the calling task got last; an item whose lease runs out before it is acknowledged is delivered again, so
+    consumers must tolerate duplicates.
+
+    put_nowait() and task_done() only hand their write to the broker's thread; join() waits for the last of them
+    and raises the first that failed.
+    """
+
+    def __init__(self, broker: SQLiteBroker, name: str, prefetch: int = 10) -> None:
+        self.broker = broker
+        self.name = name
+        self.prefetch = prefetch
+        self._buffer = deque()
+        self._claims = {}
+        self._refill_lock = None
+        self._last_write = None
+        self._write_error = None
+
+
+    def _track(self, future) -> None:
+        # The broker's single thread runs writes in order, so the last one finishing means they all have
+        self._last_write = future
+        future.add_done_callback(self._record_error)
+
+
+    def _record_error(self, future) -> None:
+        if not future.cancelled() and future.exception() is not None and self._write_error is None:
+            self._write_error = future.exception()
+
+
+    def put_nowait(self, item) -> None:
+        self._track(self.broker.submit(self.broker.put_sync, self.name, item))
+
+
+    async def put(self, item) -> None:
+        await self.broker.put(self.name, item)
+
+
+    def qsize(self) -> int:
+        return self.broker.submit(self.broker.num_items_sync, self.name).result()
+
+
+    def empty(self) -> bool:
+        return self.qsize() == 0
+
+
+    async def get(self):
+        if self._refill_lock is None:
+            self._refill_lock = asyncio.Lock()
+        while True:
+            while self._buffer:
+                item_id, run, payload = self._buffer.popleft()
+                # Another worker may have stolen the item since it was prefetched
+                if await self.broker.start(item_id):
+                    self._claims[asyncio.current_task()] = (item_id, run)
+                    return payload
+            # One task polls the broker at a time; the others wait for the items it brings back
+            async with self._refill_lock:
+                if not self._buffer:
+                    self._buffer.extend(await self.broker.claim(self.name, self.prefetch))
+                if not self._buffer:
+                    await asyncio.sleep(self.broker.poll_interval)
+
+
+    def claimed(self) -> Optional[Tuple[int, int]]:
+        """ (item id, run) of the item the calling task got last and has not acknowledged yet. """
+        return self._claims.get(asyncio.current_task())
+
+
+    def task_done(self) -> None:
+        item_id, _ = self._claims.pop(asyncio.current_task())
+        self._track(self.broker.submit(self.broker.ack_sync, item_id))
+
+
+    async def join(self) -> None:
+        if self._last_write is not None:
+            await asyncio.wrap_future(self._last_write)
+        if self._write_error is not None:
+            raise self._write_error
+        while await self.broker.num_items(self.name):
+            await asyncio.sleep(self.broker.poll_interval)
+
+
+
+class SQLiteBroker:
+    """
+    A work queue broker in one SQLite file, shared by a coordinator and any number of worker processes on the
+    same host or a shared volume.  Delivery is at least once: claimed items carry a lease and are only deleted when
+    acknowledged, so the items of a crashed or stalled worker go back to the queue once their lease expires.
+
+    Workers claim `prefetch` items at a time; an idle worker that finds the queue empty steals prefetched items
+    that another worker has not started yet, newest first.  Results are published keyed by item, and a key is only
+    stored once, so that redelivered items cannot be counted twice when the coordinator merges them.
+
+    Every run of a coordinator starts a new run id: older items and results are dropped, and results that stale
+    workers publish for older runs are ignored.
+
+    The connection lives on one dedicated thread: a write can wait up to the 30 sec busy timeout for another
+    process's lock, which must not stall the event loop.  The coroutine methods run their `*_sync` counterpart on
+    that thread; submit() hands it any other call without waiting.
+
+    Args:
+        lease (float):
+            Seconds a claimed item stays with its worker before it is delivered again.
+
+        poll_interval (float):
+            Seconds between polls of an empty queue.
+    """
+    distributed = True
+
+    def __init__(self, path: str, lease: float = 60.0, poll_interval: float = 0.05, prefetch: int = 10) -> None:
+        self.path = path
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self.prefetch = prefetch
+        self.owner = f'{os.uname().nodename}:{os.getpid()}:{id(self)}'
+        self.run = None
+        self._run_params = {}
+        self.num_stolen = 0
+        self.num_redelivered = 0
+        # Imported here so that runs on the default AsyncioBroker never load sqlite3
+        import sqlite3
+        from concurrent.futures import ThreadPoolExecutor
+        self._thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sqlite-broker')
+        # Only ever used from self._thread once set up here
+        self.db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.executescript('''
+            CREATE TABLE IF NOT EXISTS runs (run INTEGER PRIMARY KEY AUTOINCREMENT, params TEXT);
+            CREATE TABLE IF NOT EXISTS items (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, queue TEXT, run INTEGER, payload TEXT,
+                owner TEXT, leased_until REAL DEFAULT 0, started INTEGER DEFAULT 0, attempts INTEGER DEFAULT 0);
+            CREATE INDEX IF NOT EXISTS items_queue ON items (queue, leased_until);
+            CREATE TABLE IF NOT EXISTS results (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT, queue TEXT, run INTEGER, key TEXT, payload TEXT,
+                UNIQUE (queue, run, key));
+        ''')
+
+
+    def close(self) -> None:
+        self.submit(self.db.close).result()
+        self._thread.shutdown()
+
+
+    def queue(self, name: str) -> SQLiteQueue:
+        return SQLiteQueue(self, name, self.prefetch)
+
+
+    def submit(self, fn, *args):
+        """ Runs fn(*args) on the connection's thread; returns a concurrent.futures.Future. """
+        return self._thread.submit(fn, *args)
+
+
+    async def _call(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._thread, partial(fn, *args))
+
+
+    async def start_run(self, params: dict = None) -> int:
+        """ Starts a new run with `params` for its workers, e.g. max_followings; older runs are dropped. """
+        return await self._call(self.start_run_sync, params)
+
+
+    async def run_params(self, run: int) -> dict:
+        if run not in self._run_params:
+            self._run_params[run] = await self._call(self.run_params_sync, run)
+        return self._run_params[run]
+
+
+    async def put(self, name: str, item) -> None:
+        await self._call(self.put_sync, name, item)
+
+
+    async def claim(self, name: str, n: int) -> List[tuple]:
+        return await self._call(self.claim_sync, name, n)
+
+
+    async def start(self, item_id: int) -> bool:
+        return await self._call(self.start_sync, item_id)
+
+
+    async def ack(self, item_id: int) -> None:
+        await self._call(self.ack_sync, item_id)
+
+
+    async def num_items(self, name: str) -> int:
+        return await self._call(self.num_items_sync, name)
+
+
+    async def publish(self, name: str, run: int, key: str, value) -> None:
+        await self._call(self.publish_sync, name, run, key, value)
+
+
+    async def results(self, name: str, after: int = 0) -> List[tuple]:
+        return await self._call(self.results_sync, name, after)
+
+
+    def start_run_sync(self, params: dict = None) -> int:
+        self.db.execute('BEGIN IMMEDIATE')
+        try:
+            self.run = self.db.execute('INSERT INTO runs (params) VALUES (?)', (json.dumps(params or {}),)).lastrowid
+            self.db.execute('DELETE FROM items WHERE run < ?', (self.run,))
+            self.db.execute('DELETE FROM results WHERE run < ?', (self.run,))
+        except BaseException:
+            self.db.execute('ROLLBACK')
+            raise
+        self.db.execute('COMMIT')
+        return self.run
+
+
+    def run_params_sync(self, run: int) -> dict:
+        row = self.db.execute('SELECT params FROM runs WHERE run = ?', (run,)).fetchone()
+        return json.loads(row[0]) if row else {}
+
+
+    def put_sync(self, name: str, item) -> None:
+        self.db.execute('INSERT INTO items (queue, run, payload) VALUES (?, ?, ?)',
+                        (name, self.run, json.dumps(item)))
+
+
+    def claim_sync(self, name: str, n: int) -> List[tuple]:
+        """ Leases up to n free or expired items; failing that, steals up to n unstarted items of other workers. """
+        now = time()
+        self.db.execute('BEGIN IMMEDIATE')
+        try:
+            rows = self.db.execute('SELECT id, run, payload, owner FROM items WHERE queue = ? AND leased_until < ? '
+                                   'ORDER BY id LIMIT ?', (name, now, n)).fetchall()
+            self.num_redelivered += sum(owner is not None for *_, owner in rows)
+            if not rows:
+                rows = self.db.execute('SELECT id, run, payload, owner FROM items WHERE queue = ? AND started = 0 '
+                                       'AND owner != ? ORDER BY id DESC LIMIT ?', (name, self.owner, n)).fetchall()
+                self.num_stolen += len(rows)
+            self.db.executemany('UPDATE items SET owner = ?, leased_until = ?, started = 0, attempts = attempts + 1 '
+                                'WHERE id = ?', [(self.owner, now + self.lease, row[0]) for row in rows])
+        except BaseException:
+            self.db.execute('ROLLBACK')
+            raise
+        self.db.execute('COMMIT')
+        return [(item_id, run, json.loads(payload)) for item_id, run, payload, _ in rows]
+
+
+    def start_sync(self, item_id: int) -> bool:
+        """ Marks a prefetched item as being processed; False when it was stolen in the meantime. """
+        cursor = self.db.execute('UPDATE items SET started = 1, leased_until = ? WHERE id = ? AND owner = ?',
+                                 (time() + self.lease, item_id, self.owner))
+        return cursor.rowcount == 1
+
+
+    def ack_sync(self, item_id: int) -> None:
+        self.db.execute('DELETE FROM items WHERE id = ?', (item_id,))
+
+
+    def num_items_sync(self, name: str) -> int:
+        return self.db.execute('SELECT COUNT(*) FROM items WHERE queue = ?', (name,)).fetchone()[0]
+
+
+    def publish_sync(self, name: str, run: int, key: str, value) -> None:
+        """ Stores the result for `key` once; results of a finished run are dropped. """
+        self.db.execute('INSERT OR IGNORE INTO results (queue, run, key, payload) '
+                        'SELECT ?, ?, ?, ? WHERE ? = (SELECT MAX(run) FROM runs)',
+                        (name, run, key, json.dumps(value), run))
+
+
+    def results_sync(self, name: str, after: int = 0) -> List[tuple]:
+        """ (seq, key, value) of the current run's results for queue `name` published after seq `after`. """
+        rows = self.db.execute('SELECT seq, key, payload FROM results WHERE queue = ? AND run = ? AND seq > ? '
+                               'ORDER BY seq', (name, self.run, after)).fetchall()
+        return [(seq, key, json.loads(payload)) for seq, key, payload in rows]
+
+
+    @property
+    def display(self, result=''):
+        result += f'{Col.yellow}<<<<< Work Queue ({self.path}, run {self.run}){Col.end}\n'
+        result += f'{Col.white}  * Stolen: {self.num_stolen}, Redelivered: {self.num_redelivered}{Col.end}\n'
+        return print(result)
+
+
+
+class PipelineWorker:
+    """
+    Serves the shared stages of a coordinator's RecommendationPipeline from another process: fetches the followings
+    of queued follower ids and the total followers of queued live streams, and publishes them for the coordinator
+    to merge.  Parameters such as max_followings come with each run, so one worker serves every run in turn.
+
+    Args:
+        skip_filter (SkipFilter):
+            Optional filter shared with the coordinator, e.g. loaded from the same file.
+    """
+
+    def __init__(self, broker: SQLiteBroker, skip_filter: SkipFilter = None) -> None:
+        self.broker = broker
+        self.skip_filter = skip_filter
+        self.num_followings = 0
+        self.num_totals = 0
+        self.num_failed = 0
+
+
+    async def fetch_followings(self, tc: TwitchClient, q_in: SQLiteQueue) -> None:
+        while True:
+            follower_id = await q_in.get()
+            _, run = q_in.claimed()
+            try:
+                max_followings = (await self.broker.run_params(run)).get('max_followings', 150)
+                if self.skip_filter is not None and self.skip_filter.skips(follower_id, max_followings):
+                    followed_ids = None
+                else:
+                    followed_ids = [following.get('to_id') for page in
+                                    [page async for page in tc.iter_followings_pages(follower_id, max_followings)]
+                                    for following in page]
+            except Exception:
+                # Left unacknowledged would only make it fail again elsewhere; the coordinator counts it as failed
+                self.num_failed += 1
+                await self.broker.publish(FOLL_IDS, run, follower_id, {'failed': True})
+            else:
+                self.num_followings += 1
+                await self.broker.publish(FOLL_IDS, run, follower_id, {'followed_ids': followed_ids})
+            finally:
+                q_in.task_done()
+
+
+    async def fetch_totals(self, tc: TwitchClient, q_in: SQLiteQueue) -> None:
+        while True:
+            live_uid = await q_in.get()
+            _, run = q_in.claimed()
+            try:
+                total = await tc.get_total_followers(int(live_uid))
+            except Exception:
+                self.num_failed += 1
+            else:
+                self.num_totals += 1
+                await self.broker.publish(LIVE_UIDS, run, live_uid, total)
+            finally:
+                q_in.task_done()
+
+
+    async def run(self, tc: TwitchClient, n_consumers: int = 50) -> None:
+        """ Serves both queues until cancelled. """
+        q_foll_ids, q_live_uids = self.broker.queue(FOLL_IDS), self.broker.queue(LIVE_UIDS)
+        tasks = [asyncio.create_task(self.fetch_followings(tc, q_foll_ids)) for _ in range(n_consumers)]
+        tasks += [asyncio.create_task(self.fetch_totals(tc, q_live_uids)) for _ in range(n_consumers // 2)]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            [t.cancel() for t in tasks]
+
+
+    @property
+    def display(self, result=''):
+        result += f'{Col.yellow}<<<<< Pipeline Worker ({self.broker.owner}){Col.end}\n'
+        result += f'{Col.white}  * Followings: {self.num_followings}, Totals: {self.num_totals}, '
+        result += f'Failed: {self.num_failed}{Col.end}\n'
+        return print(result)
+
+
+
+async def main():
+    from twitch_client import TwitchClient
+    from skip_filter import SkipFilter
+    broker = SQLiteBroker('pipeline_queue.sqlite')
+    worker = PipelineWorker(broker, SkipFilter(path='skip_filter.bin'))
+    async with TwitchClient() as tc:
+        try:
+            await worker.run(tc)
+        finally:
+            worker.display
+            broker.display
+
+
+if __name__ == "__main__":
+    asyncio.run(main())